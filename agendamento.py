@@ -0,0 +1,109 @@
+"""
+Agendamento adaptativo das buscas
+Cada par (termo, site) é uma tarefa recorrente da fila com o seu próprio
+intervalo: quando os preços mudam entre duas execuções o intervalo diminui,
+quando ficam estáveis ele aumenta. Assim as requisições se concentram nos
+termos cujos preços realmente se movem, e um site lento atrasa apenas as
+próprias tarefas.
+"""
+
+import random
+import statistics
+from typing import Dict, Optional, Sequence, Tuple
+
+from produto import Produto
+
+
+def resumo_precos(produtos: Sequence[Produto]) -> Optional[Dict[str, float]]:
+    """Menor preço e mediana dos produtos com preço, ou None se não houver nenhum"""
+    precos = [produto.preco for produto in produtos if produto.preco > 0]
+    if not precos:
+        return None
+    return {"minimo": min(precos), "mediana": statistics.median(precos)}
+
+
+def variacao_precos(anterior: Optional[Dict], atual: Optional[Dict]) -> Optional[float]:
+    """
+    Maior variação relativa entre os resumos de duas execuções (0.05 = 5%)
+
+    None quando uma das execuções não tem preços para comparar.
+    """
+    if not anterior or not atual:
+        return None
+    return max(
+        abs(atual[medida] - anterior[medida]) / anterior[medida]
+        for medida in ("minimo", "mediana")
+    )
+
+
+class IntervaloAdaptativo:
+    """
+    Intervalo entre execuções de cada (termo, site), ajustado pela variação dos preços
+
+    Se a variação em relação à execução anterior atinge o limiar, o
+    intervalo é multiplicado por `reducao`; senão, por `aumento`. O
+    intervalo fica sempre entre `minimo` e `maximo`.
+    """
+
+    def __init__(
+        self,
+        minimo: float = 15 * 60,
+        maximo: float = 24 * 3600,
+        inicial: float = 6 * 3600,
+        limiar: float = 0.01,
+        reducao: float = 0.5,
+        aumento: float = 1.5,
+        dispersao: float = 0.1,
+    ):
+        """
+        Args:
+            minimo: Menor intervalo (segundos), para termos com preços muito voláteis
+            maximo: Maior intervalo (segundos), para termos com preços estáveis
+            inicial: Intervalo de um par (termo, site) ainda sem histórico
+            limiar: Variação relativa (menor preço ou mediana) considerada mudança
+            reducao: Fator aplicado ao intervalo quando os preços mudam
+            aumento: Fator aplicado ao intervalo quando os preços ficam estáveis
+            dispersao: Variação aleatória (fração) do horário da próxima execução,
+                para que tarefas criadas juntas não rodem sempre juntas
+        """
+        self.minimo = minimo
+        self.maximo = maximo
+        self.inicial = inicial
+        self.limiar = limiar
+        self.reducao = reducao
+        self.aumento = aumento
+        self.dispersao = dispersao
+
+    def dados_iniciais(self) -> Dict:
+        """Dados de uma tarefa recorrente recém-criada"""
+        return {"intervalo": self.inicial}
+
+    def intervalo(self, dados: Dict) -> float:
+        """Intervalo atual da tarefa"""
+        return dados.get("intervalo", self.inicial)
+
+    def _com_dispersao(self, intervalo: float) -> float:
+        return intervalo * random.uniform(1 - self.dispersao, 1 + self.dispersao)
+
+    def proximo(self, dados: Dict, produtos: Sequence[Produto]) -> Tuple[float, Dict]:
+        """
+        Calcula a próxima execução a partir dos produtos desta execução
+
+        Args:
+            dados: Dados guardados na tarefa (intervalo e resumo da execução anterior)
+            produtos: Produtos encontrados nesta execução
+
+        Returns:
+            Tupla (segundos até a próxima execução, novos dados da tarefa)
+        """
+        intervalo = self.intervalo(dados)
+        resumo = resumo_precos(produtos)
+        variacao = variacao_precos(dados.get("resumo"), resumo)
+        if variacao is not None:
+            fator = self.reducao if variacao >= self.limiar else self.aumento
+            intervalo = min(self.maximo, max(self.minimo, intervalo * fator))
+
+        novos_dados = {"intervalo": intervalo, "resumo": resumo or dados.get("resumo")}
+        if variacao is not None:
+            novos_dados["variacao"] = round(variacao, 4)
+        return self._com_dispersao(intervalo), novos_dados
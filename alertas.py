@@ -0,0 +1,279 @@
+"""
+Alertas de mudança de preço
+Compara os produtos de cada busca com o último preço conhecido de cada
+produto (por termo, site e chave do produto) e emite eventos de produto
+novo, removido, queda ou alta de preço para saídas configuráveis (webhook,
+log ou qualquer objeto com um método enviar).
+
+Os preços de referência ficam em uma tabela SQLite indexada pela chave do
+produto: cada comparação lê apenas os preços do par (termo, site) buscado e
+grava apenas os produtos que mudaram, sem reler arquivos JSON.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from buscador_precos import normalizar_termo
+from historico_precos import chave_produto
+from produto import Produto
+from resultado_busca import ResultadoBusca
+
+NOVO = "novo"
+REMOVIDO = "removido"
+QUEDA = "queda"
+ALTA = "alta"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS precos_referencia (
+    termo TEXT NOT NULL,
+    site TEXT NOT NULL,
+    chave_produto TEXT NOT NULL,
+    nome TEXT,
+    preco REAL NOT NULL,
+    link TEXT,
+    data_busca TEXT NOT NULL,
+    PRIMARY KEY (termo, site, chave_produto)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True)
+class EventoPreco:
+    """Mudança detectada em um produto entre duas buscas"""
+
+    tipo: str
+    termo: str
+    site: str
+    chave: str
+    nome: str
+    link: Optional[str]
+    preco_anterior: Optional[float]
+    preco_atual: Optional[float]
+    # Variação relativa (-0.15 = queda de 15%); None para novos e removidos
+    variacao: Optional[float]
+    data_busca: str
+
+    @property
+    def descricao(self) -> str:
+        nome = (self.nome or self.chave)[:60]
+        if self.tipo == NOVO:
+            return f"🆕 [{self.termo} @ {self.site}] {nome}: R$ {self.preco_atual:.2f}"
+        if self.tipo == REMOVIDO:
+            return f"🗑️  [{self.termo} @ {self.site}] {nome} não foi mais encontrado"
+        icone = "📉" if self.tipo == QUEDA else "📈"
+        return (
+            f"{icone} [{self.termo} @ {self.site}] {nome}: R$ {self.preco_anterior:.2f} → "
+            f"R$ {self.preco_atual:.2f} ({self.variacao:+.1%})"
+        )
+
+    def para_dict(self) -> Dict:
+        return asdict(self)
+
+
+class SaidaWebhook:
+    """Envia os eventos de cada busca em um POST JSON: {"eventos": [...]}"""
+
+    def __init__(self, url: Optional[str] = None, timeout: float = 5):
+        """
+        Args:
+            url: Endereço que recebe os eventos (padrão: variável ALERTAS_WEBHOOK_URL)
+            timeout: Tempo máximo de cada envio em segundos
+
+        Raises:
+            ValueError: Se nenhum endereço for informado
+        """
+        self.url = url or os.environ.get("ALERTAS_WEBHOOK_URL")
+        if not self.url:
+            raise ValueError("Informe a URL do webhook ou defina ALERTAS_WEBHOOK_URL")
+        self.timeout = timeout
+
+    def enviar(self, eventos: Sequence[EventoPreco]):
+        resposta = requests.post(
+            self.url,
+            json={"eventos": [evento.para_dict() for evento in eventos]},
+            timeout=self.timeout,
+        )
+        resposta.raise_for_status()
+
+
+class SaidaLog:
+    """Registra cada evento no log"""
+
+    def enviar(self, eventos: Sequence[EventoPreco]):
+        for evento in eventos:
+            logging.info(evento.descricao)
+
+
+def saidas_padrao() -> List:
+    """SaidaWebhook se ALERTAS_WEBHOOK_URL estiver definida; senão, nenhuma saída"""
+    if os.environ.get("ALERTAS_WEBHOOK_URL"):
+        return [SaidaWebhook()]
+    return []
+
+
+class DetectorMudancas:
+    def __init__(
+        self,
+        caminho: str = "historico_precos.db",
+        saidas: Optional[Iterable] = None,
+        limiar_queda: float = 0.05,
+        limiar_alta: float = 0.05,
+    ):
+        """
+        Args:
+            caminho: Banco SQLite dos preços de referência (pode ser o do histórico)
+            saidas: Destinos dos eventos, objetos com enviar(eventos)
+                (padrão: saidas_padrao(), webhook apenas com ALERTAS_WEBHOOK_URL)
+            limiar_queda: Queda relativa mínima para um evento (0.05 = 5%)
+            limiar_alta: Alta relativa mínima para um evento
+        """
+        self.caminho = caminho
+        self.saidas = list(saidas) if saidas is not None else saidas_padrao()
+        self.limiar_queda = limiar_queda
+        self.limiar_alta = limiar_alta
+        self._local = threading.local()
+        self._conexao().executescript(_ESQUEMA)
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual (SQLite não compartilha conexões entre threads)"""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def comparar(self, termo: str, site: str, produtos: Sequence[Produto]) -> List[EventoPreco]:
+        """
+        Compara os produtos com os preços de referência e atualiza a referência
+
+        Na primeira busca de um (termo, site) os preços viram a referência sem
+        gerar eventos. O preço de referência de um produto só muda quando um
+        evento é emitido, então quedas graduais também são detectadas ao
+        somar o limiar. Buscas sem produtos não geram eventos (o site pode
+        ter falhado ou mudado de layout).
+
+        Args:
+            termo: Termo da busca
+            site: Site buscado (o mesmo nome em todas as buscas do par)
+            produtos: Produtos encontrados nesta busca
+        """
+        termo = normalizar_termo(termo)
+        atuais: Dict[str, Produto] = {}
+        for produto in produtos:
+            if produto.preco <= 0:
+                continue
+            chave = chave_produto(produto)
+            # O mesmo produto listado duas vezes conta pelo menor preço
+            if chave not in atuais or produto.preco < atuais[chave].preco:
+                atuais[chave] = produto
+        if not atuais:
+            return []
+
+        conexao = self._conexao()
+        anteriores = {
+            chave: (preco, nome, link)
+            for chave, preco, nome, link in conexao.execute(
+                "SELECT chave_produto, preco, nome, link FROM precos_referencia "
+                "WHERE termo = ? AND site = ?",
+                (termo, site),
+            )
+        }
+        primeira_busca = not anteriores
+
+        eventos: List[EventoPreco] = []
+        gravar = []
+        for chave, produto in atuais.items():
+            anterior = anteriores.pop(chave, None)
+            if anterior is None:
+                gravar.append(produto)
+                if not primeira_busca:
+                    eventos.append(self._evento(NOVO, termo, site, chave, produto, None))
+                continue
+            variacao = (produto.preco - anterior[0]) / anterior[0]
+            if variacao <= -self.limiar_queda or variacao >= self.limiar_alta:
+                gravar.append(produto)
+                tipo = QUEDA if variacao < 0 else ALTA
+                eventos.append(self._evento(tipo, termo, site, chave, produto, anterior[0]))
+
+        # O que sobrou na referência não apareceu nesta busca
+        data_busca = next(iter(atuais.values())).data_busca
+        for chave, (preco, nome, link) in anteriores.items():
+            eventos.append(
+                EventoPreco(REMOVIDO, termo, site, chave, nome, link, preco, None, None, data_busca)
+            )
+
+        with conexao:
+            conexao.executemany(
+                "INSERT OR REPLACE INTO precos_referencia "
+                "(termo, site, chave_produto, nome, preco, link, data_busca) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (termo, site, chave_produto(p), p.nome, p.preco, p.link, p.data_busca)
+                    for p in gravar
+                ],
+            )
+            conexao.executemany(
+                "DELETE FROM precos_referencia "
+                "WHERE termo = ? AND site = ? AND chave_produto = ?",
+                [(termo, site, chave) for chave in anteriores],
+            )
+        return eventos
+
+    @staticmethod
+    def _evento(
+        tipo: str, termo: str, site: str, chave: str, produto: Produto, anterior: Optional[float]
+    ) -> EventoPreco:
+        return EventoPreco(
+            tipo=tipo,
+            termo=termo,
+            site=site,
+            chave=chave,
+            nome=produto.nome,
+            link=produto.link,
+            preco_anterior=anterior,
+            preco_atual=produto.preco,
+            variacao=round((produto.preco - anterior) / anterior, 4) if anterior else None,
+            data_busca=produto.data_busca,
+        )
+
+    def publicar(self, eventos: Sequence[EventoPreco]):
+        """Envia os eventos a todas as saídas; a falha de uma saída não afeta as demais"""
+        if not eventos:
+            return
+        for saida in self.saidas:
+            try:
+                saida.enviar(eventos)
+            except Exception as e:
+                logging.warning(
+                    f"Não foi possível enviar {len(eventos)} alertas por "
+                    f"{type(saida).__name__}: {e}"
+                )
+
+    def processar(self, termo: str, site: str, produtos: Sequence[Produto]) -> List[EventoPreco]:
+        """Compara uma busca em um site e publica os eventos"""
+        eventos = self.comparar(termo, site, produtos)
+        self.publicar(eventos)
+        return eventos
+
+    def processar_resultado(self, resultado: ResultadoBusca) -> List[EventoPreco]:
+        """
+        Compara cada site de uma busca completa e publica os eventos
+
+        Sites que falharam, foram ignorados ou não responderam no prazo
+        ficam de fora, para não parecer que os seus produtos sumiram.
+        """
+        eventos: List[EventoPreco] = []
+        for estatistica, produtos in zip(
+            resultado.estatisticas_sites, resultado.produtos_por_site
+        ):
+            if estatistica.status == "ok":
+                eventos.extend(self.comparar(resultado.termo, estatistica.site, produtos))
+        self.publicar(eventos)
+        return eventos
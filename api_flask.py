@@ -3,18 +3,79 @@ API REST para servir dados de produtos
 Use esta API para integrar com seu site
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
-from buscador_precos import BuscadorPrecos
-import json
+from buscador_precos import BuscadorPrecos, normalizar_termo
+from cache_busca import CacheBusca
+from historico_precos import FORMATO_DATA, HistoricoPrecos
+from limitador import DisjuntorCircuito
+from metricas import Metricas
+from produto import para_dicts
+from serializacao import CacheRespostas, de_json, para_json_bytes
+import math
 import os
-from datetime import datetime
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 app = Flask(__name__)
 CORS(app)  # Permite requisições de outros domínios
 
+# Cache de resultados: evita refazer o scraping para buscas repetidas
+cache_busca = CacheBusca(
+    ttl=float(os.environ.get("CACHE_TTL_SEGUNDOS", 300)),
+    max_entradas=int(os.environ.get("CACHE_MAX_ENTRADAS", 128)),
+)
+
+# Prazo padrão (segundos) de /api/buscar; sites mais lentos ficam de fora da
+# resposta e terminam em segundo plano, preenchendo o cache. 0 = sem prazo
+PRAZO_BUSCA_PADRAO = float(os.environ.get("PRAZO_BUSCA_SEGUNDOS", 10))
+# Maior prazo aceito em ?prazo=N; valores acima são reduzidos a ele
+PRAZO_BUSCA_MAXIMO = float(os.environ.get("PRAZO_BUSCA_MAXIMO_SEGUNDOS", 60))
+
+# Buscas com prazo (e em fluxo) executadas ao mesmo tempo; as excedentes esperam na
+# fila e, se o prazo acabar antes de começarem, voltam sem sites
+BUSCAS_SIMULTANEAS = int(os.environ.get("BUSCAS_SIMULTANEAS", 64))
+
+# Histórico de preços: cada busca realizada nos sites é gravada
+historico = HistoricoPrecos(os.environ.get("HISTORICO_DB", "historico_precos.db"))
+
+# Tempos de cada etapa da busca, status por site e uso do cache (/api/metrics)
+metricas = Metricas()
+metricas.descrever("buscador_consultas_site_total", "Consultas aos sites por status")
+metricas.descrever("buscador_site_segundos", "Duração da consulta a cada site")
+metricas.descrever("buscador_etapa_segundos", "Duração de cada etapa da consulta a um site")
+metricas.descrever("buscador_busca_etapa_segundos", "Duração das etapas da busca como um todo")
+metricas.descrever("api_serializacao_segundos", "Montagem e serialização JSON das respostas")
+metricas.descrever("buscador_cache_consultas_total", "Consultas ao cache de resultados")
+metricas.descrever("buscador_cache_taxa_acerto", "Fração das consultas servidas pelo cache")
+metricas.descrever("buscador_cache_entradas", "Buscas guardadas no cache de resultados")
+metricas.descrever("buscador_cache_http_total", "Páginas revalidadas (304) e baixadas no cache HTTP")
+metricas.descrever("buscador_disjuntor_aberto", "1 se o disjuntor do site não está fechado")
+metricas.descrever("buscador_buscas_segundo_plano", "Buscas com prazo/em fluxo por estado")
+metricas.descrever("buscador_buscas_segundo_plano_limite", "Buscas com prazo/em fluxo simultâneas")
+metricas.descrever(
+    "buscador_buscas_prazo_na_fila_total", "Buscas cujo prazo acabou antes de começarem"
+)
+metricas.descrever("api_respostas_cache_total", "Respostas JSON reaproveitadas ou geradas")
+
+# Respostas JSON já serializadas de /api/produtos, /api/melhores e /api/carregar,
+# reaproveitadas enquanto o resultado (ou o arquivo) não muda
+respostas_serializadas = CacheRespostas(
+    max_entradas=int(os.environ.get("CACHE_RESPOSTAS_MAX", 64))
+)
+
+# Eventos de mudança de preço recebidos em /api/alertas (os mais recentes)
+alertas_recebidos = deque(maxlen=int(os.environ.get("ALERTAS_MAX", 1000)))
+
 # Instância global do buscador
-buscador = BuscadorPrecos()
+buscador = BuscadorPrecos(
+    cache=cache_busca,
+    historico=historico,
+    metricas=metricas,
+    max_buscas_segundo_plano=BUSCAS_SIMULTANEAS,
+)
 
 
 @app.route("/")
@@ -32,45 +93,189 @@ def api_status():
             "versao": "1.0",
             "endpoints": {
                 "/api/buscar/<termo>": "Busca produtos por termo",
+                "/api/buscar/<termo>/stream": "Busca em fluxo (Server-Sent Events), loja a loja",
                 "/api/produtos": "Lista todos os produtos salvos",
+                "/api/comparar": "Agrupa o mesmo produto em lojas diferentes",
                 "/api/melhores/<limite>": "Retorna os N melhores preços",
                 "/api/sites": "Lista sites configurados",
+                "/api/historico/<termo>": "Histórico de preços de um termo",
+                "/api/historico/<termo>/estatisticas": "Preço mínimo/máximo/médio no período",
+                "/api/metrics": "Métricas de desempenho no formato do Prometheus",
+                "/api/alertas": "Recebe (POST) e lista (GET) alertas de mudança de preço",
             },
+            "cache": cache_busca.estatisticas(),
         }
     )
 
 
+def ler_prazo(valor) -> Optional[float]:
+    """
+    Converte o parâmetro ?prazo= (segundos) no prazo da busca; 0 desativa o prazo
+
+    Valores inválidos, negativos ou não finitos usam o prazo padrão, e prazos
+    acima de PRAZO_BUSCA_MAXIMO são reduzidos a ele.
+    """
+    try:
+        prazo = float(valor) if valor not in (None, "") else PRAZO_BUSCA_PADRAO
+    except ValueError:
+        prazo = PRAZO_BUSCA_PADRAO
+    if not math.isfinite(prazo) or prazo < 0:
+        prazo = PRAZO_BUSCA_PADRAO
+    return min(prazo, PRAZO_BUSCA_MAXIMO) if prazo > 0 else None
+
+
+def ler_faixas(valor: Optional[str]) -> Optional[Tuple[float, ...]]:
+    """
+    Converte o parâmetro ?faixas=500,1000,2000 nos limites das faixas de preço
+
+    Raises:
+        ValueError: Se algum valor não for um número finito
+    """
+    if not valor:
+        return None
+    limites = tuple(float(parte) for parte in valor.split(",") if parte.strip())
+    if not all(math.isfinite(limite) for limite in limites):
+        raise ValueError(valor)
+    return limites
+
+
+def ler_limiar(valor: Optional[str], padrao: float = 0.6) -> float:
+    """
+    Converte o parâmetro ?limiar= (similaridade mínima entre títulos)
+
+    Raises:
+        ValueError: Se o valor não for um número em (0, 1]
+    """
+    if valor in (None, ""):
+        return padrao
+    limiar = float(valor)
+    if not 0 < limiar <= 1:
+        raise ValueError(valor)
+    return limiar
+
+
+def modo_debug() -> bool:
+    """Tempos por etapa nas respostas: com a API em modo debug ou com ?debug=1"""
+    return app.debug or request.args.get("debug") in ("1", "true")
+
+
+def tempos_busca(resultado, serializacao: Optional[float] = None) -> dict:
+    """Tempos (segundos) de cada etapa por site e da busca como um todo"""
+    tempos = {
+        "sites": {
+            e.site: e.para_dict(incluir_etapas=True)["etapas"]
+            for e in resultado.estatisticas_sites
+        },
+        "busca": {etapa: round(valor, 4) for etapa, valor in resultado.etapas.items()},
+    }
+    if serializacao is not None:
+        tempos["busca"]["serializacao"] = round(serializacao, 4)
+    return tempos
+
+
+def serializar_json(dados: dict, rota: str, serializacao_inicio: float) -> bytes:
+    """Serializa a resposta registrando o tempo de montagem + JSON no histograma da rota"""
+    corpo = para_json_bytes(dados)
+    metricas.observar(
+        "api_serializacao_segundos", time.perf_counter() - serializacao_inicio, rota=rota
+    )
+    return corpo
+
+
+def resposta_json(dados: dict, rota: str, serializacao_inicio: float) -> Response:
+    corpo = serializar_json(dados, rota, serializacao_inicio)
+    return Response(corpo, mimetype="application/json")
+
+
 @app.route("/api/buscar/<termo>")
 def buscar_produto(termo):
     """
     Busca produtos em tempo real
-    Exemplo: /api/buscar/notebook
+    Exemplo: /api/buscar/notebook ou /api/buscar/notebook?prazo=5
+    Com ?debug=1 (ou a API em modo debug) inclui os tempos de cada etapa
     """
     try:
-        produtos = buscador.buscar_produto(termo)
-
-        return jsonify(
-            {
-                "sucesso": True,
-                "termo_busca": termo,
-                "total_encontrados": len(produtos),
-                "data_busca": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "produtos": produtos,
-            }
-        )
+        resultado = buscador.buscar(termo, prazo=ler_prazo(request.args.get("prazo")))
+
+        inicio = time.perf_counter()
+        dados = {
+            "sucesso": True,
+            "termo_busca": termo,
+            "total_encontrados": len(resultado.produtos),
+            "data_busca": resultado.data_busca,
+            "parcial": resultado.parcial,
+            "sites_expirados": resultado.sites_expirados,
+            "sites": [e.para_dict() for e in resultado.estatisticas_sites],
+            "produtos": para_dicts(resultado.produtos),
+        }
+        if modo_debug():
+            # O tempo da própria serialização só é conhecido depois de serializar;
+            # aqui entra o tempo de montagem dos dados
+            dados["tempos"] = tempos_busca(resultado, time.perf_counter() - inicio)
+        return resposta_json(dados, "buscar", inicio)
 
     except Exception as e:
         return jsonify({"sucesso": False, "erro": str(e)}), 500
 
 
+def _evento_sse(evento: str, dados: dict) -> str:
+    return f"event: {evento}\ndata: {para_json_bytes(dados).decode('utf-8')}\n\n"
+
+
+@app.route("/api/buscar/<termo>/stream")
+def buscar_produto_stream(termo):
+    """
+    Busca produtos em tempo real enviando os resultados de cada loja assim que chegam
+    (Server-Sent Events). Emite um evento "site" por loja e um "resumo" final
+    com todos os produtos ordenados por preço.
+    Exemplo: /api/buscar/notebook/stream
+    """
+
+    debug = modo_debug()
+
+    def gerar():
+        try:
+            for tipo, dados in buscador.buscar_em_fluxo(termo):
+                if tipo == "site":
+                    produtos, estatistica = dados
+                    yield _evento_sse(
+                        "site",
+                        {
+                            **estatistica.para_dict(incluir_etapas=debug),
+                            "produtos": para_dicts(produtos),
+                        },
+                    )
+                else:
+                    resumo = {
+                        "sucesso": True,
+                        "termo_busca": termo,
+                        "total_encontrados": len(dados.produtos),
+                        "data_busca": dados.data_busca,
+                        "sites": [e.para_dict() for e in dados.estatisticas_sites],
+                        "produtos": para_dicts(dados.produtos),
+                    }
+                    if debug:
+                        resumo["tempos"] = tempos_busca(dados)
+                    yield _evento_sse("resumo", resumo)
+        except Exception as e:
+            yield _evento_sse("resumo", {"sucesso": False, "erro": str(e), "produtos": []})
+
+    return Response(
+        stream_with_context(gerar()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/melhores/<int:limite>")
 def melhores_precos(limite):
     """
     Retorna os N produtos com melhores preços
-    Exemplo: /api/melhores/5
+    Exemplo: /api/melhores/5 ou /api/melhores/5?termo=notebook
     """
     try:
-        if not buscador.produtos_encontrados:
+        resultado = buscador.obter_resultado(request.args.get("termo"))
+        if resultado is None:
             return (
                 jsonify(
                     {"sucesso": False, "mensagem": "Nenhuma busca realizada ainda"}
@@ -78,9 +283,21 @@ def melhores_precos(limite):
                 404,
             )
 
-        melhores = buscador.obter_melhores_precos(limite)
+        def gerar() -> bytes:
+            inicio = time.perf_counter()
+            melhores = resultado.obter_melhores_precos(limite)
+            resposta = {
+                "sucesso": True,
+                "termo_busca": resultado.termo,
+                "limite": limite,
+                "produtos": para_dicts(melhores),
+            }
+            return serializar_json(resposta, "melhores", inicio)
 
-        return jsonify({"sucesso": True, "limite": limite, "produtos": melhores})
+        corpo = respostas_serializadas.obter(
+            ("melhores", resultado.termo, limite), resultado, gerar
+        )
+        return Response(corpo, mimetype="application/json")
 
     except Exception as e:
         return jsonify({"sucesso": False, "erro": str(e)}), 500
@@ -90,9 +307,77 @@ def melhores_precos(limite):
 def listar_produtos():
     """
     Lista todos os produtos da última busca
+    Exemplo: /api/produtos ou /api/produtos?termo=notebook
+    Parâmetros opcionais:
+        ordem=site             agrupa por site (em cada site, por preço)
+        faixas=500,1000,2000   inclui os produtos separados por faixa de preço
+    """
+    try:
+        resultado = buscador.obter_resultado(request.args.get("termo"))
+        if resultado is None:
+            return (
+                jsonify(
+                    {"sucesso": False, "mensagem": "Nenhuma busca realizada ainda"}
+                ),
+                404,
+            )
+
+        ordem = request.args.get("ordem")
+        try:
+            faixas = ler_faixas(request.args.get("faixas"))
+        except ValueError:
+            return (
+                jsonify(
+                    {
+                        "sucesso": False,
+                        "mensagem": "Parâmetro faixas inválido: use números separados "
+                        "por vírgula (ex: faixas=500,1000,2000)",
+                    }
+                ),
+                400,
+            )
+
+        def gerar() -> bytes:
+            inicio = time.perf_counter()
+            if ordem == "site":
+                produtos = resultado.ordenar_por_site()
+            else:
+                produtos = resultado.produtos
+
+            resposta = {
+                "sucesso": True,
+                "termo_busca": resultado.termo,
+                "total": len(produtos),
+                "produtos": para_dicts(produtos),
+            }
+
+            if faixas:
+                resposta["faixas"] = [
+                    {"minimo": minimo, "maximo": maximo, "produtos": para_dicts(produtos_faixa)}
+                    for (minimo, maximo), produtos_faixa in resultado.agrupar_por_faixa(faixas)
+                ]
+
+            return serializar_json(resposta, "produtos", inicio)
+
+        # O resultado é imutável: enquanto não houver nova busca, os mesmos bytes servem
+        corpo = respostas_serializadas.obter(
+            ("produtos", resultado.termo, ordem, faixas), resultado, gerar
+        )
+        return Response(corpo, mimetype="application/json")
+
+    except Exception as e:
+        return jsonify({"sucesso": False, "erro": str(e)}), 500
+
+
+@app.route("/api/comparar")
+def comparar_produtos():
+    """
+    Agrupa as ofertas do mesmo produto em lojas diferentes, com a melhor oferta de cada
+    Exemplo: /api/comparar?termo=iphone 15 ou /api/comparar?termo=iphone 15&limiar=0.5
     """
     try:
-        if not buscador.produtos_encontrados:
+        termo = request.args.get("termo")
+        if buscador.obter_resultado(termo) is None:
             return (
                 jsonify(
                     {"sucesso": False, "mensagem": "Nenhuma busca realizada ainda"}
@@ -100,11 +385,27 @@ def listar_produtos():
                 404,
             )
 
+        try:
+            limiar = ler_limiar(request.args.get("limiar"))
+        except ValueError:
+            return (
+                jsonify(
+                    {
+                        "sucesso": False,
+                        "mensagem": "Parâmetro limiar inválido: use um número maior que 0 "
+                        "e até 1 (ex: limiar=0.6)",
+                    }
+                ),
+                400,
+            )
+        canonicos = buscador.agrupar_produtos(termo, limiar)
+
         return jsonify(
             {
                 "sucesso": True,
-                "total": len(buscador.produtos_encontrados),
-                "produtos": buscador.produtos_encontrados,
+                "termo_busca": termo,
+                "total_produtos": len(canonicos),
+                "produtos": [canonico.para_dict() for canonico in canonicos],
             }
         )
 
@@ -117,10 +418,16 @@ def listar_sites():
     """
     Lista todos os sites configurados
     """
+    estado_sites = buscador.estado_sites()
     sites = []
     for nome, config in buscador.sites_config.items():
         sites.append(
-            {"nome": nome, "url_busca": config["url_busca"], "ativo": config["ativo"]}
+            {
+                "nome": nome,
+                "url_busca": config["url_busca"],
+                "ativo": config["ativo"],
+                **estado_sites[nome],
+            }
         )
 
     return jsonify({"sucesso": True, "total_sites": len(sites), "sites": sites})
@@ -137,17 +444,27 @@ def carregar_arquivo(arquivo):
             arquivo += ".json"
 
         if os.path.exists(arquivo):
-            with open(arquivo, "r", encoding="utf-8") as f:
-                produtos = json.load(f)
+            estado = os.stat(arquivo)
 
-            return jsonify(
-                {
+            def gerar() -> bytes:
+                inicio = time.perf_counter()
+                with open(arquivo, "rb") as f:
+                    produtos = de_json(f.read())
+                resposta = {
                     "sucesso": True,
                     "arquivo": arquivo,
                     "total": len(produtos),
                     "produtos": produtos,
                 }
+                return serializar_json(resposta, "carregar", inicio)
+
+            # O arquivo só é lido de novo quando muda (data de modificação ou tamanho)
+            corpo = respostas_serializadas.obter(
+                ("carregar", os.path.abspath(arquivo)),
+                (estado.st_mtime_ns, estado.st_size),
+                gerar,
             )
+            return Response(corpo, mimetype="application/json")
         else:
             return (
                 jsonify(
@@ -160,6 +477,145 @@ def carregar_arquivo(arquivo):
         return jsonify({"sucesso": False, "erro": str(e)}), 500
 
 
+def _periodo_historico():
+    """Lê o período dos parâmetros ?dias=N ou ?desde=...&ate=..."""
+    desde = request.args.get("desde")
+    ate = request.args.get("ate")
+    dias = request.args.get("dias", type=float)
+    if dias is not None and not desde:
+        desde = (datetime.now() - timedelta(days=dias)).strftime(FORMATO_DATA)
+    return desde, ate
+
+
+@app.route("/api/historico/<termo>")
+def historico_precos(termo):
+    """
+    Histórico de preços de um termo, do mais recente para o mais antigo
+    Exemplo: /api/historico/notebook?dias=7&site=Amazon
+    """
+    try:
+        desde, ate = _periodo_historico()
+        observacoes = historico.historico(
+            normalizar_termo(termo),
+            site=request.args.get("site"),
+            chave=request.args.get("produto"),
+            desde=desde,
+            ate=ate,
+            limite=request.args.get("limite", 1000, type=int),
+        )
+
+        return jsonify(
+            {
+                "sucesso": True,
+                "termo_busca": termo,
+                "desde": desde,
+                "ate": ate,
+                "total": len(observacoes),
+                "observacoes": observacoes,
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"sucesso": False, "erro": str(e)}), 500
+
+
+@app.route("/api/historico/<termo>/estatisticas")
+def estatisticas_precos(termo):
+    """
+    Preço mínimo, máximo e médio de um termo no período, no geral e por site
+    Exemplo: /api/historico/notebook/estatisticas?dias=30
+    """
+    try:
+        desde, ate = _periodo_historico()
+        estatisticas = historico.estatisticas(
+            normalizar_termo(termo),
+            site=request.args.get("site"),
+            chave=request.args.get("produto"),
+            desde=desde,
+            ate=ate,
+        )
+
+        return jsonify(
+            {"sucesso": True, "termo_busca": termo, "desde": desde, "ate": ate, **estatisticas}
+        )
+
+    except Exception as e:
+        return jsonify({"sucesso": False, "erro": str(e)}), 500
+
+
+@app.route("/api/metrics")
+def exportar_metricas():
+    """
+    Métricas no formato de texto do Prometheus: histogramas de tempo por
+    site e etapa, consultas por status (erros por site), uso do cache e
+    estado dos disjuntores
+    """
+    estatisticas = cache_busca.estatisticas()
+    for resultado, campo in (("acerto", "acertos"), ("obsoleto", "obsoletos"), ("falha", "falhas")):
+        metricas.definir_contador(
+            "buscador_cache_consultas_total", estatisticas[campo], resultado=resultado
+        )
+    metricas.definir("buscador_cache_taxa_acerto", estatisticas["taxa_acerto"])
+    metricas.definir("buscador_cache_entradas", estatisticas["entradas"])
+
+    ocupacao = buscador.estado_buscas_segundo_plano()
+    metricas.definir("buscador_buscas_segundo_plano_limite", ocupacao["limite"])
+    for estado in ("em_execucao", "em_espera"):
+        metricas.definir("buscador_buscas_segundo_plano", ocupacao[estado], estado=estado)
+
+    respostas = respostas_serializadas.estatisticas()
+    for resultado, campo in (("acerto", "acertos"), ("falha", "falhas")):
+        metricas.definir_contador(
+            "api_respostas_cache_total", respostas[campo], resultado=resultado
+        )
+
+    if buscador.cache_http is not None:
+        for tipo, total in buscador.cache_http.estatisticas().items():
+            metricas.definir_contador("buscador_cache_http_total", total, tipo=tipo)
+
+    for nome_site, estado in buscador.estado_sites().items():
+        metricas.definir(
+            "buscador_disjuntor_aberto",
+            int(estado["disjuntor"]["estado"] != DisjuntorCircuito.FECHADO),
+            site=nome_site,
+        )
+
+    return Response(metricas.exportar(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/alertas", methods=["GET", "POST"])
+def alertas():
+    """
+    Receptor dos alertas de mudança de preço enviados pela automação
+    POST {"eventos": [...]} guarda os eventos; GET lista os mais recentes primeiro
+    Exemplo: /api/alertas ou /api/alertas?tipo=queda&limite=20
+    """
+    if request.method == "POST":
+        dados = request.get_json(silent=True)
+        eventos = dados.get("eventos") if isinstance(dados, dict) else None
+        if not isinstance(eventos, list):
+            return (
+                jsonify({"sucesso": False, "mensagem": "Campo eventos (lista) é obrigatório"}),
+                400,
+            )
+        if not all(isinstance(evento, dict) for evento in eventos):
+            return (
+                jsonify({"sucesso": False, "mensagem": "Cada evento deve ser um objeto"}),
+                400,
+            )
+        alertas_recebidos.extend(eventos)
+        return jsonify({"sucesso": True, "recebidos": len(eventos)})
+
+    tipo = request.args.get("tipo")
+    limite = request.args.get("limite", 100, type=int)
+    eventos = [
+        evento
+        for evento in reversed(alertas_recebidos)
+        if not tipo or evento.get("tipo") == tipo
+    ][:limite]
+    return jsonify({"sucesso": True, "total": len(eventos), "eventos": eventos})
+
+
 @app.route("/api/webhook", methods=["POST"])
 def webhook():
     """
@@ -178,17 +634,17 @@ def webhook():
                 400,
             )
 
-        produtos = buscador.buscar_produto(termo)
+        resultado = buscador.buscar(termo)
 
         # Salva automaticamente
         nome_arquivo = termo.replace(" ", "_").lower()
-        buscador.salvar_json(f"{nome_arquivo}.json")
+        buscador.salvar_json(f"{nome_arquivo}.json", resultado.produtos)
 
         return jsonify(
             {
                 "sucesso": True,
                 "termo_busca": termo,
-                "total_encontrados": len(produtos),
+                "total_encontrados": len(resultado.produtos),
                 "arquivo_salvo": f"{nome_arquivo}.json",
             }
         )
@@ -0,0 +1,104 @@
+"""
+Ponto de entrada ASGI da API
+A rota de busca roda de forma assíncrona (BuscadorPrecos.abuscar), então um
+único worker mantém centenas de buscas em andamento. As demais rotas são
+servidas pela aplicação Flask através do adaptador WSGI -> ASGI.
+
+Uso:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+"""
+
+import logging
+import time
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+from api_flask import app as app_flask, buscador, ler_prazo, metricas, tempos_busca
+from produto import para_dicts
+from serializacao import para_json_bytes
+
+PREFIXO_BUSCA = "/api/buscar/"
+
+app_wsgi = WsgiToAsgi(app_flask)
+
+
+async def _responder_json(send, status: int, dados: dict):
+    corpo = para_json_bytes(dados)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json; charset=utf-8"),
+                (b"content-length", str(len(corpo)).encode()),
+                (b"access-control-allow-origin", b"*"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": corpo})
+
+
+async def buscar_produto(scope, receive, send):
+    """
+    Busca produtos em tempo real (versão assíncrona de /api/buscar/<termo>)
+    Exemplo: /api/buscar/notebook ou /api/buscar/notebook?prazo=5
+    Com ?debug=1 (ou a API em modo debug) inclui os tempos de cada etapa
+    """
+    termo = scope["path"][len(PREFIXO_BUSCA):]
+    parametros = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    try:
+        resultado = await buscador.abuscar(
+            termo, prazo=ler_prazo(parametros.get("prazo", [None])[0])
+        )
+
+        inicio = time.perf_counter()
+        dados = {
+            "sucesso": True,
+            "termo_busca": termo,
+            "total_encontrados": len(resultado.produtos),
+            "data_busca": resultado.data_busca,
+            "parcial": resultado.parcial,
+            "sites_expirados": resultado.sites_expirados,
+            "sites": [e.para_dict() for e in resultado.estatisticas_sites],
+            "produtos": para_dicts(resultado.produtos),
+        }
+        if app_flask.debug or parametros.get("debug", [""])[0] in ("1", "true"):
+            dados["tempos"] = tempos_busca(resultado, time.perf_counter() - inicio)
+        await _responder_json(send, 200, dados)
+        metricas.observar(
+            "api_serializacao_segundos", time.perf_counter() - inicio, rota="buscar_async"
+        )
+
+    except Exception as e:
+        logging.error(f"Erro na busca assíncrona por '{termo}': {e}")
+        await _responder_json(send, 500, {"sucesso": False, "erro": str(e)})
+
+
+async def _lifespan(receive, send):
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif mensagem["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+
+    caminho = scope.get("path", "")
+    if (
+        scope["type"] == "http"
+        and scope["method"] == "GET"
+        and caminho.startswith(PREFIXO_BUSCA)
+        and "/" not in caminho[len(PREFIXO_BUSCA):]
+    ):
+        await buscar_produto(scope, receive, send)
+        return
+
+    await app_wsgi(scope, receive, send)
@@ -2,16 +2,73 @@
 Script de Automação - Executa busca de preços automaticamente
 """
 
+import os
 import schedule
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
+from typing import Optional
+from agendamento import IntervaloAdaptativo
+from alertas import DetectorMudancas
 from buscador_precos import BuscadorPrecos
+from cache_http import CacheHTTP
+from fila_tarefas import FilaSQLite, FilaTarefas, Tarefa, abrir_fila
+from historico_precos import HistoricoPrecos
+from relatorio_html import gerar_relatorios
 
 
 class AutomacaoBusca:
-    def __init__(self):
-        self.buscador = BuscadorPrecos()
+    def __init__(
+        self,
+        historico: Optional[HistoricoPrecos] = None,
+        max_workers: int = 1,
+        prazo_segundos: Optional[float] = None,
+        intervalo_por_host: float = 2.0,
+        cache_http: Optional[CacheHTTP] = None,
+        fila: Optional[FilaTarefas] = None,
+        intervalos: Optional[IntervaloAdaptativo] = None,
+        alertas: Optional[DetectorMudancas] = None,
+        arquivo_ndjson: Optional[str] = None,
+    ):
+        """
+        Args:
+            historico: Histórico onde cada execução grava os preços encontrados
+                (padrão: historico_precos.db no diretório atual)
+            max_workers: Número de termos buscados em paralelo (1 = um por vez)
+            prazo_segundos: Tempo máximo de cada execução; termos não iniciados
+                até o prazo ficam para a próxima execução
+            intervalo_por_host: Intervalo médio entre requisições ao mesmo site,
+                respeitado por todos os workers em conjunto
+            cache_http: Cache HTTP das páginas dos sites, para que páginas sem
+                alteração não sejam baixadas e processadas de novo
+                (padrão: pasta .cache_http no diretório atual)
+            fila: Fila de tarefas compartilhada com outros processos. Com ela, cada
+                execução enfileira uma tarefa por (termo, site) e as executa junto
+                com os trabalhadores que estiverem consumindo a mesma fila; os
+                preços vão para o histórico
+            intervalos: Regra do intervalo de cada (termo, site) no modo adaptativo,
+                aplicada às tarefas recorrentes executadas por esta instância
+            alertas: Detector que compara cada busca com os últimos preços e envia
+                os eventos de mudança (padrão: referências no banco do histórico e
+                webhook para ALERTAS_WEBHOOK_URL, se definida)
+            arquivo_ndjson: Arquivo NDJSON ao qual os produtos de cada busca são
+                acrescentados, uma linha por produto (padrão: variável
+                HISTORICO_NDJSON; sem ela, nada é exportado)
+        """
+        self.historico = historico or HistoricoPrecos()
+        # Um único buscador compartilhado: o intervalo por host vale para todos os workers
+        self.buscador = BuscadorPrecos(
+            historico=self.historico,
+            intervalo_por_host=intervalo_por_host,
+            cache_http=cache_http or CacheHTTP(),
+        )
         self.produtos_para_monitorar = []
+        self.max_workers = max_workers
+        self.prazo_segundos = prazo_segundos
+        self.fila = fila
+        self.intervalos = intervalos or IntervaloAdaptativo()
+        self.alertas = alertas or DetectorMudancas(self.historico.caminho)
+        self.arquivo_ndjson = arquivo_ndjson or os.environ.get("HISTORICO_NDJSON")
 
     def adicionar_produto_monitoramento(self, termo: str):
         """Adiciona produto para monitoramento automático"""
@@ -19,38 +76,257 @@ class AutomacaoBusca:
             self.produtos_para_monitorar.append(termo)
             print(f"✓ '{termo}' adicionado ao monitoramento")
 
-    def executar_busca(self):
-        """Executa busca para todos os produtos monitorados"""
-        print("\n" + "=" * 70)
-        print(f"🤖 AUTOMAÇÃO INICIADA - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
-        print("=" * 70)
+    def _buscar_termo(self, produto: str) -> bool:
+        """Busca um termo monitorado e salva o JSON. Retorna True se concluiu"""
+        try:
+            print(f"\n🔍 Buscando: {produto}")
+
+            # Busca o produto
+            resultado = self.buscador.buscar(produto)
+
+            for evento in self.alertas.processar_resultado(resultado):
+                print(evento.descricao)
+
+            if resultado.produtos:
+                # Salva arquivos
+                nome_arquivo = produto.replace(" ", "_").lower()
+                self.buscador.salvar_json(f"{nome_arquivo}.json", resultado.produtos)
+                if self.arquivo_ndjson:
+                    self.buscador.salvar_ndjson(self.arquivo_ndjson, resultado.produtos)
+
+                # Mostra melhor preço
+                melhor = resultado.produtos[0]
+                print(
+                    f"💰 [{produto}] Melhor preço: {melhor.preco_formatado} - {melhor.site}"
+                )
+            else:
+                print(f"⚠️  Nenhum resultado encontrado para '{produto}'")
+            return True
+
+        except Exception as e:
+            print(f"❌ Erro ao buscar '{produto}': {e}")
+            return False
+
+    def enfileirar_buscas(self, recorrente: bool = False) -> int:
+        """
+        Enfileira uma tarefa (termo, site) por termo monitorado e site ativo
 
+        Args:
+            recorrente: Cria tarefas que voltam para a fila ao terminar, com o
+                intervalo ajustado pela variação dos preços (modo adaptativo)
+        """
+        dados = self.intervalos.dados_iniciais() if recorrente else None
+        novas = 0
         for produto in self.produtos_para_monitorar:
+            termo, sites = self.buscador.chave_busca(produto)
+            for nome_site in sites:
+                # Tarefas ainda pendentes ou em execução não são duplicadas
+                novas += self.fila.enfileirar(termo, nome_site, dados=dados)
+        print(f"📥 {novas} tarefas enfileiradas")
+        return novas
+
+    def _executar_tarefa(self, tarefa: Tarefa) -> bool:
+        """Busca um termo em um site e encerra a tarefa na fila. Retorna True se concluiu"""
+        try:
+            with self.fila.manter_concessao(tarefa):
+                produtos, estatistica = self.buscador.buscar_site(tarefa.termo, tarefa.site)
+            status, erro = estatistica.status, estatistica.erro
+        except Exception as e:
+            produtos, status, erro = [], "erro", str(e)
+
+        # Tarefas recorrentes guardam o intervalo atual nos dados
+        recorrente = "intervalo" in tarefa.dados
+
+        if status == "ok":
             try:
-                print(f"\n🔍 Buscando: {produto}")
+                for evento in self.alertas.processar(tarefa.termo, tarefa.site, produtos):
+                    print(evento.descricao)
+            except Exception as e:
+                print(f"⚠️  Erro ao comparar preços de '{tarefa.termo}' @ {tarefa.site}: {e}")
+
+        if status in ("ok", "vazio"):
+            if produtos and self.arquivo_ndjson:
+                self.buscador.salvar_ndjson(self.arquivo_ndjson, produtos)
+            if recorrente:
+                proxima, dados = self.intervalos.proximo(tarefa.dados, produtos)
+                self.fila.concluir(tarefa, proxima_em=proxima, dados=dados)
+            else:
+                self.fila.concluir(tarefa)
+            if produtos:
+                print(
+                    f"💰 [{tarefa.termo} @ {tarefa.site}] Melhor preço: "
+                    f"{produtos[0].preco_formatado}"
+                )
+            if recorrente:
+                print(f"⏭️  [{tarefa.termo} @ {tarefa.site}] Próxima busca em {proxima / 3600:.1f}h")
+            return True
+
+        self.fila.falhar(
+            tarefa,
+            erro or status,
+            proxima_em=self.intervalos.intervalo(tarefa.dados) if recorrente else None,
+        )
+        print(
+            f"❌ [{tarefa.termo} @ {tarefa.site}] {erro or status} "
+            f"(tentativa {tarefa.tentativas} de {self.fila.max_tentativas})"
+        )
+        return False
+
+    def executar_trabalhador(
+        self,
+        parar_quando_vazia: bool = False,
+        espera_ociosa: float = 5.0,
+        limite: Optional[float] = None,
+    ) -> int:
+        """
+        Consome tarefas da fila, com max_workers threads
 
-                # Busca o produto
-                resultados = self.buscador.buscar_produto(produto)
+        Args:
+            parar_quando_vazia: Termina quando não houver tarefas disponíveis agora
+                (as que aguardam nova tentativa ficam para depois)
+            espera_ociosa: Segundos entre consultas quando a fila está vazia
+            limite: Instante (time.monotonic) em que as threads param de pegar tarefas
 
-                if resultados:
-                    # Salva arquivos
-                    nome_arquivo = produto.replace(" ", "_").lower()
-                    self.buscador.salvar_json(f"{nome_arquivo}.json")
-                    self.buscador.gerar_html(f"{nome_arquivo}.html")
+        Returns:
+            Número de tarefas concluídas
+        """
 
-                    # Mostra melhor preço
-                    melhor = resultados[0]
-                    print(
-                        f"💰 Melhor preço: {melhor['preco_formatado']} - {melhor['site']}"
-                    )
-                else:
-                    print(f"⚠️  Nenhum resultado encontrado para '{produto}'")
+        def consumir() -> int:
+            concluidas = 0
+            while limite is None or time.monotonic() < limite:
+                tarefa = self.fila.obter()
+                if tarefa is None:
+                    if parar_quando_vazia:
+                        break
+                    time.sleep(espera_ociosa)
+                    continue
+                concluidas += self._executar_tarefa(tarefa)
+            return concluidas
+
+        if self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futuros = [executor.submit(consumir) for _ in range(self.max_workers)]
+                return sum(futuro.result() for futuro in futuros)
+        return consumir()
+
+    def iniciar_trabalhador(self):
+        """
+        Executa tarefas da fila continuamente
+
+        Rode um trabalhador por processo (ou máquina, com FilaRedis) para
+        dividir as buscas enfileiradas por outros processos. O intervalo por
+        host vale dentro de cada processo.
+        """
+        print("🚀 Iniciando trabalhador da fila...")
+        print(f"📋 Tarefas na fila: {self.fila.estatisticas()}")
+        print("\nPressione Ctrl+C para parar\n")
+        try:
+            self.executar_trabalhador()
+        except KeyboardInterrupt:
+            print("\n\n⏹️  Trabalhador interrompido pelo usuário")
 
-                # Aguarda entre buscas
-                time.sleep(3)
+    def iniciar_modo_adaptativo(self):
+        """
+        Inicia o modo adaptativo: cada (termo, site) com o seu próprio intervalo
 
-            except Exception as e:
-                print(f"❌ Erro ao buscar '{produto}': {e}")
+        Termos cujos preços mudam são buscados com mais frequência e os
+        estáveis, com menos (veja IntervaloAdaptativo). Sem uma fila
+        configurada, usa fila_tarefas.db no diretório atual; outros
+        trabalhadores da mesma fila dividem as buscas.
+        """
+        if self.fila is None:
+            self.fila = FilaSQLite()
+
+        print("🚀 Iniciando modo adaptativo...")
+        print(
+            f"⏱️  Intervalo entre {self.intervalos.minimo / 3600:.2f}h e "
+            f"{self.intervalos.maximo / 3600:.0f}h, conforme a variação dos preços"
+        )
+        print(f"📋 Produtos monitorados: {len(self.produtos_para_monitorar)}")
+        self.enfileirar_buscas(recorrente=True)
+        self.iniciar_trabalhador()
+
+    def gerar_relatorios(self) -> int:
+        """
+        Gera em um único lote o relatório HTML (<termo>.html) de cada termo monitorado
+
+        Usa o último resultado de cada termo; termos sem produtos ficam de fora.
+        """
+        relatorios = []
+        for produto in self.produtos_para_monitorar:
+            resultado = self.buscador.obter_resultado(produto)
+            if resultado is None or not len(resultado):
+                continue
+            data = datetime.strptime(resultado.data_busca, "%Y-%m-%d %H:%M:%S")
+            relatorios.append(
+                (
+                    f"{produto.replace(' ', '_').lower()}.html",
+                    resultado.iterar_por_preco(),
+                    f"Melhores Preços: {produto}",
+                    data.strftime("%d/%m/%Y às %H:%M:%S"),
+                )
+            )
+        total = gerar_relatorios(relatorios)
+        print(f"📄 {total} relatórios HTML gerados")
+        return total
+
+    def _executar_sequencial(self, limite: Optional[float]) -> int:
+        concluidos = 0
+        for produto in self.produtos_para_monitorar:
+            if limite is not None and time.monotonic() >= limite:
+                break
+            # O intervalo entre requisições a cada site é controlado pelo buscador
+            concluidos += self._buscar_termo(produto)
+        return concluidos
+
+    def _executar_paralelo(self, limite: Optional[float]) -> int:
+        """
+        Busca os termos em um pool de workers
+
+        Os workers compartilham o mesmo buscador, então o intervalo mínimo
+        por site continua valendo para o conjunto. Ao atingir o prazo, os
+        termos ainda não iniciados são cancelados; os que já estão em
+        andamento terminam em segundo plano.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futuros = [
+            executor.submit(self._buscar_termo, produto)
+            for produto in self.produtos_para_monitorar
+        ]
+        restante = None if limite is None else max(0.0, limite - time.monotonic())
+        concluidos, pendentes = wait(futuros, timeout=restante)
+        for futuro in pendentes:
+            futuro.cancel()
+        executor.shutdown(wait=False)
+        return sum(1 for futuro in concluidos if futuro.result())
+
+    def executar_busca(self):
+        """Executa busca para todos os produtos monitorados"""
+        print("\n" + "=" * 70)
+        print(f"🤖 AUTOMAÇÃO INICIADA - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        print("=" * 70)
+
+        limite = (
+            time.monotonic() + self.prazo_segundos
+            if self.prazo_segundos is not None
+            else None
+        )
+        if self.fila is not None:
+            self.enfileirar_buscas()
+            concluidas = self.executar_trabalhador(parar_quando_vazia=True, limite=limite)
+            print(f"\n📋 {concluidas} tarefas concluídas; fila: {self.fila.estatisticas()}")
+        else:
+            if self.max_workers > 1:
+                concluidos = self._executar_paralelo(limite)
+            else:
+                concluidos = self._executar_sequencial(limite)
+
+            total = len(self.produtos_para_monitorar)
+            if concluidos < total:
+                print(
+                    f"\n⏱️  {total - concluidos} de {total} termos não foram concluídos nesta execução"
+                )
+            self.gerar_relatorios()
 
         print("\n" + "=" * 70)
         print(
@@ -158,6 +434,8 @@ Escolha o modo de execução:
 1 - Execução única (roda agora e para)
 2 - Modo contínuo (roda a cada X horas)
 3 - Horários fixos (roda em horários específicos)
+4 - Trabalhador da fila (executa tarefas enfileiradas por outros processos)
+5 - Modo adaptativo (cada produto e loja no seu ritmo, conforme a variação dos preços)
 
 Digite o número da opção: """,
         end="",
@@ -166,6 +444,10 @@ Digite o número da opção: """,
     try:
         opcao = input().strip()
 
+        # Com FILA_TAREFAS (arquivo SQLite ou URL redis://), as buscas são divididas
+        # com os trabalhadores iniciados pela opção 4
+        fila = abrir_fila(os.environ["FILA_TAREFAS"]) if os.environ.get("FILA_TAREFAS") else None
+
         if opcao == "1":
             exemplo_uso_basico()
         elif opcao == "2":
@@ -173,7 +455,7 @@ Digite o número da opção: """,
             horas = input().strip()
             horas = int(horas) if horas else 6
 
-            automacao = AutomacaoBusca()
+            automacao = AutomacaoBusca(fila=fila)
             # CONFIGURE AQUI SEUS PRODUTOS
             automacao.adicionar_produto_monitoramento("notebook")
             automacao.adicionar_produto_monitoramento("smartphone")
@@ -187,12 +469,23 @@ Digite o número da opção: """,
             horarios_input = input().strip()
             horarios = [h.strip() for h in horarios_input.split(",")]
 
-            automacao = AutomacaoBusca()
+            automacao = AutomacaoBusca(fila=fila)
             # CONFIGURE AQUI SEUS PRODUTOS
             automacao.adicionar_produto_monitoramento("notebook")
             automacao.adicionar_produto_monitoramento("smartphone")
 
             automacao.iniciar_horarios_fixos(horarios)
+        elif opcao == "4":
+            # Arquivo SQLite ou URL redis:// compartilhada com os outros processos
+            fila = abrir_fila(os.environ.get("FILA_TAREFAS", "fila_tarefas.db"))
+            AutomacaoBusca(fila=fila).iniciar_trabalhador()
+        elif opcao == "5":
+            automacao = AutomacaoBusca(fila=fila)
+            # CONFIGURE AQUI SEUS PRODUTOS
+            automacao.adicionar_produto_monitoramento("notebook")
+            automacao.adicionar_produto_monitoramento("smartphone")
+
+            automacao.iniciar_modo_adaptativo()
         else:
             print("❌ Opção inválida!")
 
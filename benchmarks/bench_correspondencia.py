@@ -0,0 +1,283 @@
+"""
+Benchmark da correspondência de produtos entre sites (correspondencia.py)
+
+Gera um catálogo sintético em que cada produto aparece em duas lojas com
+títulos escritos de formas diferentes (ordem das palavras, cor, "128 GB" x
+"128GB", códigos com hífen, palavras de ruído) e mede o tempo de
+agrupar_ofertas e a qualidade dos grupos (precisão e revocação por pares).
+
+Como os títulos sintéticos compartilham o código do modelo, o benchmark também
+avalia pares de títulos escritos à mão no estilo das lojas reais (mesmo produto
+com RAM/armazenamento, tela e conectividade listados de formas diferentes, e
+variantes que não podem ser agrupadas).
+
+Uso:
+    python benchmarks/bench_correspondencia.py
+    python benchmarks/bench_correspondencia.py --ofertas 1000 5000 --repeticoes 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from correspondencia import agrupar_ofertas, analisar_titulo  # noqa: E402
+from produto import Produto  # noqa: E402
+
+MARCAS = {
+    "Samsung": ("Smartphone", "Galaxy", "SM-"),
+    "Motorola": ("Smartphone", "Moto", "XT"),
+    "Dell": ("Notebook", "Inspiron", "I"),
+    "Lenovo": ("Notebook", "IdeaPad", "LN"),
+    "LG": ("Smart TV", "UHD", "UR"),
+    "Philco": ("Air Fryer", "Gourmet", "PFR"),
+}
+CAPACIDADES = ["64", "128", "256", "512"]
+CORES = ["Preto", "Azul", "Prata", "Grafite", "Verde"]
+RUIDO = ["Novo", "Lacrado", "Original", "Oferta", "Com Garantia", "Frete Grátis"]
+MEMORIAS = ["4", "6", "8"]
+
+# (título A, título B, mesmo produto?) no formato das listagens de Magalu e Amazon
+PARES_REAIS = [
+    ("Smartphone Samsung Galaxy A15 128GB 4GB RAM", "Samsung Galaxy A15 SM-A155M 128GB", True),
+    (
+        "Smartphone Samsung Galaxy A15 128GB 4GB RAM Tela 6.5\" Azul Escuro",
+        "Celular Samsung Galaxy A15 128GB 4GB RAM 6,5\" Azul Escuro",
+        True,
+    ),
+    (
+        "Smartphone Motorola Moto G84 5G 256GB 8GB RAM Grafite",
+        "Motorola Moto G84 5G 256 GB 8 GB RAM Câmera 50MP Grafite",
+        True,
+    ),
+    (
+        "Smartphone Xiaomi Redmi Note 13 256GB 8GB RAM",
+        "Xiaomi Redmi Note 13 256GB Preto",
+        True,
+    ),
+    (
+        "Notebook Dell Inspiron 15 I15-I1300-A40P Intel Core i5 8GB 512GB SSD",
+        "Notebook Dell Inspiron I15-I1300-A40P 15.6\" Core i5 8GB RAM SSD 512GB Windows 11",
+        True,
+    ),
+    (
+        "Smart TV 50\" LG 4K UHD 50UR8750PSA ThinQ AI",
+        "LG Smart TV 50UR8750PSA 50 Polegadas 4K UHD WiFi Bluetooth",
+        True,
+    ),
+    (
+        "Fritadeira Air Fryer Philco PFR15PG Gourmet 4L 1500W Preta",
+        "Air Fryer Philco Gourmet PFR15PG 4 Litros 1500W 220V",
+        True,
+    ),
+    ("Apple iPhone 15 (128 GB) - Preto", "iPhone 15 Apple 128GB Preto", True),
+    ("Samsung Galaxy A15 128GB 4GB RAM", "Samsung Galaxy A15 256GB 8GB RAM", False),
+    ("Samsung Galaxy A15 128GB 4GB RAM", "Samsung Galaxy A15 128GB 6GB RAM", False),
+    (
+        "Smartphone Motorola Moto G84 5G 256GB 8GB RAM",
+        "Smartphone Motorola Moto G54 5G 256GB 8GB RAM",
+        False,
+    ),
+    ("Apple iPhone 15 128GB Preto", "Apple iPhone 15 Pro 128GB Titânio Preto", False),
+    ("Apple iPhone 15 128GB", "Apple iPhone 14 128GB", False),
+    (
+        "Smart TV 50\" LG 4K UHD 50UR8750PSA",
+        "Smart TV 55\" LG 4K UHD 55UR8750PSA",
+        False,
+    ),
+    (
+        "Notebook Lenovo IdeaPad 1 Ryzen 5 8GB 256GB SSD",
+        "Notebook Lenovo IdeaPad 1 Ryzen 5 8GB 512GB SSD",
+        False,
+    ),
+]
+
+# Buscas inteiras: (título, produto verdadeiro). Títulos genéricos (produto None) podem
+# entrar em qualquer grupo, mas não podem ligar variantes diferentes no mesmo grupo
+GRUPOS_REAIS = [
+    [
+        ("Apple iPhone 15 128GB Preto", "iphone15-128"),
+        ("Apple iPhone 15", None),
+        ("Apple iPhone 15 256GB Preto", "iphone15-256"),
+    ],
+    [
+        ("Smartphone Samsung Galaxy A15 128GB 4GB RAM", "a15-128"),
+        ("Samsung Galaxy A15 SM-A155M 128GB", "a15-128"),
+        ("Samsung Galaxy A15", None),
+        ("Smartphone Samsung Galaxy A15 256GB 8GB RAM Azul", "a15-256"),
+        ("Celular Samsung Galaxy A15 256GB 8GB RAM", "a15-256"),
+    ],
+    [
+        ("Smart TV 50\" LG 4K UHD 50UR8750PSA ThinQ AI", "lg50"),
+        ("LG Smart TV 50UR8750PSA 50 Polegadas 4K UHD WiFi Bluetooth", "lg50"),
+        ("Smart TV LG 4K UHD ThinQ AI", None),
+        ("Smart TV 55\" LG 4K UHD 55UR8750PSA ThinQ AI", "lg55"),
+    ],
+]
+
+
+def _catalogo(total_produtos: int, semente: int):
+    aleatorio = random.Random(semente)
+    catalogo = []
+    for indice in range(total_produtos):
+        marca = aleatorio.choice(list(MARCAS))
+        categoria, linha, prefixo = MARCAS[marca]
+        codigo = f"{prefixo}{chr(65 + indice % 26)}{100 + indice}"
+        capacidade = aleatorio.choice(CAPACIDADES)
+        preco = round(aleatorio.uniform(300, 8000), 2)
+        catalogo.append((categoria, marca, linha, codigo, capacidade, preco))
+    return catalogo
+
+
+def _titulo_loja_a(categoria, marca, linha, codigo, capacidade, aleatorio):
+    # Metade dos títulos também informa a memória RAM, que a outra loja omite
+    memoria = f" {aleatorio.choice(MEMORIAS)}GB RAM" if aleatorio.random() < 0.5 else ""
+    return (
+        f"{categoria} {marca} {linha} {codigo} {capacidade}GB{memoria} "
+        f"{aleatorio.choice(CORES)}"
+    )
+
+
+def _titulo_loja_b(categoria, marca, linha, codigo, capacidade, aleatorio):
+    # Outra ordem, capacidade separada da unidade, código sem hífen e ruído
+    return (
+        f"{marca} {linha} {codigo.replace('-', '')} {categoria} {capacidade} GB "
+        f"{aleatorio.choice(RUIDO)} {aleatorio.choice(CORES)}"
+    )
+
+
+def gerar_ofertas(total_ofertas: int, semente: int = 42):
+    """Ofertas sintéticas e o produto verdadeiro de cada uma"""
+    aleatorio = random.Random(semente)
+    catalogo = _catalogo(total_ofertas // 2, semente)
+    ofertas, verdade = [], []
+    for indice, (categoria, marca, linha, codigo, capacidade, preco) in enumerate(catalogo):
+        ofertas.append(
+            Produto(
+                _titulo_loja_a(categoria, marca, linha, codigo, capacidade, aleatorio),
+                preco,
+                "Magazine Luiza",
+            )
+        )
+        ofertas.append(
+            Produto(
+                _titulo_loja_b(categoria, marca, linha, codigo, capacidade, aleatorio),
+                round(preco * aleatorio.uniform(0.9, 1.1), 2),
+                "Amazon",
+            )
+        )
+        verdade.extend([indice, indice])
+    return ofertas, verdade
+
+
+def _pares(grupos):
+    pares = set()
+    for membros in grupos:
+        pares.update(combinations(sorted(membros), 2))
+    return pares
+
+
+def avaliar(ofertas, verdade, canonicos):
+    """Precisão e revocação dos pares agrupados"""
+    posicao = {id(oferta): i for i, oferta in enumerate(ofertas)}
+    encontrados = _pares(
+        [posicao[id(oferta)] for oferta in canonico.ofertas] for canonico in canonicos
+    )
+    por_produto = defaultdict(list)
+    for i, produto in enumerate(verdade):
+        por_produto[produto].append(i)
+    esperados = _pares(por_produto.values())
+    acertos = len(encontrados & esperados)
+    precisao = acertos / len(encontrados) if encontrados else 1.0
+    revocacao = acertos / len(esperados) if esperados else 1.0
+    return precisao, revocacao
+
+
+def avaliar_pares_reais(limiar: float):
+    """Acertos de agrupamento nos pares escritos à mão, listando os erros"""
+    verdadeiros = falsos_positivos = falsos_negativos = 0
+    for titulo_a, titulo_b, mesmo in PARES_REAIS:
+        ofertas = [Produto(titulo_a, 1.0, "A"), Produto(titulo_b, 1.0, "B")]
+        agrupados = len(agrupar_ofertas(ofertas, limiar)) == 1
+        if agrupados and mesmo:
+            verdadeiros += 1
+        elif agrupados:
+            falsos_positivos += 1
+            print(f"  agrupados sem ser o mesmo produto: {titulo_a!r} x {titulo_b!r}")
+        elif mesmo:
+            falsos_negativos += 1
+            print(f"  não agrupados: {titulo_a!r} x {titulo_b!r}")
+    precisao = verdadeiros / ((verdadeiros + falsos_positivos) or 1)
+    revocacao = verdadeiros / ((verdadeiros + falsos_negativos) or 1)
+    return precisao, revocacao
+
+
+def avaliar_grupos_reais(limiar: float):
+    """Precisão e revocação por pares nas buscas escritas à mão, sem os títulos genéricos"""
+    encontrados = esperados = acertos = 0
+    for busca in GRUPOS_REAIS:
+        ofertas = [Produto(titulo, 1.0 + i, "Loja") for i, (titulo, _) in enumerate(busca)]
+        produto_real = {id(oferta): rotulo for oferta, (_, rotulo) in zip(ofertas, busca)}
+        for canonico in agrupar_ofertas(ofertas, limiar):
+            rotulos = [produto_real[id(o)] for o in canonico.ofertas if produto_real[id(o)]]
+            for a, b in combinations(rotulos, 2):
+                encontrados += 1
+                acertos += a == b
+        rotulos = [rotulo for _, rotulo in busca if rotulo]
+        esperados += sum(a == b for a, b in combinations(rotulos, 2))
+        if any(
+            len({produto_real[id(o)] for o in canonico.ofertas} - {None}) > 1
+            for canonico in agrupar_ofertas(ofertas, limiar)
+        ):
+            print(f"  produtos diferentes no mesmo grupo: {[titulo for titulo, _ in busca]}")
+    precisao = acertos / encontrados if encontrados else 1.0
+    revocacao = acertos / esperados if esperados else 1.0
+    return precisao, revocacao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--ofertas", type=int, nargs="+", default=[500, 1000, 2000, 5000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--limiar", type=float, default=0.6)
+    args = parser.parse_args()
+
+    print(
+        f"{'ofertas':>8} {'grupos':>7} {'frio (ms)':>10} {'quente (ms)':>12} "
+        f"{'precisão':>9} {'revocação':>10}"
+    )
+    for total in args.ofertas:
+        ofertas, verdade = gerar_ofertas(total)
+        frio, quente = [], []
+        for _ in range(args.repeticoes):
+            # Frio: títulos nunca vistos; quente: títulos já analisados (nova busca do termo)
+            analisar_titulo.cache_clear()
+            inicio = time.perf_counter()
+            agrupar_ofertas(ofertas, args.limiar)
+            frio.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            canonicos = agrupar_ofertas(ofertas, args.limiar)
+            quente.append(time.perf_counter() - inicio)
+        precisao, revocacao = avaliar(ofertas, verdade, canonicos)
+        print(
+            f"{len(ofertas):>8} {len(canonicos):>7} {min(frio) * 1000:>10.1f} "
+            f"{min(quente) * 1000:>12.1f} {precisao:>9.3f} {revocacao:>10.3f}"
+        )
+
+    print(f"\nPares reais escritos à mão ({len(PARES_REAIS)}):")
+    precisao, revocacao = avaliar_pares_reais(args.limiar)
+    print(f"  precisão {precisao:.3f}  revocação {revocacao:.3f}")
+
+    print(f"\nBuscas reais escritas à mão ({len(GRUPOS_REAIS)}, com títulos genéricos):")
+    precisao, revocacao = avaliar_grupos_reais(args.limiar)
+    print(f"  precisão {precisao:.3f}  revocação {revocacao:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Benchmark offline dos parsers sobre páginas salvas (fixtures)
+
+Reprocessa páginas HTML guardadas no repositório pelos parsers de cada site
+e pelo caminho completo de buscar_produto (com um servidor HTTP local no
+lugar das lojas), sem acessar a internet. Para cada caso mostra o tempo
+(mínimo e mediana), o pico de memória alocada (tracemalloc) e os produtos
+por segundo.
+
+Compara com a base em benchmarks/base_parsers.json (ou a indicada em --base,
+salva antes por --salvar-base) e termina com código 1 se algum caso ficar
+mais lento ou alocar mais que a tolerância, ou se o número de produtos
+encontrados mudar. Sem o arquivo da base termina com código 2; use
+--sem-base para apenas medir. Os tempos da base dependem da máquina: gere
+uma nova com --salvar-base antes de comparar em outro ambiente.
+
+Uso:
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --sem-base
+    python benchmarks/bench_parsers.py --salvar-base benchmarks/base_parsers.json
+    python benchmarks/bench_parsers.py --base outra_base.json --tolerancia 0.25
+    python benchmarks/bench_parsers.py --fixture amazon=debug_amazon.html
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from buscador_precos import BuscadorPrecos, detectar_verificacao_bot  # noqa: E402
+
+TERMO = "iphone"
+
+BASE_PADRAO = os.path.join(RAIZ, "benchmarks", "base_parsers.json")
+
+# (caso, site em sites_config cujo parser é usado, arquivo)
+FIXTURES = [
+    ("magazine_luiza", "magazine_luiza", os.path.join(RAIZ, "debug_magazine_luiza.html")),
+    ("amazon", "amazon", os.path.join(RAIZ, "benchmarks", "fixtures", "amazon_busca.html")),
+    # Página de verificação de bot: mede o custo de reconhecê-la e descartá-la
+    ("casas_bahia_bot", "amazon", os.path.join(RAIZ, "debug_casas_bahia.html")),
+]
+
+
+def processar_pagina(buscador: BuscadorPrecos, site: str, conteudo: bytes):
+    """Mesmo caminho de _processar_resposta, sem gravar HTML de debug"""
+    if detectar_verificacao_bot(conteudo):
+        return []
+    config = buscador.sites_config[site]
+    pagina = (
+        conteudo
+        if config.get("conteudo_bruto")
+        else buscador._criar_soup(conteudo, config)
+    )
+    return config["parser"](pagina, TERMO)
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    """Tempo de cada repetição e pico de memória de uma execução extra"""
+    produtos = funcao()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mediana = statistics.median(tempos)
+    return {
+        "produtos": len(produtos),
+        "minimo_ms": round(min(tempos) * 1000, 3),
+        "mediana_ms": round(mediana * 1000, 3),
+        "pico_kb": round(pico / 1024, 1),
+        "produtos_por_segundo": round(len(produtos) / mediana, 1) if mediana else 0.0,
+    }
+
+
+class _ServidorFixtures(BaseHTTPRequestHandler):
+    """Responde /<site>/... com o conteúdo da fixture do site"""
+
+    paginas = {}
+
+    def do_GET(self):
+        site = self.path.split("/")[1]
+        corpo = self.paginas.get(site)
+        if corpo is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def medir_ponta_a_ponta(paginas: dict, repeticoes: int) -> dict:
+    """buscar_produto completo (requisição, parsing, ordenação) contra o servidor local"""
+    _ServidorFixtures.paginas = paginas
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ServidorFixtures)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+
+    buscador = BuscadorPrecos(intervalo_por_host=0.001)
+    for nome_site, config in buscador.sites_config.items():
+        config["ativo"] = nome_site in paginas
+        config["url_busca"] = f"{base}/{nome_site}/?k="
+
+    diretorio_atual = os.getcwd()
+    # Páginas sem produtos geram debug_<site>.html no diretório atual
+    with tempfile.TemporaryDirectory() as temporario:
+        os.chdir(temporario)
+        try:
+            return medir(lambda: buscador.buscar_produto(TERMO), repeticoes)
+        finally:
+            os.chdir(diretorio_atual)
+            servidor.shutdown()
+
+
+def comparar(resultados: dict, base: dict, tolerancia: float) -> list:
+    """Lista as regressões em relação à base"""
+    regressoes = []
+    for caso, atual in resultados.items():
+        anterior = base.get(caso)
+        if anterior is None:
+            continue
+        if atual["produtos"] != anterior["produtos"]:
+            regressoes.append(
+                f"{caso}: {atual['produtos']} produtos (base: {anterior['produtos']})"
+            )
+        for metrica in ("mediana_ms", "pico_kb"):
+            limite = anterior[metrica] * (1 + tolerancia)
+            if atual[metrica] > limite:
+                regressoes.append(
+                    f"{caso}: {metrica} {atual[metrica]} > {limite:.1f} "
+                    f"(base {anterior[metrica]} + {tolerancia:.0%})"
+                )
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument(
+        "--fixture",
+        action="append",
+        default=[],
+        metavar="SITE=ARQUIVO",
+        help="Página extra para o parser do site (ex: um debug_<site>.html salvo)",
+    )
+    parser.add_argument(
+        "--base",
+        default=BASE_PADRAO,
+        help="Resultados anteriores (JSON) para comparação (padrão: %(default)s)",
+    )
+    parser.add_argument("--sem-base", action="store_true", help="Apenas mede, sem comparar")
+    parser.add_argument("--salvar-base", help="Salva os resultados desta execução (JSON)")
+    parser.add_argument(
+        "--tolerancia", type=float, default=0.25, help="Piora aceita em relação à base"
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    fixtures = list(FIXTURES)
+    for extra in args.fixture:
+        site, arquivo = extra.split("=", 1)
+        fixtures.append((f"{site}:{os.path.basename(arquivo)}", site, arquivo))
+
+    buscador = BuscadorPrecos()
+    resultados = {}
+    paginas_sites = {}
+    for caso, site, arquivo in fixtures:
+        with open(arquivo, "rb") as f:
+            conteudo = f.read()
+        resultados[caso] = medir(
+            lambda: processar_pagina(buscador, site, conteudo), args.repeticoes
+        )
+        if caso == site:
+            paginas_sites[site] = conteudo
+
+    resultados["ponta_a_ponta"] = medir_ponta_a_ponta(
+        paginas_sites, max(1, args.repeticoes // 4)
+    )
+
+    print(
+        f"{'caso':<24} {'produtos':>8} {'mín (ms)':>9} {'mediana (ms)':>13} "
+        f"{'pico (KB)':>10} {'produtos/s':>11}"
+    )
+    for caso, r in resultados.items():
+        print(
+            f"{caso:<24} {r['produtos']:>8} {r['minimo_ms']:>9.2f} {r['mediana_ms']:>13.2f} "
+            f"{r['pico_kb']:>10.1f} {r['produtos_por_segundo']:>11.1f}"
+        )
+
+    if args.salvar_base:
+        with open(args.salvar_base, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\nBase salva em '{args.salvar_base}'")
+
+    if args.sem_base or (
+        args.salvar_base and os.path.abspath(args.salvar_base) == os.path.abspath(args.base)
+    ):
+        return
+    if not os.path.exists(args.base):
+        print(
+            f"\n⚠️  Base '{args.base}' não encontrada: nada foi comparado. "
+            "Gere uma com --salvar-base ou use --sem-base"
+        )
+        sys.exit(2)
+
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    sem_base = [caso for caso in resultados if caso not in base]
+    if sem_base:
+        print(f"\n⚠️  Casos sem base (não comparados): {', '.join(sem_base)}")
+    regressoes = comparar(resultados, base, args.tolerancia)
+    if regressoes:
+        print("\n❌ Regressões:")
+        for regressao in regressoes:
+            print(f"  - {regressao}")
+        sys.exit(1)
+    print("\n✅ Sem regressões em relação à base")
+
+
+if __name__ == "__main__":
+    main()
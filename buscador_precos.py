@@ -3,16 +3,32 @@ Buscador de Produtos com Menores Preços
 Busca produtos em múltiplos sites e retorna os melhores preços
 """
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import asyncio
 import json
 import time
 from datetime import datetime
+from html.entities import codepoint2name
 from urllib.parse import urljoin
-from typing import List, Dict
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
 import re
 import logging
+import threading
 import urllib3
+from cache_busca import CacheBusca, ChamadaUnica, ChamadaUnicaAsync, ProgressoChamada
+from cache_http import CacheHTTP, EntradaHTTP
+from correspondencia import ProdutoCanonico, agrupar_ofertas
+from historico_precos import HistoricoPrecos
+from resultado_busca import ArmazemResultados, EstatisticaSite, ResultadoBusca
+from limitador import BaldeTokens, DisjuntorCircuito
+from metricas import Metricas
+from precos import limpar_preco
+from produto import Produto, como_produtos, para_dicts
+from relatorio_html import gerar_relatorio
+from serializacao import anexar_ndjson, para_json_bytes
+from transporte import ConfigTransporte, obter_cliente_async, obter_sessao
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
 # Desabilita avisos de segurança para conexões não verificadas (necessário para redes corporativas/proxies)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -21,9 +37,100 @@ logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Backend de parsing HTML padrão: lxml (muito mais rápido) quando instalado
+try:
+    import lxml  # noqa: F401
+
+    PARSER_HTML_PADRAO = "lxml"
+except ImportError:
+    PARSER_HTML_PADRAO = "html.parser"
+
+# Textos das páginas de verificação de bot. São procurados direto nos bytes da
+# resposta (UTF-8, Latin-1 e entidades HTML, em minúsculas e maiúsculas), sem
+# precisar montar a árvore HTML nem extrair o texto do documento inteiro
+_TEXTOS_VERIFICACAO_BOT = ("não é um robô", "are you a human")
+
+
+def _variantes_bytes(texto: str) -> set:
+    entidades = "".join(
+        f"&{codepoint2name[ord(c)]};" if ord(c) > 127 else c for c in texto
+    )
+    return {
+        variante.encode(codificacao)
+        for variante in (texto, texto.upper())
+        for codificacao in ("utf-8", "latin-1")
+    } | {entidades.encode("ascii")}
+
+
+# Variantes já em minúsculas ASCII: a página é convertida com bytes.lower() e as
+# variantes são procuradas como substrings (bem mais rápido que uma regex com
+# IGNORECASE em páginas de alguns MB, com o mesmo resultado)
+_VARIANTES_VERIFICACAO_BOT = tuple(
+    sorted(
+        {
+            variante.lower()
+            for texto in _TEXTOS_VERIFICACAO_BOT
+            for variante in _variantes_bytes(texto)
+        }
+    )
+)
+
+# Abertura da tag <script id="__NEXT_DATA__" ...> procurada nos bytes da resposta
+_PADRAO_NEXT_DATA = re.compile(
+    rb"""<script[^>]*\bid\s*=\s*["']?__NEXT_DATA__["']?[^>]*>""", re.IGNORECASE
+)
+
+
+def detectar_verificacao_bot(conteudo: bytes) -> bool:
+    """Verifica se o conteúdo bruto da resposta é uma página de verificação de bot"""
+    conteudo = conteudo.lower()
+    return any(variante in conteudo for variante in _VARIANTES_VERIFICACAO_BOT)
+
+
+def normalizar_termo(termo_busca: str) -> str:
+    """Normaliza o termo de busca (minúsculas, espaços simples) para uso como chave"""
+    return " ".join(termo_busca.lower().split())
+
 
 class BuscadorPrecos:
-    def __init__(self):
+    def __init__(
+        self,
+        concorrente: bool = True,
+        max_workers: int = 4,
+        intervalo_por_host: float = 2.0,
+        cache: Optional[CacheBusca] = None,
+        max_resultados: int = 256,
+        parser_html: Optional[str] = None,
+        transporte: Optional[ConfigTransporte] = None,
+        historico: Optional[HistoricoPrecos] = None,
+        limite_falhas: int = 3,
+        tempo_espera_disjuntor: float = 300,
+        cache_http: Optional[CacheHTTP] = None,
+        metricas: Optional[Metricas] = None,
+        max_buscas_segundo_plano: Optional[int] = None,
+    ):
+        """
+        Args:
+            concorrente: Se True, consulta todos os sites ativos ao mesmo tempo
+            max_workers: Número máximo de sites consultados em paralelo
+            intervalo_por_host: Intervalo médio padrão (segundos) entre requisições ao mesmo
+                site. Cada site pode sobrescrever com "requisicoes_por_segundo" e "rajada"
+            cache: Cache de resultados opcional consultado antes de buscar nos sites
+            max_resultados: Número de termos cujo último resultado fica disponível em memória
+            parser_html: Backend do BeautifulSoup ("lxml", "html.parser", "html5lib").
+                Padrão: lxml se instalado, senão html.parser
+            transporte: Configuração de pool de conexões, retentativas e HTTP/2
+            historico: Histórico de preços onde cada busca realizada nos sites é gravada
+            limite_falhas: Falhas seguidas (erro ou página de bot) que fazem um site ser ignorado
+            tempo_espera_disjuntor: Segundos em que um site com falhas seguidas fica sendo ignorado
+            cache_http: Cache em disco das páginas; as requisições passam a ser condicionais
+                (ETag / Last-Modified) e uma resposta 304 reaproveita os produtos já extraídos
+            metricas: Registro onde são acumulados os tempos de cada etapa por site e as
+                contagens de status (exportados em /api/metrics)
+            max_buscas_segundo_plano: Buscas com prazo ou em fluxo executadas ao mesmo
+                tempo; as excedentes esperam na fila e, se o prazo acabar antes de
+                começarem, voltam sem nenhum site. Padrão: max_workers * 4
+        """
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
@@ -37,12 +144,40 @@ class BuscadorPrecos:
             "Sec-Fetch-Site": "cross-site",
             "Sec-Fetch-User": "?1",
         }
-        # Cria uma sessão para persistir cookies, headers e configurações
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
-        # Define a verificação SSL como False para toda a sessão, contornando erros em redes corporativas
-        self.session.verify = False
-        self.produtos_encontrados = []
+        # Sessão compartilhada (cookies, headers, pool de conexões keep-alive) entre
+        # todas as instâncias com a mesma configuração de transporte.
+        # A verificação SSL fica desabilitada por padrão, contornando erros em redes corporativas
+        self.transporte = transporte or ConfigTransporte()
+        self.session = obter_sessao(self.transporte, self.headers)
+        # Último resultado de cada termo buscado (veja ResultadoBusca)
+        self.resultados = ArmazemResultados(max_entradas=max_resultados)
+
+        # Controle de busca concorrente
+        self.concorrente = concorrente
+        self.max_workers = max_workers
+
+        # Limitador de taxa (balde de tokens) e disjuntor por site, criados sob demanda
+        self.intervalo_por_host = intervalo_por_host
+        self.limite_falhas = limite_falhas
+        self.tempo_espera_disjuntor = tempo_espera_disjuntor
+        self._limitadores: Dict[str, BaldeTokens] = {}
+        self._disjuntores: Dict[str, DisjuntorCircuito] = {}
+        self._lock_sites = threading.Lock()
+        self.cache = cache
+        self.parser_html = parser_html or PARSER_HTML_PADRAO
+        self.historico = historico
+        self.cache_http = cache_http
+        self.metricas = metricas
+        # Buscas idênticas simultâneas compartilham um único scraping
+        self._chamada_unica = ChamadaUnica()
+        self._chamada_unica_async = ChamadaUnicaAsync()
+        # Sites já concluídos das buscas em andamento (para respostas parciais)
+        self._progresso: Dict[Tuple, ProgressoChamada] = {}
+        self._lock_progresso = threading.Lock()
+        self._executor_prazo: Optional[ThreadPoolExecutor] = None
+        self.max_buscas_segundo_plano = max_buscas_segundo_plano or max_workers * 4
+        self._buscas_em_espera = 0
+        self._buscas_em_execucao = 0
 
         # Configuração de sites - adicione novos sites aqui
         self.sites_config = {
@@ -50,15 +185,29 @@ class BuscadorPrecos:
                 "url_busca": "https://www.magazineluiza.com.br/busca/",
                 "ativo": True,
                 "parser": self._parse_magazine_luiza,
+                # O parser lê o __NEXT_DATA__ direto dos bytes da resposta
+                "conteudo_bruto": True,
             },
             "amazon": {
                 "url_busca": "https://www.amazon.com.br/s?k=",
                 "ativo": True,
                 "parser": self._parse_amazon,
+                # Monta apenas os cards de resultado, ignorando o resto da página.
+                # Regex: o SoupStrainer compara o atributo class inteiro, e os cards
+                # reais têm várias classes ("sg-col-4-of-24 s-result-item s-asin ...")
+                "filtro_html": SoupStrainer(
+                    "div", class_=re.compile(r"(?:^|\s)s-result-item(?:\s|$)")
+                ),
             },
         }
 
-    def adicionar_site(self, nome: str, url_busca: str, parser_function):
+    def adicionar_site(
+        self,
+        nome: str,
+        url_busca: str,
+        parser_function,
+        filtro_html: Optional[SoupStrainer] = None,
+    ):
         """
         Adiciona um novo site para busca de produtos
 
@@ -66,48 +215,23 @@ class BuscadorPrecos:
             nome: Nome identificador do site
             url_busca: URL base para busca de produtos
             parser_function: Função que faz o parsing da página
+            filtro_html: SoupStrainer opcional para montar só a parte relevante da página
         """
         self.sites_config[nome] = {
             "url_busca": url_busca,
             "ativo": True,
             "parser": parser_function,
+            "filtro_html": filtro_html,
         }
         logging.info(f"✓ Site '{nome}' adicionado com sucesso!")
 
     def _limpar_preco(self, preco_texto: str) -> float:
-        """Converte texto de preço em float de forma inteligente"""
-        if not preco_texto:
-            return 0.0
-        
-        try:
-            # Remove tudo exceto números, vírgula e ponto
-            p = re.sub(r"[^\d,.]", "", str(preco_texto))
-            
-            if ',' in p and '.' in p:
-                # Formato brasileiro: 1.500,76 -> 1500.76
-                p = p.replace('.', '').replace(',', '.')
-            elif ',' in p:
-                # Apenas vírgula: 150,76 -> 150.76
-                p = p.replace(',', '.')
-            elif '.' in p:
-                # Apenas ponto: pode ser 150.76 ou 1.500
-                partes = p.split('.')
-                if len(partes) > 2:
-                    # Múltiplos pontos: 1.500.000 -> 1500000
-                    p = p.replace('.', '')
-                elif len(partes[-1]) == 3:
-                    # Um ponto seguido de 3 dígitos ao FINAL: 1.500 -> 1500
-                    # Note: Exceção se for algo como 1.000 que é mil mas poderia ser 1.000 (decimal)
-                    # Em e-commerce brasileiro, ponto sozinho com 3 dígitos costuma ser mil.
-                    p = p.replace('.', '')
-                else:
-                    # Um ponto seguido de != 3 dígitos (ex: 2): 150.76 -> 150.76
-                    pass
-            
-            return float(p)
-        except Exception as e:
-            logging.warning(f"Não foi possível converter o preço: '{preco_texto}' - Erro: {e}")
-            return 0.0
+        """
+        Converte texto de preço em float de forma inteligente
+
+        Para muitos preços de uma vez, use precos.limpar_precos (mesmas regras, vetorizado)
+        """
+        return limpar_preco(preco_texto)
 
     def _extract_next_data(self, soup: BeautifulSoup) -> Dict:
         """Extrai dados do script __NEXT_DATA__ comum em sites modernos (Next.js)"""
@@ -119,15 +243,44 @@ class BuscadorPrecos:
             logging.error(f"Erro ao extrair __NEXT_DATA__: {e}")
         return {}
 
-    def _parse_magazine_luiza(
-        self, soup: BeautifulSoup, termo_busca: str
-    ) -> List[Dict]:
-        """Parser específico para Magazine Luiza"""
+    def _extract_next_data_bruto(self, conteudo: bytes) -> Dict:
+        """
+        Extrai o __NEXT_DATA__ direto dos bytes da página, sem montar a árvore HTML
+
+        Localiza a tag <script id="__NEXT_DATA__"> e decodifica apenas o JSON
+        dentro dela. Retorna {} se não encontrar ou não conseguir decodificar.
+        """
+        try:
+            abertura = _PADRAO_NEXT_DATA.search(conteudo)
+            if abertura:
+                fim = conteudo.find(b"</script", abertura.end())
+                if fim != -1:
+                    return json.loads(conteudo[abertura.end():fim])
+        except Exception as e:
+            logging.warning(f"Erro ao extrair __NEXT_DATA__ dos bytes da página: {e}")
+        return {}
+
+    def _parse_magazine_luiza(self, pagina, termo_busca: str) -> List[Produto]:
+        """
+        Parser específico para Magazine Luiza
+
+        Args:
+            pagina: Bytes da resposta (caminho rápido, sem árvore HTML) ou BeautifulSoup
+            termo_busca: Termo buscado
+        """
         produtos = []
+        data_busca = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # Só monta a árvore HTML se o caminho rápido não encontrar o JSON
+        soup = pagina if isinstance(pagina, BeautifulSoup) else None
 
         # Tenta extrair via JSON (mais confiável)
         try:
-            data = self._extract_next_data(soup)
+            data = self._extract_next_data_bruto(pagina) if soup is None else {}
+            if not data:
+                if soup is None:
+                    soup = BeautifulSoup(pagina, self.parser_html)
+                data = self._extract_next_data(soup)
             # Navega no JSON para encontrar produtos: props -> pageProps -> initialState -> search -> results -> products
             try:
                 # Tenta caminho novo (identificado no debug)
@@ -181,19 +334,18 @@ class BuscadorPrecos:
                             logging.warning(f"Link vazio para produto: {nome}")
                             link = None  # Define como None para tratamento no frontend
                             
-                        produto = {
-                            "nome": nome,
-                            "preco": (
+                        produto = Produto(
+                            nome=nome,
+                            preco=(
                                 float(preco_str)
                                 if isinstance(preco_str, (int, float))
                                 else self._limpar_preco(str(preco_str))
                             ),
-                            "preco_formatado": f"R$ {preco_str}",
-                            "site": "Magazine Luiza",
-                            "link": link,
-                            "imagem": imagem,
-                            "data_busca": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        }
+                            site="Magazine Luiza",
+                            link=link,
+                            imagem=imagem,
+                            data_busca=data_busca,
+                        )
                         produtos.append(produto)
                     except Exception:
                         continue
@@ -205,6 +357,8 @@ class BuscadorPrecos:
 
         # Fallback para HTML (se o JSON falhar)
         try:
+            if soup is None:
+                soup = BeautifulSoup(pagina, self.parser_html)
             items = soup.find_all("li", attrs={"data-testid": "product-card-container"})
             for item in items[:40]:
                 # ... (código HTML existente mantido como fallback) ...
@@ -214,9 +368,10 @@ class BuscadorPrecos:
 
         return produtos
 
-    def _parse_amazon(self, soup: BeautifulSoup, termo_busca: str) -> List[Dict]:
+    def _parse_amazon(self, soup: BeautifulSoup, termo_busca: str) -> List[Produto]:
         """Parser específico para Amazon"""
         produtos = []
+        data_busca = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         try:
             # Amazon usa divs com classe s-result-item
@@ -279,15 +434,14 @@ class BuscadorPrecos:
                         logging.warning(f"Amazon: Link vazio para produto: {nome}")
                         link = None
 
-                    produto = {
-                        "nome": nome,
-                        "preco": preco,
-                        "preco_formatado": f"R$ {preco:.2f}",
-                        "site": "Amazon",
-                        "link": link,
-                        "imagem": imagem,
-                        "data_busca": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    }
+                    produto = Produto(
+                        nome=nome,
+                        preco=preco,
+                        site="Amazon",
+                        link=link,
+                        imagem=imagem,
+                        data_busca=data_busca,
+                    )
                     produtos.append(produto)
                     
                 except Exception as e:
@@ -301,251 +455,836 @@ class BuscadorPrecos:
 
         return produtos
 
-    def buscar_produto(self, termo_busca: str) -> List[Dict]:
+    def _criar_soup(self, conteudo: bytes, config: Dict) -> BeautifulSoup:
+        """Monta a árvore HTML com o backend configurado e o filtro do site, se houver"""
+        return BeautifulSoup(
+            conteudo, self.parser_html, parse_only=config.get("filtro_html")
+        )
+
+    def _limitador_site(self, nome_site: str) -> BaldeTokens:
+        """Balde de tokens do site (criado na primeira requisição)"""
+        with self._lock_sites:
+            limitador = self._limitadores.get(nome_site)
+            if limitador is None:
+                config = self.sites_config.get(nome_site, {})
+                taxa = config.get("requisicoes_por_segundo")
+                if taxa is None:
+                    taxa = 1 / self.intervalo_por_host if self.intervalo_por_host > 0 else 0
+                limitador = BaldeTokens(taxa, config.get("rajada", 1))
+                self._limitadores[nome_site] = limitador
+            return limitador
+
+    def _disjuntor_site(self, nome_site: str) -> DisjuntorCircuito:
+        """Disjuntor do site (criado na primeira requisição)"""
+        with self._lock_sites:
+            disjuntor = self._disjuntores.get(nome_site)
+            if disjuntor is None:
+                disjuntor = DisjuntorCircuito(
+                    self.limite_falhas, self.tempo_espera_disjuntor
+                )
+                self._disjuntores[nome_site] = disjuntor
+            return disjuntor
+
+    def _registrar_status_site(self, nome_site: str, status: str, erro: Optional[str]):
+        """Atualiza o disjuntor: erros e páginas de bot contam como falha"""
+        disjuntor = self._disjuntor_site(nome_site)
+        if status in ("ok", "vazio"):
+            disjuntor.registrar_sucesso()
+        else:
+            disjuntor.registrar_falha(erro or status)
+
+    def _estatistica_ignorado(self, nome_site: str) -> EstatisticaSite:
+        logging.warning(
+            f"    - {nome_site} ignorado: muitas falhas seguidas (disjuntor aberto)"
+        )
+        estatistica = EstatisticaSite(site=nome_site, status="ignorado", erro="disjuntor aberto")
+        self._registrar_metricas_site(estatistica)
+        return estatistica
+
+    def _registrar_metricas_site(self, estatistica: EstatisticaSite):
+        """Acumula o status e os tempos de etapa da consulta a um site"""
+        if self.metricas is None:
+            return
+        self.metricas.incrementar(
+            "buscador_consultas_site_total", site=estatistica.site, status=estatistica.status
+        )
+        self.metricas.observar(
+            "buscador_site_segundos", estatistica.duracao, site=estatistica.site
+        )
+        for etapa, duracao in estatistica.etapas.items():
+            self.metricas.observar(
+                "buscador_etapa_segundos", duracao, site=estatistica.site, etapa=etapa
+            )
+
+    def estado_sites(self) -> Dict[str, Dict]:
+        """Estado do limitador de taxa e do disjuntor de cada site configurado"""
+        return {
+            nome_site: {
+                "limitador": self._limitador_site(nome_site).estado(),
+                "disjuntor": self._disjuntor_site(nome_site).estado(),
+            }
+            for nome_site in self.sites_config
+        }
+
+    def _montar_url(self, config: Dict, termo_busca: str) -> str:
+        """Monta a URL de busca do site para o termo"""
+        return config["url_busca"] + termo_busca.replace(" ", "+")
+
+    def _processar_resposta(
+        self,
+        nome_site: str,
+        config: Dict,
+        termo_busca: str,
+        status_code: int,
+        conteudo: bytes,
+        etapas: Optional[Dict[str, float]] = None,
+    ) -> Tuple[List[Produto], str, Optional[str]]:
         """
-        Busca um produto em todos os sites configurados
+        Processa a resposta de um site: verificação de bot, parsing e debug
 
         Args:
-            termo_busca: Termo para buscar (ex: "notebook dell")
+            etapas: Dicionário onde são anotados os tempos de verificacao_bot, html e parser
 
         Returns:
-            Lista de produtos encontrados ordenados por menor preço
+            Tupla (produtos, status, mensagem de erro)
         """
-        logging.info(f"Iniciando busca por '{termo_busca}'...")
-        self.produtos_encontrados = []
+        if etapas is None:
+            etapas = {}
+        if status_code != 200:
+            erro = f"Status {status_code}"
+            logging.error(f"    ✗ Erro em {nome_site}: {erro}")
+            return [], "erro", erro
+
+        # Verifica se a página é de verificação de bot antes de qualquer parsing
+        inicio = time.perf_counter()
+        bloqueado = detectar_verificacao_bot(conteudo)
+        etapas["verificacao_bot"] = time.perf_counter() - inicio
+        if bloqueado:
+            logging.warning(
+                f"    - Alerta: Página de verificação de bot detectada em {nome_site}"
+            )
+            produtos = []
+            status = "bloqueado"
+        else:
+            pagina = conteudo
+            if not config.get("conteudo_bruto"):
+                inicio = time.perf_counter()
+                pagina = self._criar_soup(conteudo, config)
+                etapas["html"] = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            # Parsers de sites adicionados podem retornar dicionários no formato JSON
+            produtos = como_produtos(config["parser"](pagina, termo_busca))
+            etapas["parser"] = time.perf_counter() - inicio
+            status = "ok" if produtos else "vazio"
+
+        logging.info(f"    ✓ {len(produtos)} produtos encontrados em {nome_site}")
+        # Se não encontrou produtos, salva o HTML para debug
+        if not produtos:
+            debug_filename = f"debug_{nome_site}.html"
+            with open(debug_filename, "wb") as f:
+                f.write(conteudo)
+            logging.warning(
+                f"    - Alerta: O parser para {nome_site} não retornou produtos. HTML salvo em '{debug_filename}' para análise."
+            )
+
+        return produtos, status, None
+
+    def _entrada_cache_http(self, url: str) -> Tuple[Optional[EntradaHTTP], Dict[str, str]]:
+        """Entrada salva da URL e os cabeçalhos condicionais correspondentes"""
+        if self.cache_http is None:
+            return None, {}
+        entrada = self.cache_http.carregar(url)
+        return entrada, self.cache_http.cabecalhos_condicionais(entrada)
+
+    def _tratar_resposta(
+        self,
+        nome_site: str,
+        config: Dict,
+        termo_busca: str,
+        url: str,
+        entrada: Optional[EntradaHTTP],
+        status_code: int,
+        cabecalhos,
+        conteudo: bytes,
+        etapas: Optional[Dict[str, float]] = None,
+    ) -> Tuple[List[Produto], str, Optional[str]]:
+        """
+        Processa a resposta considerando o cache HTTP
 
-        for nome_site, config in self.sites_config.items():
-            if not config["ativo"]:
-                continue
+        Em um 304 reaproveita os produtos da entrada salva (ou, na falta deles,
+        processa o corpo salvo); em um 200 com ETag/Last-Modified, salva o corpo
+        e os produtos extraídos para a próxima requisição condicional.
+        """
+        if status_code == 304 and entrada is not None:
+            produtos = entrada.produtos
+            if produtos is None:
+                corpo = entrada.corpo()
+                if corpo is None:
+                    return [], "erro", "Status 304 sem página em cache"
+                produtos, status, erro = self._processar_resposta(
+                    nome_site, config, termo_busca, 200, corpo, etapas
+                )
+                if status != "ok":
+                    return produtos, status, erro
+            self.cache_http.registrar_revalidacao()
+
+            data_busca = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            produtos = [
+                Produto.de_dict(produto).com_data(data_busca)
+                if isinstance(produto, dict)
+                else produto.com_data(data_busca)
+                for produto in produtos
+            ]
+            logging.info(
+                f"    ✓ {len(produtos)} produtos reaproveitados do cache HTTP em {nome_site} (304)"
+            )
+            return produtos, "ok" if produtos else "vazio", None
 
-            logging.info(f"  → Buscando em {nome_site}...")
+        produtos, status, erro = self._processar_resposta(
+            nome_site, config, termo_busca, status_code, conteudo, etapas
+        )
+        if self.cache_http is not None and status == "ok":
+            self.cache_http.salvar(url, cabecalhos, conteudo, para_dicts(produtos))
+        return produtos, status, erro
 
-            try:
-                # Monta URL de busca
-                url = config["url_busca"] + termo_busca.replace(" ", "+")
-
-                # Faz requisição usando a sessão, que já está configurada para não verificar SSL
-                response = self.session.get(url, timeout=15)
-
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, "html.parser")
-                    # Verifica se a página é de verificação de bot
-                    if (
-                        "não é um robô" in soup.text.lower()
-                        or "are you a human" in soup.text.lower()
-                    ):
-                        logging.warning(
-                            f"    - Alerta: Página de verificação de bot detectada em {nome_site}"
-                        )
-                        produtos = []
-                    else:
-                        produtos = config["parser"](soup, termo_busca)
+    def _buscar_site(
+        self, nome_site: str, config: Dict, termo_busca: str
+    ) -> Tuple[List[Produto], EstatisticaSite]:
+        """
+        Busca um produto em um único site
 
-                    self.produtos_encontrados.extend(produtos)
-                    logging.info(
-                        f"    ✓ {len(produtos)} produtos encontrados em {nome_site}"
-                    )
-                    # Se não encontrou produtos, salva o HTML para debug
-                    if not produtos:
-                        debug_filename = f"debug_{nome_site}.html"
-                        with open(debug_filename, "w", encoding="utf-8") as f:
-                            f.write(str(soup))
-                        logging.warning(
-                            f"    - Alerta: O parser para {nome_site} não retornou produtos. HTML salvo em '{debug_filename}' para análise."
-                        )
-                else:
-                    logging.error(
-                        f"    ✗ Erro em {nome_site}: Status {response.status_code}"
-                    )
+        Args:
+            nome_site: Nome identificador do site
+            config: Configuração do site em sites_config
+            termo_busca: Termo para buscar
 
-                # Aguarda entre requisições para não sobrecarregar
-                time.sleep(2)
+        Returns:
+            Tupla (produtos encontrados no site sem ordenação, estatística da consulta)
+        """
+        if not self._disjuntor_site(nome_site).permitir():
+            return [], self._estatistica_ignorado(nome_site)
 
-            except Exception as e:
-                logging.error(f"    ✗ Erro ao buscar em {nome_site}: {e}")
+        logging.info(f"  → Buscando em {nome_site}...")
+        produtos, status, erro = [], "erro", None
+        etapas: Dict[str, float] = {}
+        inicio = time.monotonic()
 
-        # Ordena por menor preço
-        self.produtos_encontrados.sort(key=lambda x: x["preco"])
+        try:
+            url = self._montar_url(config, termo_busca)
+
+            entrada, condicionais = self._entrada_cache_http(url)
+
+            marca = time.perf_counter()
+            self._limitador_site(nome_site).adquirir()
+            etapas["espera_limitador"] = time.perf_counter() - marca
+
+            marca = time.perf_counter()
+            # Faz requisição usando a sessão, que já está configurada para não verificar SSL
+            response = self.session.get(url, timeout=15, headers=condicionais)
+            etapas["requisicao"] = time.perf_counter() - marca
+            if not self.transporte.http2:
+                # No requests, elapsed vai do envio até os cabeçalhos da resposta
+                # (DNS, conexão/TLS e espera do servidor); o restante é o download do corpo
+                etapas["conexao_e_resposta"] = response.elapsed.total_seconds()
+                etapas["download"] = max(
+                    0.0, etapas["requisicao"] - etapas["conexao_e_resposta"]
+                )
 
-        return self.produtos_encontrados
+            produtos, status, erro = self._tratar_resposta(
+                nome_site,
+                config,
+                termo_busca,
+                url,
+                entrada,
+                response.status_code,
+                response.headers,
+                response.content,
+                etapas,
+            )
 
-    def obter_melhores_precos(self, limite: int = 5) -> List[Dict]:
-        """Retorna os produtos com os menores preços"""
-        return self.produtos_encontrados[:limite]
+        except Exception as e:
+            erro = str(e)
+            logging.error(f"    ✗ Erro ao buscar em {nome_site}: {e}")
+
+        self._registrar_status_site(nome_site, status, erro)
+        estatistica = EstatisticaSite(
+            site=nome_site,
+            status=status,
+            total=len(produtos),
+            duracao=time.monotonic() - inicio,
+            erro=erro,
+            etapas=etapas,
+        )
+        self._registrar_metricas_site(estatistica)
+        return produtos, estatistica
 
-    def salvar_json(self, arquivo: str = "produtos.json"):
-        """Salva os produtos encontrados em arquivo JSON"""
-        with open(arquivo, "w", encoding="utf-8") as f:
-            json.dump(self.produtos_encontrados, f, ensure_ascii=False, indent=2)
-        logging.info(f"💾 Dados salvos em '{arquivo}'")
+    async def _abuscar_site(
+        self, cliente, nome_site: str, config: Dict, termo_busca: str
+    ) -> Tuple[List[Produto], EstatisticaSite]:
+        """
+        Versão assíncrona de _buscar_site
 
-    def gerar_html(self, arquivo: str = "produtos.html"):
-        """Gera página HTML com os produtos"""
-        html = """
-<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Melhores Preços</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            min-height: 100vh;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        h1 {
-            color: white;
-            text-align: center;
-            margin-bottom: 30px;
-            font-size: 2.5em;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }
-        .produtos-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-            gap: 20px;
-        }
-        .produto-card {
-            background: white;
-            border-radius: 15px;
-            padding: 20px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }
-        .produto-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 15px 40px rgba(0,0,0,0.3);
-        }
-        .produto-nome {
-            font-size: 1.1em;
-            font-weight: bold;
-            color: #333;
-            margin-bottom: 15px;
-            min-height: 50px;
-        }
-        .produto-preco {
-            font-size: 2em;
-            color: #27ae60;
-            font-weight: bold;
-            margin: 10px 0;
-        }
-        .produto-site {
-            display: inline-block;
-            background: #3498db;
-            color: white;
-            padding: 5px 15px;
-            border-radius: 20px;
-            font-size: 0.9em;
-            margin-bottom: 10px;
-        }
-        .produto-link {
-            display: block;
-            background: #667eea;
-            color: white;
-            text-align: center;
-            padding: 12px;
-            border-radius: 8px;
-            text-decoration: none;
-            margin-top: 15px;
-            transition: background 0.3s ease;
-        }
-        .produto-link:hover {
-            background: #764ba2;
-        }
-        .data-atualizacao {
-            text-align: center;
-            color: white;
-            margin-top: 30px;
-            font-size: 0.9em;
-        }
-        .badge-melhor {
-            background: #f39c12;
-            color: white;
-            padding: 5px 10px;
-            border-radius: 5px;
-            font-size: 0.8em;
-            font-weight: bold;
-            display: inline-block;
-            margin-bottom: 10px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🏆 Melhores Preços Encontrados</h1>
-        <div class="produtos-grid">
-"""
+        A requisição usa o cliente assíncrono; o parsing (CPU) roda no
+        executor padrão para não bloquear o event loop.
+        """
+        if not self._disjuntor_site(nome_site).permitir():
+            return [], self._estatistica_ignorado(nome_site)
+
+        logging.info(f"  → Buscando em {nome_site} (async)...")
+        produtos, status, erro = [], "erro", None
+        etapas: Dict[str, float] = {}
+        inicio = time.monotonic()
 
-        for i, produto in enumerate(self.produtos_encontrados):
-            melhor_badge = (
-                '<div class="badge-melhor">⭐ MELHOR PREÇO</div>' if i == 0 else ""
+        try:
+            url = self._montar_url(config, termo_busca)
+
+            loop = asyncio.get_running_loop()
+            entrada, condicionais = await loop.run_in_executor(
+                None, self._entrada_cache_http, url
             )
 
-            imagem_html = (
-                f"""
-                <div class="produto-imagem-container">
-                    <a href="{produto['link']}" target="_blank" class="produto-imagem-link">
-                        <img src="{produto.get('imagem', '')}" alt="{produto['nome']}" class="produto-imagem">
-                    </a>
-                </div>
-            """
-                if produto.get("imagem")
-                else ""
+            espera = self._limitador_site(nome_site).reservar()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            etapas["espera_limitador"] = espera
+
+            marca = time.perf_counter()
+            response = await cliente.get(url, timeout=15, headers=condicionais)
+            etapas["requisicao"] = time.perf_counter() - marca
+
+            produtos, status, erro = await loop.run_in_executor(
+                None,
+                self._tratar_resposta,
+                nome_site,
+                config,
+                termo_busca,
+                url,
+                entrada,
+                response.status_code,
+                response.headers,
+                response.content,
+                etapas,
             )
 
-            html += f"""
-            <div class="produto-card">
-                {melhor_badge}
-                {imagem_html}
-                <div class="produto-site">{produto['site']}</div>
-                <div class="produto-nome">{produto['nome']}</div>
-                <div class="produto-preco">{produto['preco_formatado']}</div>
-                <a href="{produto['link']}" target="_blank" class="produto-link">
-                    Ver Produto →
-                </a>
-            </div>
-"""
+        except Exception as e:
+            erro = str(e)
+            logging.error(f"    ✗ Erro ao buscar em {nome_site}: {e}")
+
+        self._registrar_status_site(nome_site, status, erro)
+        estatistica = EstatisticaSite(
+            site=nome_site,
+            status=status,
+            total=len(produtos),
+            duracao=time.monotonic() - inicio,
+            erro=erro,
+            etapas=etapas,
+        )
+        self._registrar_metricas_site(estatistica)
+        return produtos, estatistica
 
-        html += f"""
-        </div>
-        <div class="data-atualizacao">
-            Última atualização: {datetime.now().strftime('%d/%m/%Y às %H:%M:%S')}
-        </div>
-    </div>
-</body>
-</html>
-"""
+    def chave_busca(self, termo_busca: str) -> Tuple[str, Tuple[str, ...]]:
+        """Chave que identifica uma busca: termo normalizado + sites ativos"""
+        sites_ativos = tuple(
+            sorted(nome for nome, config in self.sites_config.items() if config["ativo"])
+        )
+        return normalizar_termo(termo_busca), sites_ativos
+
+    def _sites_ativos(self) -> List[Tuple[str, Dict]]:
+        """Lista (nome, configuração) dos sites ativos"""
+        return [
+            (nome_site, config)
+            for nome_site, config in self.sites_config.items()
+            if config["ativo"]
+        ]
+
+    def _montar_resultado(
+        self, termo_busca: str, resultados: List[Tuple[List[Produto], EstatisticaSite]]
+    ) -> ResultadoBusca:
+        """Ordena os produtos de cada site por preço e monta o ResultadoBusca"""
+        inicio = time.perf_counter()
+        # Uma sequência ordenada por site; a intercalação é feita sob demanda
+        produtos_por_site = tuple(
+            tuple(sorted(produtos_site, key=lambda x: x.preco))
+            for produtos_site, _ in resultados
+        )
+        ordenacao = time.perf_counter() - inicio
+        self._observar_etapa_busca("ordenacao", ordenacao)
+        return ResultadoBusca(
+            termo=termo_busca,
+            data_busca=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            estatisticas_sites=tuple(estatistica for _, estatistica in resultados),
+            produtos_por_site=produtos_por_site,
+            etapas={"ordenacao": ordenacao},
+        )
 
-        # Adiciona estilos para a imagem no HTML gerado
-        html = html.replace(
-            ".produto-card:hover {",
-            """
-        .produto-imagem-container {
-            width: 100%; height: 200px; display: flex; align-items: center; justify-content: center; margin-bottom: 15px;
-        }
-        .produto-imagem-link {
-            display: flex; align-items: center; justify-content: center; width: 100%; height: 100%; text-decoration: none;
-        }
-        .produto-imagem {
-            max-width: 100%; max-height: 100%; object-fit: contain; transition: transform 0.3s ease;
-        }
-        .produto-imagem-link:hover .produto-imagem {
-            transform: scale(1.05); cursor: pointer;
-        }
-        .produto-card:hover {""",
-            1,
+    def _observar_etapa_busca(self, etapa: str, duracao: float):
+        """Registra o tempo de uma etapa da busca como um todo (ordenacao, historico, total)"""
+        if self.metricas is not None:
+            self.metricas.observar("buscador_busca_etapa_segundos", duracao, etapa=etapa)
+
+    def _registrar_historico(self, resultado: ResultadoBusca):
+        """Grava os produtos de uma busca realizada nos sites no histórico de preços"""
+        if self.historico is not None:
+            inicio = time.perf_counter()
+            self.historico.registrar(
+                normalizar_termo(resultado.termo), resultado.produtos, resultado.data_busca
+            )
+            # O resultado ainda não foi compartilhado, então as etapas podem ser completadas
+            resultado.etapas["historico"] = time.perf_counter() - inicio
+            self._observar_etapa_busca("historico", resultado.etapas["historico"])
+
+    def _finalizar_tempos(self, resultado: ResultadoBusca, inicio: float):
+        """Anota a duração total de uma busca realizada nos sites"""
+        resultado.etapas["total"] = time.perf_counter() - inicio
+        self._observar_etapa_busca("total", resultado.etapas["total"])
+
+    def _iniciar_progresso(self, chave) -> ProgressoChamada:
+        """
+        Progresso da busca em andamento com a chave (criado se ainda não existir)
+
+        Cada site concluído é anotado nele como (produtos, EstatisticaSite),
+        para respostas parciais e para buscas em fluxo que acompanham a mesma
+        busca.
+        """
+        with self._lock_progresso:
+            progresso = self._progresso.get(chave)
+            if progresso is None:
+                progresso = self._progresso[chave] = ProgressoChamada()
+        return progresso
+
+    def _finalizar_progresso(self, chave, progresso: ProgressoChamada):
+        with self._lock_progresso:
+            if self._progresso.get(chave) is progresso:
+                del self._progresso[chave]
+        progresso.encerrar()
+
+    def _resultado_parcial(
+        self, termo_busca: str, chave, erro: str = "prazo esgotado"
+    ) -> ResultadoBusca:
+        """
+        Monta um resultado com os sites que já terminaram a busca em andamento
+
+        Sites que ainda não responderam aparecem com status "expirado" e o erro informado.
+        """
+        with self._lock_progresso:
+            progresso = self._progresso.get(chave)
+        concluidos = progresso.concluidos() if progresso is not None else {}
+
+        resultados = [
+            concluidos.get(nome_site)
+            or ([], EstatisticaSite(site=nome_site, status="expirado", erro=erro))
+            for nome_site, _ in self._sites_ativos()
+        ]
+        return self._montar_resultado(termo_busca, resultados)
+
+    def _executar_busca(self, termo_busca: str) -> ResultadoBusca:
+        """
+        Consulta todos os sites ativos e monta o resultado da busca
+
+        No modo concorrente todos os sites ativos são consultados ao mesmo
+        tempo, então a latência total acompanha o site mais lento em vez da
+        soma de todos eles. Cada site concluído é anotado no progresso da
+        busca, usado para respostas parciais (veja buscar com prazo).
+        """
+        logging.info(f"Iniciando busca por '{termo_busca}'...")
+        inicio = time.perf_counter()
+
+        chave = self.chave_busca(termo_busca)
+        sites_ativos = self._sites_ativos()
+        progresso = self._iniciar_progresso(chave)
+
+        try:
+            if self.concorrente and len(sites_ativos) > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(self.max_workers, len(sites_ativos))
+                ) as executor:
+                    futuros = {
+                        executor.submit(self._buscar_site, nome_site, config, termo_busca): nome_site
+                        for nome_site, config in sites_ativos
+                    }
+                    for futuro in as_completed(futuros):
+                        progresso.anotar(futuros[futuro], futuro.result())
+            else:
+                for nome_site, config in sites_ativos:
+                    progresso.anotar(nome_site, self._buscar_site(nome_site, config, termo_busca))
+
+            resultados = [progresso[nome_site] for nome_site, _ in sites_ativos]
+        finally:
+            self._finalizar_progresso(chave, progresso)
+
+        resultado = self._montar_resultado(termo_busca, resultados)
+        self._registrar_historico(resultado)
+        self._finalizar_tempos(resultado, inicio)
+        return resultado
+
+    async def _aexecutar_busca(self, termo_busca: str) -> ResultadoBusca:
+        """Versão assíncrona de _executar_busca: todos os sites ativos em paralelo"""
+        logging.info(f"Iniciando busca assíncrona por '{termo_busca}'...")
+        inicio = time.perf_counter()
+
+        chave = self.chave_busca(termo_busca)
+        cliente = obter_cliente_async(self.transporte, self.headers)
+        progresso = self._iniciar_progresso(chave)
+
+        async def buscar_site(nome_site: str, config: Dict):
+            concluido = await self._abuscar_site(cliente, nome_site, config, termo_busca)
+            progresso.anotar(nome_site, concluido)
+            return concluido
+
+        try:
+            resultados = await asyncio.gather(
+                *(buscar_site(nome_site, config) for nome_site, config in self._sites_ativos())
+            )
+        finally:
+            self._finalizar_progresso(chave, progresso)
+
+        resultado = self._montar_resultado(termo_busca, list(resultados))
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._registrar_historico, resultado
+        )
+        self._finalizar_tempos(resultado, inicio)
+        return resultado
+
+    def _executar_busca_coalescida(self, termo_busca: str) -> ResultadoBusca:
+        """Executa a busca, reaproveitando um scraping idêntico já em andamento"""
+        return self._chamada_unica.executar(
+            self.chave_busca(termo_busca), lambda: self._executar_busca(termo_busca)
+        )
+
+    def _guardar_resultado(self, chave, resultado: ResultadoBusca):
+        """Guarda um resultado completo no cache e no armazém"""
+        if self.cache is not None:
+            self.cache.definir(chave, resultado)
+        self.resultados.salvar(chave[0], resultado)
+
+    def _buscar_e_guardar(self, termo_busca: str) -> ResultadoBusca:
+        resultado = self._executar_busca_coalescida(termo_busca)
+        self._guardar_resultado(self.chave_busca(termo_busca), resultado)
+        return resultado
+
+    def _consultar_cache(self, termo_busca: str) -> Optional[ResultadoBusca]:
+        """
+        Resultado em cache para o termo, também publicado no armazém; None se não houver
+
+        Entradas vencidas são atualizadas em segundo plano por _buscar_e_guardar,
+        então o resultado novo também chega ao armazém.
+        """
+        if self.cache is None:
+            return None
+        chave = self.chave_busca(termo_busca)
+        publicado = threading.Event()
+
+        def atualizar() -> ResultadoBusca:
+            # Espera a publicação do valor vencido abaixo para não sobrescrever o novo
+            publicado.wait()
+            return self._buscar_e_guardar(termo_busca)
+
+        try:
+            resultado = self.cache.consultar(chave, atualizar)
+            if resultado is not None:
+                self.resultados.salvar(chave[0], resultado)
+        finally:
+            publicado.set()
+        return resultado
+
+    def _executor_segundo_plano(self) -> ThreadPoolExecutor:
+        """Executor das buscas com prazo e em fluxo, que continuam após a resposta"""
+        with self._lock_progresso:
+            if self._executor_prazo is None:
+                self._executor_prazo = ThreadPoolExecutor(
+                    max_workers=self.max_buscas_segundo_plano, thread_name_prefix="busca"
+                )
+            return self._executor_prazo
+
+    def _atualizar_ocupacao(self, em_espera: int, em_execucao: int):
+        """Ajusta os contadores das buscas em segundo plano (chamado com _lock_progresso)"""
+        self._buscas_em_espera += em_espera
+        self._buscas_em_execucao += em_execucao
+        if self.metricas is not None:
+            self.metricas.definir(
+                "buscador_buscas_segundo_plano", self._buscas_em_espera, estado="em_espera"
+            )
+            self.metricas.definir(
+                "buscador_buscas_segundo_plano", self._buscas_em_execucao, estado="em_execucao"
+            )
+
+    def _submeter_segundo_plano(self, funcao: Callable[[], ResultadoBusca]) -> Future:
+        """Executa a busca no executor de segundo plano, contando as que esperam na fila"""
+
+        def executar():
+            with self._lock_progresso:
+                self._atualizar_ocupacao(-1, 1)
+            try:
+                return funcao()
+            finally:
+                with self._lock_progresso:
+                    self._atualizar_ocupacao(0, -1)
+
+        executor = self._executor_segundo_plano()
+        with self._lock_progresso:
+            self._atualizar_ocupacao(1, 0)
+        return executor.submit(executar)
+
+    def estado_buscas_segundo_plano(self) -> Dict[str, int]:
+        """Limite de buscas simultâneas em segundo plano, em execução e esperando na fila"""
+        with self._lock_progresso:
+            return {
+                "limite": self.max_buscas_segundo_plano,
+                "em_execucao": self._buscas_em_execucao,
+                "em_espera": self._buscas_em_espera,
+            }
+
+    def buscar(self, termo_busca: str, prazo: Optional[float] = None) -> ResultadoBusca:
+        """
+        Busca um produto em todos os sites configurados
+
+        Buscas simultâneas pelo mesmo termo normalizado compartilham um único
+        scraping. Se um cache estiver configurado, buscas repetidas são
+        servidas a partir dele (veja CacheBusca). O resultado também fica
+        disponível em self.resultados para consultas posteriores.
+
+        Com um prazo, a busca retorna ao fim dele apenas os sites que já
+        responderam; os demais aparecem como "expirado" em estatisticas_sites
+        e continuam em segundo plano, preenchendo o cache e o armazém quando
+        terminarem.
+
+        Args:
+            termo_busca: Termo para buscar (ex: "notebook dell")
+            prazo: Tempo máximo de resposta em segundos (None = aguarda todos os sites)
+
+        Returns:
+            ResultadoBusca imutável com os produtos ordenados por menor preço
+        """
+        chave = self.chave_busca(termo_busca)
+
+        resultado = self._consultar_cache(termo_busca)
+        if resultado is not None:
+            return resultado
+
+        if prazo is None:
+            return self._buscar_e_guardar(termo_busca)
+
+        futuro = self._submeter_segundo_plano(lambda: self._buscar_e_guardar(termo_busca))
+        try:
+            return futuro.result(timeout=prazo)
+        except FuturesTimeoutError:
+            if not futuro.running() and not futuro.done():
+                # Nenhum site foi lento: todas as vagas do executor estavam ocupadas
+                if self.metricas is not None:
+                    self.metricas.incrementar("buscador_buscas_prazo_na_fila_total")
+                logging.warning(
+                    f"Prazo de {prazo}s esgotado para '{termo_busca}' antes de a busca "
+                    f"começar: {self.max_buscas_segundo_plano} buscas já em execução "
+                    "(veja max_buscas_segundo_plano)"
+                )
+                return self._resultado_parcial(termo_busca, chave, "fila de buscas cheia")
+            parcial = self._resultado_parcial(termo_busca, chave)
+            logging.warning(
+                f"Prazo de {prazo}s esgotado para '{termo_busca}'; "
+                f"sites pendentes: {', '.join(parcial.sites_expirados)}"
+            )
+            return parcial
+
+    def buscar_site(
+        self, termo_busca: str, nome_site: str
+    ) -> Tuple[List[Produto], EstatisticaSite]:
+        """
+        Busca um produto em um único site (ex: uma tarefa da fila de buscas)
+
+        Não usa o cache nem o armazém de resultados, que guardam buscas em
+        todos os sites; os produtos encontrados são gravados no histórico.
+
+        Args:
+            termo_busca: Termo para buscar (ex: "notebook dell")
+            nome_site: Nome do site em sites_config (ex: "amazon")
+
+        Returns:
+            Tupla (produtos ordenados por menor preço, estatística da consulta)
+        """
+        if nome_site not in self.sites_config:
+            raise ValueError(f"Site '{nome_site}' não configurado")
+        produtos, estatistica = self._buscar_site(
+            nome_site, self.sites_config[nome_site], termo_busca
         )
+        produtos.sort(key=lambda x: x.preco)
+        if self.historico is not None:
+            self.historico.registrar(normalizar_termo(termo_busca), produtos)
+        return produtos, estatistica
+
+    def buscar_produto(self, termo_busca: str) -> List[Produto]:
+        """
+        Busca um produto em todos os sites configurados
+
+        Args:
+            termo_busca: Termo para buscar (ex: "notebook dell")
+
+        Returns:
+            Lista de produtos encontrados ordenados por menor preço
+        """
+        return list(self.buscar(termo_busca).produtos)
+
+    def buscar_em_fluxo(
+        self, termo_busca: str
+    ) -> Iterator[Tuple[str, object]]:
+        """
+        Busca um produto emitindo os resultados de cada site assim que ficam prontos
+
+        Gera ("site", (produtos ordenados, EstatisticaSite)) para cada site, na
+        ordem em que terminam, e por último ("resultado", ResultadoBusca). Em um
+        acerto de cache só o resultado final é emitido. A busca passa pela
+        mesma coalescência de buscar(): fluxos e buscas simultâneos pelo mesmo
+        termo acompanham um único scraping, e o resultado completo é guardado
+        no cache, no armazém e no histórico.
+
+        Args:
+            termo_busca: Termo para buscar (ex: "notebook dell")
+        """
+        chave = self.chave_busca(termo_busca)
+
+        resultado = self._consultar_cache(termo_busca)
+        if resultado is None:
+            # Acompanha a busca em andamento com a mesma chave, ou a que for iniciada aqui
+            progresso = self._iniciar_progresso(chave)
 
-        with open(arquivo, "w", encoding="utf-8") as f:
-            f.write(html)
-        logging.info(f"📄 HTML gerado em '{arquivo}'")
+            def buscar_e_encerrar():
+                try:
+                    return self._buscar_e_guardar(termo_busca)
+                finally:
+                    # Se esta chamada só aguardou uma busca que já estava terminando,
+                    # o progresso criado acima não recebe sites e precisa ser encerrado
+                    self._finalizar_progresso(chave, progresso)
+
+            # Se o consumidor desistir, a busca termina sozinha e preenche o cache
+            futuro = self._submeter_segundo_plano(buscar_e_encerrar)
+            for _, (produtos, estatistica) in progresso.acompanhar():
+                yield "site", (sorted(produtos, key=lambda x: x.preco), estatistica)
+            resultado = futuro.result()
+
+        yield "resultado", resultado
+
+    async def abuscar(
+        self, termo_busca: str, prazo: Optional[float] = None
+    ) -> ResultadoBusca:
+        """
+        Versão assíncrona de buscar, para uso em servidores ASGI
+
+        Usa o mesmo cache e o mesmo armazém de resultados da versão síncrona.
+        Buscas assíncronas simultâneas pelo mesmo termo compartilham uma única
+        execução; a atualização de entradas vencidas do cache continua
+        acontecendo em segundo plano pela versão síncrona. O prazo funciona
+        como em buscar.
+
+        Args:
+            termo_busca: Termo para buscar (ex: "notebook dell")
+            prazo: Tempo máximo de resposta em segundos (None = aguarda todos os sites)
+
+        Returns:
+            ResultadoBusca imutável com os produtos ordenados por menor preço
+        """
+        chave = self.chave_busca(termo_busca)
+
+        resultado = self._consultar_cache(termo_busca)
+        if resultado is not None:
+            return resultado
+
+        async def buscar_e_guardar():
+            resultado = await self._aexecutar_busca(termo_busca)
+            self._guardar_resultado(chave, resultado)
+            return resultado
+
+        # A tarefa compartilhada é protegida contra cancelamento: ao fim do
+        # prazo ela continua e preenche o cache
+        execucao = self._chamada_unica_async.executar(chave, buscar_e_guardar)
+        if prazo is None:
+            return await execucao
+        try:
+            return await asyncio.wait_for(execucao, prazo)
+        except asyncio.TimeoutError:
+            parcial = self._resultado_parcial(termo_busca, chave)
+            logging.warning(
+                f"Prazo de {prazo}s esgotado para '{termo_busca}'; "
+                f"sites pendentes: {', '.join(parcial.sites_expirados)}"
+            )
+            return parcial
+
+    async def abuscar_produto(self, termo_busca: str) -> List[Produto]:
+        """Versão assíncrona de buscar_produto"""
+        return list((await self.abuscar(termo_busca)).produtos)
+
+    def obter_resultado(self, termo_busca: Optional[str] = None) -> Optional[ResultadoBusca]:
+        """Retorna o último resultado do termo informado, ou da busca mais recente"""
+        chave = normalizar_termo(termo_busca) if termo_busca else None
+        return self.resultados.obter(chave)
+
+    @property
+    def produtos_encontrados(self) -> List[Produto]:
+        """Produtos da busca mais recente"""
+        resultado = self.resultados.obter()
+        return list(resultado.produtos) if resultado is not None else []
+
+    def obter_melhores_precos(
+        self, limite: int = 5, termo_busca: Optional[str] = None
+    ) -> List[Produto]:
+        """Retorna os produtos com os menores preços do termo (ou da busca mais recente)"""
+        resultado = self.obter_resultado(termo_busca)
+        return resultado.obter_melhores_precos(limite) if resultado is not None else []
+
+    def agrupar_produtos(
+        self, termo_busca: Optional[str] = None, limiar: float = 0.6
+    ) -> List[ProdutoCanonico]:
+        """
+        Agrupa as ofertas do mesmo produto em sites diferentes (veja correspondencia.py)
+
+        Returns:
+            Produtos canônicos ordenados pelo preço da melhor oferta
+        """
+        resultado = self.obter_resultado(termo_busca)
+        if resultado is None:
+            return []
+        return agrupar_ofertas(resultado.produtos, limiar)
+
+    def salvar_json(
+        self, arquivo: str = "produtos.json", produtos: Optional[List[Produto]] = None
+    ):
+        """Salva os produtos informados (ou os da busca mais recente) em arquivo JSON"""
+        if produtos is None:
+            produtos = self.produtos_encontrados
+        with open(arquivo, "wb") as f:
+            f.write(para_json_bytes(para_dicts(produtos), indentar=True))
+        logging.info(f"💾 Dados salvos em '{arquivo}'")
+
+    def salvar_ndjson(
+        self, arquivo: str = "produtos.ndjson", produtos: Optional[Iterable[Produto]] = None
+    ) -> int:
+        """
+        Acrescenta os produtos informados (ou os da busca mais recente) a um arquivo NDJSON
+
+        Cada produto vira uma linha JSON no fim do arquivo, sem reler o que
+        já foi gravado, então o arquivo pode acumular o histórico de todas
+        as execuções.
+
+        Returns:
+            Número de produtos gravados
+        """
+        if produtos is None:
+            produtos = self.produtos_encontrados
+        total = anexar_ndjson(arquivo, (produto.para_dict() for produto in produtos))
+        logging.info(f"💾 {total} produtos acrescentados a '{arquivo}'")
+        return total
+
+    def gerar_html(
+        self, arquivo: str = "produtos.html", produtos: Optional[Iterable[Produto]] = None
+    ):
+        """
+        Gera página HTML com os produtos informados (ou os da busca mais recente)
+
+        A página é renderizada pelo template templates/relatorio.html e gravada
+        à medida que é gerada (veja relatorio_html.gerar_relatorio).
+        """
+        if produtos is None:
+            resultado = self.resultados.obter()
+            produtos = resultado.iterar_por_preco() if resultado is not None else []
+        gerar_relatorio(arquivo, produtos)
 
 
 def exemplo_uso():
@@ -567,10 +1306,10 @@ def exemplo_uso():
 
     melhores = buscador.obter_melhores_precos(5)
     for i, produto in enumerate(melhores, 1):
-        logging.info(f"\n{i}º Lugar - {produto['site']}")
-        logging.info(f"   Produto: {produto['nome'][:50]}...")
-        logging.info(f"   Preço: {produto['preco_formatado']}")
-        logging.info(f"   Link: {produto['link'][:60]}...")
+        logging.info(f"\n{i}º Lugar - {produto.site}")
+        logging.info(f"   Produto: {produto.nome[:50]}...")
+        logging.info(f"   Preço: {produto.preco_formatado}")
+        logging.info(f"   Link: {produto.link[:60]}...")
 
     # Salva em JSON
     buscador.salvar_json("produtos.json")
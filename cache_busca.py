@@ -0,0 +1,287 @@
+"""
+Cache de resultados de busca
+Mantém os resultados recentes em memória com TTL, descarte LRU e
+atualização em segundo plano de entradas vencidas (stale-while-revalidate)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class _EntradaCache:
+    __slots__ = ("valor", "criado_em")
+
+    def __init__(self, valor: Any, criado_em: float):
+        self.valor = valor
+        self.criado_em = criado_em
+
+
+class CacheBusca:
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entradas: int = 128,
+        max_idade_obsoleta: Optional[float] = 24 * 3600,
+        armazenar_vazios: bool = False,
+    ):
+        """
+        Args:
+            ttl: Tempo (segundos) em que uma entrada é considerada atual
+            max_entradas: Número máximo de entradas antes de descartar a menos usada
+            max_idade_obsoleta: Idade máxima (segundos) em que uma entrada vencida ainda
+                pode ser servida enquanto é atualizada. None = sem limite
+            armazenar_vazios: Se False, resultados vazios (ex: bloqueio de bot) não são guardados
+        """
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_idade_obsoleta = max_idade_obsoleta
+        self.armazenar_vazios = armazenar_vazios
+
+        self._entradas: "OrderedDict[Hashable, _EntradaCache]" = OrderedDict()
+        self._atualizando = set()
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.obsoletos = 0
+        self.falhas = 0
+
+    def _buscar_entrada(self, chave: Hashable) -> Optional[_EntradaCache]:
+        """Retorna a entrada (marcando-a como usada recentemente) ou None"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas.move_to_end(chave)
+            return entrada
+
+    def definir(self, chave: Hashable, valor: Any):
+        """Armazena um valor, descartando as entradas menos usadas se necessário"""
+        if not valor and not self.armazenar_vazios:
+            return
+        with self._lock:
+            self._entradas[chave] = _EntradaCache(valor, time.monotonic())
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, chave: Optional[Hashable] = None):
+        """Remove uma entrada específica, ou todas se nenhuma chave for informada"""
+        with self._lock:
+            if chave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(chave, None)
+
+    def consultar(self, chave: Hashable, carregar: Callable[[], Any]) -> Optional[Any]:
+        """
+        Retorna o valor em cache para a chave, sem carregá-lo em caso de falha
+
+        Entradas dentro do TTL são devolvidas imediatamente. Entradas vencidas
+        (mas dentro de max_idade_obsoleta) também são devolvidas, e uma
+        atualização com `carregar` é disparada em segundo plano. Sem entrada
+        utilizável, retorna None.
+
+        Args:
+            chave: Chave da entrada
+            carregar: Função sem argumentos que produz o valor atualizado
+        """
+        entrada = self._buscar_entrada(chave)
+
+        if entrada is not None:
+            idade = time.monotonic() - entrada.criado_em
+            if idade <= self.ttl:
+                self.acertos += 1
+                return entrada.valor
+            if self.max_idade_obsoleta is None or idade <= self.max_idade_obsoleta:
+                self.obsoletos += 1
+                self._atualizar_em_segundo_plano(chave, carregar)
+                return entrada.valor
+
+        self.falhas += 1
+        return None
+
+    def _atualizar_em_segundo_plano(self, chave: Hashable, carregar: Callable[[], Any]):
+        """Dispara uma única atualização em segundo plano por chave"""
+        with self._lock:
+            if chave in self._atualizando:
+                return
+            self._atualizando.add(chave)
+
+        def _atualizar():
+            try:
+                self.definir(chave, carregar())
+            except Exception as e:
+                logging.error(f"Erro ao atualizar cache para {chave}: {e}")
+            finally:
+                with self._lock:
+                    self._atualizando.discard(chave)
+
+        threading.Thread(target=_atualizar, daemon=True).start()
+
+    def estatisticas(self) -> Dict:
+        """Retorna contadores de uso do cache"""
+        total = self.acertos + self.obsoletos + self.falhas
+        return {
+            "entradas": len(self._entradas),
+            "max_entradas": self.max_entradas,
+            "ttl": self.ttl,
+            "acertos": self.acertos,
+            "obsoletos": self.obsoletos,
+            "falhas": self.falhas,
+            "taxa_acerto": (self.acertos + self.obsoletos) / total if total else 0.0,
+        }
+
+
+class _ChamadaEmAndamento:
+    __slots__ = ("evento", "resultado", "erro")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class ChamadaUnica:
+    """
+    Coalescência de chamadas idênticas (single-flight)
+
+    Chamadores concorrentes com a mesma chave compartilham uma única
+    execução: o primeiro executa a função e os demais aguardam e recebem
+    o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._em_andamento: Dict[Hashable, _ChamadaEmAndamento] = {}
+        self._lock = threading.Lock()
+        self.execucoes = 0
+        self.coalescidas = 0
+
+    def executar(self, chave: Hashable, funcao: Callable[[], Any]) -> Any:
+        """
+        Executa a função para a chave, ou aguarda a execução já em andamento
+
+        Args:
+            chave: Chave que identifica chamadas equivalentes
+            funcao: Função sem argumentos a executar
+        """
+        with self._lock:
+            chamada = self._em_andamento.get(chave)
+            if chamada is not None:
+                self.coalescidas += 1
+                lider = False
+            else:
+                chamada = _ChamadaEmAndamento()
+                self._em_andamento[chave] = chamada
+                self.execucoes += 1
+                lider = True
+
+        if not lider:
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = funcao()
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+            chamada.evento.set()
+
+        return chamada.resultado
+
+
+class ChamadaUnicaAsync:
+    """
+    Versão assíncrona de ChamadaUnica
+
+    Corrotinas concorrentes com a mesma chave, no mesmo event loop, aguardam
+    uma única tarefa. O cancelamento de um dos chamadores não cancela a
+    tarefa compartilhada.
+    """
+
+    def __init__(self):
+        self._em_andamento: Dict[Hashable, "asyncio.Future"] = {}
+        self.execucoes = 0
+        self.coalescidas = 0
+
+    async def executar(
+        self, chave: Hashable, funcao: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Executa a corrotina para a chave, ou aguarda a execução já em andamento
+
+        Args:
+            chave: Chave que identifica chamadas equivalentes
+            funcao: Função sem argumentos que retorna a corrotina a executar
+        """
+        # Tarefas pertencem a um event loop; a chave inclui o loop atual
+        chave_loop = (id(asyncio.get_running_loop()), chave)
+
+        tarefa = self._em_andamento.get(chave_loop)
+        if tarefa is not None:
+            self.coalescidas += 1
+        else:
+            tarefa = asyncio.ensure_future(funcao())
+            self._em_andamento[chave_loop] = tarefa
+            self.execucoes += 1
+            tarefa.add_done_callback(
+                lambda _: self._em_andamento.pop(chave_loop, None)
+            )
+
+        return await asyncio.shield(tarefa)
+
+
+class ProgressoChamada:
+    """
+    Resultados parciais de uma execução em andamento (ex: os sites de uma busca)
+
+    O executor anota cada parte concluída; outros chamadores podem consultar
+    as partes prontas ou acompanhá-las à medida que chegam, até o fim da
+    execução.
+    """
+
+    def __init__(self):
+        self._partes: Dict[Hashable, Any] = {}
+        self._condicao = threading.Condition()
+        self.encerrado = False
+
+    def anotar(self, nome: Hashable, valor: Any):
+        with self._condicao:
+            self._partes[nome] = valor
+            self._condicao.notify_all()
+
+    def encerrar(self):
+        """Marca o fim da execução (com sucesso ou erro), liberando quem acompanha"""
+        with self._condicao:
+            self.encerrado = True
+            self._condicao.notify_all()
+
+    def __getitem__(self, nome: Hashable) -> Any:
+        with self._condicao:
+            return self._partes[nome]
+
+    def concluidos(self) -> Dict[Hashable, Any]:
+        """Cópia das partes já concluídas"""
+        with self._condicao:
+            return dict(self._partes)
+
+    def acompanhar(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Gera (nome, valor) de cada parte, na ordem de conclusão, até o fim da execução"""
+        emitidos = 0
+        while True:
+            with self._condicao:
+                while emitidos == len(self._partes) and not self.encerrado:
+                    self._condicao.wait()
+                novos = list(self._partes.items())[emitidos:]
+                encerrado = self.encerrado
+            yield from novos
+            emitidos += len(novos)
+            if encerrado and not novos:
+                return
@@ -0,0 +1,155 @@
+"""
+Cache HTTP em disco para as páginas de busca dos sites
+Guarda, por URL, os validadores (ETag / Last-Modified), o corpo comprimido
+e a lista de produtos já extraída. Nas próximas buscas a requisição é feita
+de forma condicional; se o site responder 304 (não modificado), os produtos
+salvos são reaproveitados sem baixar nem processar a página de novo.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Mapping, Optional
+
+
+class EntradaHTTP:
+    __slots__ = ("url", "etag", "last_modified", "salvo_em", "produtos", "_caminho_corpo")
+
+    def __init__(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        salvo_em: float,
+        produtos: Optional[List[Dict]],
+        caminho_corpo: str,
+    ):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.salvo_em = salvo_em
+        self.produtos = produtos
+        self._caminho_corpo = caminho_corpo
+
+    def corpo(self) -> Optional[bytes]:
+        """Corpo da página salvo (descomprimido), ou None se indisponível"""
+        try:
+            with gzip.open(self._caminho_corpo, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+class CacheHTTP:
+    def __init__(self, diretorio: str = ".cache_http", nivel_compressao: int = 6):
+        """
+        Args:
+            diretorio: Pasta onde as entradas são gravadas
+            nivel_compressao: Nível do gzip usado nos corpos (1 = mais rápido, 9 = menor)
+        """
+        self.diretorio = diretorio
+        self.nivel_compressao = nivel_compressao
+        os.makedirs(diretorio, exist_ok=True)
+
+        # Respostas 304 reaproveitadas e páginas completas salvas
+        self.revalidados = 0
+        self.baixados = 0
+        self._lock = threading.Lock()
+
+    def _base(self, url: str) -> str:
+        return os.path.join(self.diretorio, hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def _gravar_atomico(self, caminho: str, dados: bytes):
+        """Grava em arquivo temporário e renomeia, para leitores nunca verem meio arquivo"""
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio)
+        try:
+            with os.fdopen(descritor, "wb") as f:
+                f.write(dados)
+            os.replace(temporario, caminho)
+        except OSError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def carregar(self, url: str) -> Optional[EntradaHTTP]:
+        """Retorna a entrada salva para a URL, ou None"""
+        base = self._base(url)
+        try:
+            with open(base + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return EntradaHTTP(
+            url=url,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            salvo_em=meta.get("salvo_em", 0.0),
+            produtos=meta.get("produtos"),
+            caminho_corpo=base + ".html.gz",
+        )
+
+    @staticmethod
+    def cabecalhos_condicionais(entrada: Optional[EntradaHTTP]) -> Dict[str, str]:
+        """Cabeçalhos If-None-Match / If-Modified-Since para revalidar a entrada"""
+        cabecalhos = {}
+        if entrada is not None:
+            if entrada.etag:
+                cabecalhos["If-None-Match"] = entrada.etag
+            if entrada.last_modified:
+                cabecalhos["If-Modified-Since"] = entrada.last_modified
+        return cabecalhos
+
+    def salvar(
+        self,
+        url: str,
+        cabecalhos: Mapping[str, str],
+        corpo: bytes,
+        produtos: Optional[List[Dict]],
+    ) -> bool:
+        """
+        Salva a resposta se ela tiver validadores (ETag ou Last-Modified)
+
+        Returns:
+            True se a resposta foi salva
+        """
+        etag = cabecalhos.get("ETag")
+        last_modified = cabecalhos.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+
+        base = self._base(url)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "salvo_em": time.time(),
+            "produtos": produtos,
+        }
+        try:
+            self._gravar_atomico(
+                base + ".html.gz", gzip.compress(corpo, self.nivel_compressao)
+            )
+            self._gravar_atomico(
+                base + ".json", json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            )
+        except OSError as e:
+            logging.warning(f"Não foi possível salvar cache HTTP de {url}: {e}")
+            return False
+        with self._lock:
+            self.baixados += 1
+        return True
+
+    def registrar_revalidacao(self):
+        """Conta uma resposta 304 atendida com a entrada salva"""
+        with self._lock:
+            self.revalidados += 1
+
+    def estatisticas(self) -> Dict:
+        return {"revalidados": self.revalidados, "baixados": self.baixados}
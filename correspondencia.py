@@ -0,0 +1,366 @@
+"""
+Correspondência de produtos entre sites
+Agrupa ofertas do mesmo produto vindas de lojas diferentes (ex: o mesmo
+celular no Magazine Luiza e na Amazon) em produtos canônicos, cada um com
+a sua melhor oferta.
+
+Etapas:
+    1. Normalização do título: minúsculas, sem acentos, sem palavras de
+       ruído (artigos, "lacrado", cores...), números unidos às unidades
+       ("128 GB" -> "128gb") e extração de códigos de modelo ("SM-A155M")
+    2. Bloqueio: um índice invertido com filtro de prefixo (tokens mais
+       raros primeiro) gera só os pares que podem atingir a similaridade
+       mínima; um segundo índice liga ofertas com o mesmo código de modelo
+    3. Comparação: similaridade de Jaccard entre os tokens, recusando pares
+       com modelos diferentes ou atributos conflitantes (ex: 128gb x 256gb,
+       "iphone 15" x "iphone 15 pro")
+    4. Agrupamento: union-find sobre os pares aceitos; dois grupos só são
+       unidos se nenhum título de um conflitar com um título do outro
+"""
+
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from produto import Produto, para_dicts
+
+_PALAVRAS_RUIDO = frozenset(
+    """
+    a o as os e de da do das dos em no na nos nas com sem para por pra
+    the and with for of
+    novo nova lacrado lacrada original oficial garantia nf nota fiscal
+    frete gratis oferta promocao envio imediato pronta entrega
+    cor preto preta branco branca azul verde vermelho vermelha rosa roxo roxa
+    cinza prata dourado dourada grafite amarelo amarela
+    """.split()
+)
+
+_UNIDADES = {
+    "gb": "gb",
+    "tb": "tb",
+    "mb": "mb",
+    "mah": "mah",
+    "w": "w",
+    "hz": "hz",
+    "mp": "mp",
+    "pol": "pol",
+    "polegadas": "pol",
+    "l": "l",
+    "litros": "l",
+    "kg": "kg",
+    "v": "v",
+}
+
+# Qualificadores de versão: "iPhone 15" e "iPhone 15 Pro" são produtos diferentes
+_VARIANTES = frozenset(["pro", "max", "plus", "ultra", "lite", "mini"])
+
+# Palavras com hífen viram um token só ("sm-a155m" -> "sma155m")
+_PADRAO_TOKEN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_PADRAO_QUANTIDADE = re.compile(r"^(\d+)(" + "|".join(_UNIDADES) + r")$")
+_PADRAO_MODELO = re.compile(r"^(?=.*[a-z])(?=.*\d)[a-z0-9]{3,}$")
+
+
+@dataclass(frozen=True)
+class TituloNormalizado:
+    """Título de uma oferta pronto para comparação"""
+
+    tokens: FrozenSet[str]
+    # Códigos com letras e dígitos (ex: "sma155m", "s23"), sem quantidades
+    modelos: FrozenSet[str]
+    # Valores numéricos por unidade ("" para números sem unidade)
+    atributos: Tuple[Tuple[str, FrozenSet[str]], ...]
+    # Qualificadores de versão presentes (ex: {"pro", "max"})
+    variantes: FrozenSet[str] = frozenset()
+
+
+def _sem_acentos(texto: str) -> str:
+    return (
+        unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    )
+
+
+def normalizar_titulo(nome: str) -> List[str]:
+    """
+    Tokens do título sem ruído, com quantidades unidas às unidades
+
+    Exemplo: "Smartphone Samsung Galaxy SM-A155M 128 GB Preto" ->
+    ["smartphone", "samsung", "galaxy", "sma155m", "128gb"]
+    """
+    brutos = [
+        token.replace("-", "")
+        for token in _PADRAO_TOKEN.findall(_sem_acentos(nome or "").lower())
+    ]
+    tokens = []
+    i = 0
+    while i < len(brutos):
+        token = brutos[i]
+        # "128 gb" -> "128gb"
+        if token.isdigit() and i + 1 < len(brutos) and brutos[i + 1] in _UNIDADES:
+            tokens.append(token + _UNIDADES[brutos[i + 1]])
+            i += 2
+            continue
+        quantidade = _PADRAO_QUANTIDADE.match(token)
+        if quantidade:
+            token = quantidade.group(1) + _UNIDADES[quantidade.group(2)]
+        if token not in _PALAVRAS_RUIDO:
+            tokens.append(token)
+        i += 1
+    return tokens
+
+
+@lru_cache(maxsize=16384)
+def analisar_titulo(nome: str) -> TituloNormalizado:
+    """
+    Normaliza o título e separa códigos de modelo e atributos numéricos
+
+    Os mesmos títulos voltam a cada busca do mesmo termo, então o resultado
+    fica em cache (limitado) por título.
+    """
+    tokens = normalizar_titulo(nome)
+    modelos = set()
+    atributos: Dict[str, set] = defaultdict(set)
+    for token in tokens:
+        quantidade = _PADRAO_QUANTIDADE.match(token)
+        if quantidade:
+            atributos[quantidade.group(2)].add(quantidade.group(1))
+        elif token.isdigit():
+            atributos[""].add(token)
+        elif _PADRAO_MODELO.match(token):
+            modelos.add(token)
+    return TituloNormalizado(
+        tokens=frozenset(tokens),
+        modelos=frozenset(modelos),
+        atributos=tuple(
+            sorted((unidade, frozenset(valores)) for unidade, valores in atributos.items())
+        ),
+        variantes=_VARIANTES.intersection(tokens),
+    )
+
+
+def extrair_modelos(nome: str) -> FrozenSet[str]:
+    """Códigos de modelo presentes no título (ex: "SM-A155M" -> {"sma155m"})"""
+    return analisar_titulo(nome).modelos
+
+
+def _atributos_conflitam(a: TituloNormalizado, b: TituloNormalizado) -> bool:
+    """
+    Códigos de modelo, quando os dois títulos têm, precisam ter um em comum;
+    quantidades da mesma unidade precisam coincidir (128gb x 256gb conflita).
+    Se um título lista mais quantidades da unidade que o outro (ex: "128GB
+    4GB RAM" x "128GB"), basta a maior coincidir. Números soltos precisam
+    ter ao menos um valor em comum, e os qualificadores de versão ("pro",
+    "max"...) precisam ser os mesmos
+    """
+    if a.modelos and b.modelos and not (a.modelos & b.modelos):
+        return True
+    if a.variantes != b.variantes:
+        return True
+    if not a.atributos or not b.atributos:
+        return False
+    atributos_b = dict(b.atributos)
+    for unidade, valores in a.atributos:
+        outros = atributos_b.get(unidade)
+        if outros is None:
+            continue
+        if unidade:
+            if len(valores) == len(outros):
+                if valores != outros:
+                    return True
+            elif max(valores, key=int) != max(outros, key=int):
+                return True
+            continue
+        if not unidade and not (valores & outros):
+            return True
+    return False
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    comuns = len(a & b)
+    return comuns / (len(a) + len(b) - comuns)
+
+
+class _UniaoBusca:
+    """Union-find com compressão de caminho e união por tamanho"""
+
+    def __init__(self, tamanho: int):
+        self.pai = list(range(tamanho))
+        self.tamanho = [1] * tamanho
+
+    def encontrar(self, i: int) -> int:
+        raiz = i
+        while self.pai[raiz] != raiz:
+            raiz = self.pai[raiz]
+        while self.pai[i] != raiz:
+            self.pai[i], i = raiz, self.pai[i]
+        return raiz
+
+    def unir(self, a: int, b: int) -> int:
+        """Une os grupos de a e b e retorna a raiz do grupo resultante"""
+        a, b = self.encontrar(a), self.encontrar(b)
+        if a == b:
+            return a
+        if self.tamanho[a] < self.tamanho[b]:
+            a, b = b, a
+        self.pai[b] = a
+        self.tamanho[a] += self.tamanho[b]
+        return a
+
+
+@dataclass(frozen=True)
+class ProdutoCanonico:
+    """Produto identificado em uma ou mais lojas, com as ofertas ordenadas por preço"""
+
+    titulo: str
+    modelo: Optional[str]
+    ofertas: Tuple[Produto, ...]
+
+    @property
+    def melhor_oferta(self) -> Produto:
+        return self.ofertas[0]
+
+    @property
+    def sites(self) -> List[str]:
+        return sorted({oferta.site for oferta in self.ofertas})
+
+    def para_dict(self) -> Dict:
+        menor, maior = self.ofertas[0].preco, self.ofertas[-1].preco
+        return {
+            "titulo": self.titulo,
+            "modelo": self.modelo,
+            "sites": self.sites,
+            "total_ofertas": len(self.ofertas),
+            "menor_preco": menor,
+            "maior_preco": maior,
+            "economia": round(maior - menor, 2),
+            "melhor_oferta": self.melhor_oferta.para_dict(),
+            "ofertas": para_dicts(self.ofertas),
+        }
+
+
+def _pares_candidatos(
+    titulos: Sequence[TituloNormalizado], limiar: float
+) -> Iterable[Tuple[int, int]]:
+    """
+    Pares que podem ter Jaccard >= limiar ou que compartilham um código de modelo
+
+    Filtro de prefixo: com os tokens ordenados do mais raro para o mais comum,
+    dois títulos com Jaccard >= limiar compartilham ao menos um token entre os
+    |t| - ceil(limiar * |t|) + 1 primeiros de cada um. Só esses tokens são
+    indexados, então tokens presentes em quase todas as ofertas (ex: o
+    próprio termo buscado) não geram comparações.
+
+    Dois títulos que têm código de modelo só combinam se o código for o
+    mesmo, então esses pares saem apenas do índice de modelos; o índice de
+    prefixos separa as ofertas com e sem modelo para não compará-las à toa.
+    """
+    frequencia: Dict[str, int] = defaultdict(int)
+    for titulo in titulos:
+        for token in titulo.tokens:
+            frequencia[token] += 1
+
+    prefixo_sem_modelo: Dict[str, List[int]] = defaultdict(list)
+    prefixo_com_modelo: Dict[str, List[int]] = defaultdict(list)
+    indice_modelo: Dict[str, List[int]] = defaultdict(list)
+    for i, titulo in enumerate(titulos):
+        vistos = set()
+        if titulo.modelos:
+            consultados, indice_proprio = (prefixo_sem_modelo,), prefixo_com_modelo
+        else:
+            consultados = (prefixo_sem_modelo, prefixo_com_modelo)
+            indice_proprio = prefixo_sem_modelo
+
+        ordenados = sorted(titulo.tokens, key=lambda token: (frequencia[token], token))
+        prefixo = len(ordenados) - math.ceil(limiar * len(ordenados)) + 1
+        for token in ordenados[:prefixo]:
+            for indice in consultados:
+                for j in indice.get(token, ()):
+                    if j not in vistos:
+                        vistos.add(j)
+                        yield j, i
+            indice_proprio[token].append(i)
+        for modelo in titulo.modelos:
+            for j in indice_modelo[modelo]:
+                if j not in vistos:
+                    vistos.add(j)
+                    yield j, i
+            indice_modelo[modelo].append(i)
+
+
+def agrupar_ofertas(
+    produtos: Iterable[Produto], limiar: float = 0.6
+) -> List[ProdutoCanonico]:
+    """
+    Agrupa ofertas do mesmo produto em produtos canônicos
+
+    Args:
+        produtos: Ofertas de um ou mais sites
+        limiar: Similaridade de Jaccard mínima entre os títulos; ofertas com
+            o mesmo código de modelo são agrupadas mesmo abaixo do limiar.
+            Em ambos os casos, atributos conflitantes (ex: 128gb x 256gb)
+            impedem o agrupamento
+
+    Returns:
+        Produtos canônicos ordenados pelo preço da melhor oferta
+
+    Raises:
+        ValueError: Se o limiar não estiver em (0, 1]
+    """
+    if not 0 < limiar <= 1:
+        raise ValueError(f"Limiar de similaridade deve estar em (0, 1]: {limiar}")
+    produtos = list(produtos)
+    titulos = [analisar_titulo(produto.nome) for produto in produtos]
+    grupos = _UniaoBusca(len(produtos))
+    # Títulos de cada grupo, guardados na raiz: um título genérico
+    # ("Apple iPhone 15") não pode ligar variantes que conflitam entre si
+    # ("... 128GB" e "... 256GB"), então a união compara os dois grupos inteiros
+    # (só para grupos com mais de um membro; um grupo unitário tem apenas o título da raiz)
+    titulos_grupo: Dict[int, List[TituloNormalizado]] = {}
+
+    for i, j in _pares_candidatos(titulos, limiar):
+        raiz_i, raiz_j = grupos.encontrar(i), grupos.encontrar(j)
+        if raiz_i == raiz_j:
+            continue
+        a, b = titulos[i], titulos[j]
+        if _atributos_conflitam(a, b):
+            continue
+        if not ((a.modelos & b.modelos) or _jaccard(a.tokens, b.tokens) >= limiar):
+            continue
+        grupo_i = titulos_grupo.pop(raiz_i, None)
+        grupo_j = titulos_grupo.pop(raiz_j, None)
+        if grupo_i is None and grupo_j is None:
+            # Dois grupos unitários: o par já foi comparado acima
+            titulos_grupo[grupos.unir(i, j)] = [a, b]
+            continue
+        grupo_i = grupo_i or [a]
+        grupo_j = grupo_j or [b]
+        if any(_atributos_conflitam(x, y) for x in grupo_i for y in grupo_j):
+            titulos_grupo[raiz_i], titulos_grupo[raiz_j] = grupo_i, grupo_j
+            continue
+        titulos_grupo[grupos.unir(i, j)] = grupo_i + grupo_j
+
+    membros: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(produtos)):
+        membros[grupos.encontrar(i)].append(i)
+
+    canonicos = []
+    for indices in membros.values():
+        ofertas = tuple(sorted((produtos[i] for i in indices), key=lambda p: p.preco))
+        # O título mais curto costuma ser o mais limpo
+        titulo = min((produtos[i].nome for i in indices), key=len)
+        modelos = frozenset.intersection(*(titulos[i].modelos for i in indices))
+        canonicos.append(
+            ProdutoCanonico(
+                titulo=titulo,
+                modelo=min(modelos) if modelos else None,
+                ofertas=ofertas,
+            )
+        )
+
+    canonicos.sort(key=lambda canonico: canonico.melhor_oferta.preco)
+    return canonicos
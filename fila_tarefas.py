@@ -0,0 +1,580 @@
+"""
+Fila de tarefas de busca
+Distribui buscas (termo, site) entre vários processos trabalhadores, em uma
+ou mais máquinas. Cada tarefa é entregue a um trabalhador por vez, com uma
+concessão (lease) de duração limitada: se o trabalhador cair, a concessão
+expira e a tarefa volta para a fila. Falhas são repetidas com espera
+exponencial até o limite de tentativas, e enfileirar uma tarefa que já está
+pendente ou em execução não cria uma duplicata.
+
+Tarefas recorrentes (veja agendamento.py) voltam para a fila ao terminar,
+com o próximo horário e os dados (ex: intervalo atual) que a execução
+seguinte recebe em Tarefa.dados.
+
+Backends:
+    FilaSQLite: arquivo SQLite local (vários processos na mesma máquina)
+    FilaRedis: servidor compatível com Redis (várias máquinas; requer `pip install redis`)
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+PENDENTE = "pendente"
+EM_EXECUCAO = "em_execucao"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+
+
+def chave_tarefa(termo: str, site: str) -> str:
+    """Identificador da tarefa: uma por (site, termo)"""
+    return f"{site}:{termo}"
+
+
+@dataclass(frozen=True)
+class Tarefa:
+    """Tarefa entregue a um trabalhador"""
+
+    termo: str
+    site: str
+    # Número desta tentativa (1 na primeira execução)
+    tentativas: int
+    # Identificador da concessão: só quem a recebeu pode concluir a tarefa
+    concessao: str
+    # Estado guardado entre execuções de uma tarefa recorrente
+    dados: Dict = field(default_factory=dict, compare=False)
+
+    @property
+    def chave(self) -> str:
+        return chave_tarefa(self.termo, self.site)
+
+
+class FilaTarefas(ABC):
+    """
+    Regras comuns aos backends
+
+    Cada backend implementa enfileirar, obter, renovar, estatisticas e
+    _encerrar; concluir e falhar encerram a tentativa com as regras de
+    retentativa e recorrência definidas aqui.
+    """
+
+    def __init__(
+        self,
+        duracao_concessao: float = 120,
+        max_tentativas: int = 3,
+        espera_retentativa: float = 30,
+    ):
+        """
+        Args:
+            duracao_concessao: Segundos em que a tarefa fica reservada ao trabalhador
+                que a recebeu; depois disso volta para a fila
+            max_tentativas: Tentativas antes de a tarefa ser marcada como falhou
+            espera_retentativa: Espera (segundos) antes da segunda tentativa,
+                dobrada a cada nova falha
+        """
+        self.duracao_concessao = duracao_concessao
+        self.max_tentativas = max_tentativas
+        self.espera_retentativa = espera_retentativa
+
+    def _espera(self, tentativas: int) -> float:
+        return self.espera_retentativa * 2 ** max(0, tentativas - 1)
+
+    @staticmethod
+    def _nova_concessao() -> str:
+        return uuid.uuid4().hex
+
+    @abstractmethod
+    def enfileirar(
+        self, termo: str, site: str, atraso: float = 0, dados: Optional[Dict] = None
+    ) -> bool:
+        """
+        Adiciona a tarefa, disponível daqui a `atraso` segundos
+
+        Returns:
+            False se a tarefa já estava pendente ou em execução
+        """
+
+    @abstractmethod
+    def obter(self) -> Optional[Tarefa]:
+        """Entrega a próxima tarefa disponível com uma concessão, ou None se não houver"""
+
+    @abstractmethod
+    def renovar(self, tarefa: Tarefa) -> bool:
+        """Estende a concessão de uma tarefa longa; False se ela já foi perdida"""
+
+    @abstractmethod
+    def estatisticas(self) -> Dict[str, int]:
+        """Número de tarefas por estado"""
+
+    @contextmanager
+    def manter_concessao(
+        self, tarefa: Tarefa, intervalo: Optional[float] = None
+    ) -> Iterator[None]:
+        """
+        Renova a concessão em segundo plano enquanto o bloco executa
+
+        Evita que uma busca mais longa que duracao_concessao volte para a fila
+        e seja executada também por outro trabalhador. As renovações param ao
+        sair do bloco, antes de a tarefa ser concluída ou marcada como falha.
+
+        Args:
+            intervalo: Segundos entre renovações (padrão: um terço da concessão)
+        """
+        intervalo = intervalo or self.duracao_concessao / 3
+        parar = threading.Event()
+
+        def renovar_periodicamente():
+            while not parar.wait(intervalo):
+                try:
+                    if not self.renovar(tarefa):
+                        logging.warning(
+                            f"Concessão de '{tarefa.chave}' perdida; "
+                            "a tarefa pode estar com outro trabalhador"
+                        )
+                        return
+                except Exception as e:
+                    logging.warning(f"Erro ao renovar a concessão de '{tarefa.chave}': {e}")
+
+        renovador = threading.Thread(
+            target=renovar_periodicamente, name=f"concessao:{tarefa.chave}", daemon=True
+        )
+        renovador.start()
+        try:
+            yield
+        finally:
+            parar.set()
+            renovador.join()
+
+    @abstractmethod
+    def _encerrar(
+        self,
+        tarefa: Tarefa,
+        estado: str,
+        disponivel_em: float,
+        erro: Optional[str],
+        tentativas: Optional[int] = None,
+        dados: Optional[Dict] = None,
+    ) -> bool:
+        """
+        Atualiza a tarefa se a concessão ainda pertence a quem a recebeu
+
+        tentativas e dados, quando informados, substituem os valores guardados.
+        """
+
+    def concluir(
+        self, tarefa: Tarefa, proxima_em: Optional[float] = None, dados: Optional[Dict] = None
+    ) -> bool:
+        """
+        Encerra a tarefa com sucesso; False se a concessão foi perdida
+
+        Args:
+            proxima_em: Para tarefas recorrentes, segundos até a próxima execução
+            dados: Novos dados da tarefa recorrente (ex: intervalo atualizado)
+        """
+        if proxima_em is None:
+            return self._encerrar(tarefa, CONCLUIDA, time.time(), None, dados=dados)
+        return self._encerrar(
+            tarefa, PENDENTE, time.time() + proxima_em, None, tentativas=0, dados=dados
+        )
+
+    def falhar(self, tarefa: Tarefa, erro: str, proxima_em: Optional[float] = None) -> bool:
+        """
+        Agenda uma nova tentativa; False se a concessão foi perdida
+
+        No limite de tentativas a tarefa é marcada como falhou ou, se for
+        recorrente (proxima_em informado), volta para a fila na próxima execução.
+        """
+        if tarefa.tentativas < self.max_tentativas:
+            return self._encerrar(
+                tarefa, PENDENTE, time.time() + self._espera(tarefa.tentativas), erro
+            )
+        if proxima_em is None:
+            return self._encerrar(tarefa, FALHOU, time.time(), erro)
+        return self._encerrar(tarefa, PENDENTE, time.time() + proxima_em, erro, tentativas=0)
+
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    chave TEXT PRIMARY KEY,
+    termo TEXT NOT NULL,
+    site TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    disponivel_em REAL NOT NULL,
+    concessao TEXT,
+    concessao_ate REAL,
+    erro TEXT,
+    dados TEXT,
+    atualizado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tarefas_estado_disponivel
+    ON tarefas (estado, disponivel_em);
+"""
+
+
+class FilaSQLite(FilaTarefas):
+    """
+    Fila em um arquivo SQLite, compartilhada pelos processos da mesma máquina
+
+    Cada entrega roda em uma transação IMMEDIATE, então dois trabalhadores
+    nunca recebem a mesma tarefa.
+    """
+
+    def __init__(self, caminho: str = "fila_tarefas.db", **opcoes):
+        """
+        Args:
+            caminho: Arquivo do banco SQLite
+            **opcoes: duracao_concessao, max_tentativas e espera_retentativa (veja FilaTarefas)
+        """
+        super().__init__(**opcoes)
+        self.caminho = caminho
+        self._local = threading.local()
+        conexao = self._conexao()
+        conexao.executescript(_ESQUEMA)
+        # Filas criadas antes das tarefas recorrentes não têm a coluna dados
+        colunas = {linha["name"] for linha in conexao.execute("PRAGMA table_info(tarefas)")}
+        if "dados" not in colunas:
+            conexao.execute("ALTER TABLE tarefas ADD COLUMN dados TEXT")
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual, em modo autocommit (transações explícitas)"""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conexao.row_factory = sqlite3.Row
+            conexao.execute("PRAGMA journal_mode=WAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def enfileirar(
+        self, termo: str, site: str, atraso: float = 0, dados: Optional[Dict] = None
+    ) -> bool:
+        """
+        Adiciona a tarefa, disponível daqui a `atraso` segundos
+
+        Args:
+            dados: Dados iniciais de uma tarefa recorrente; uma tarefa que já
+                existiu mantém os dados guardados
+
+        Returns:
+            False se a tarefa já estava pendente ou em execução
+        """
+        agora = time.time()
+        cursor = self._conexao().execute(
+            """
+            INSERT INTO tarefas (chave, termo, site, estado, disponivel_em, dados, atualizado_em)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (chave) DO UPDATE SET
+                estado = excluded.estado,
+                tentativas = 0,
+                disponivel_em = excluded.disponivel_em,
+                concessao = NULL,
+                concessao_ate = NULL,
+                erro = NULL,
+                dados = COALESCE(tarefas.dados, excluded.dados),
+                atualizado_em = excluded.atualizado_em
+            WHERE tarefas.estado IN (?, ?)
+            """,
+            (chave_tarefa(termo, site), termo, site, PENDENTE, agora + atraso,
+             json.dumps(dados) if dados else None, agora, CONCLUIDA, FALHOU),
+        )
+        return cursor.rowcount > 0
+
+    def obter(self) -> Optional[Tarefa]:
+        """Entrega a próxima tarefa disponível, ou None se não houver"""
+        agora = time.time()
+        conexao = self._conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            # Concessões vencidas (trabalhador caiu) devolvem a tarefa para a fila
+            conexao.execute(
+                """
+                UPDATE tarefas SET
+                    estado = CASE WHEN tentativas >= ? THEN ? ELSE ? END,
+                    erro = 'concessão expirada',
+                    concessao = NULL,
+                    concessao_ate = NULL,
+                    atualizado_em = ?
+                WHERE estado = ? AND concessao_ate < ?
+                """,
+                (self.max_tentativas, FALHOU, PENDENTE, agora, EM_EXECUCAO, agora),
+            )
+            linha = conexao.execute(
+                """
+                SELECT chave, termo, site, tentativas, dados FROM tarefas
+                WHERE estado = ? AND disponivel_em <= ?
+                ORDER BY disponivel_em
+                LIMIT 1
+                """,
+                (PENDENTE, agora),
+            ).fetchone()
+            if linha is None:
+                conexao.execute("COMMIT")
+                return None
+
+            tarefa = Tarefa(
+                termo=linha["termo"],
+                site=linha["site"],
+                tentativas=linha["tentativas"] + 1,
+                concessao=self._nova_concessao(),
+                dados=json.loads(linha["dados"]) if linha["dados"] else {},
+            )
+            conexao.execute(
+                """
+                UPDATE tarefas SET
+                    estado = ?, tentativas = ?, concessao = ?, concessao_ate = ?,
+                    atualizado_em = ?
+                WHERE chave = ?
+                """,
+                (EM_EXECUCAO, tarefa.tentativas, tarefa.concessao,
+                 agora + self.duracao_concessao, agora, linha["chave"]),
+            )
+            conexao.execute("COMMIT")
+            return tarefa
+        except Exception:
+            conexao.execute("ROLLBACK")
+            raise
+
+    def _encerrar(
+        self,
+        tarefa: Tarefa,
+        estado: str,
+        disponivel_em: float,
+        erro: Optional[str],
+        tentativas: Optional[int] = None,
+        dados: Optional[Dict] = None,
+    ) -> bool:
+        agora = time.time()
+        cursor = self._conexao().execute(
+            """
+            UPDATE tarefas SET
+                estado = ?, disponivel_em = ?, erro = ?, concessao = NULL,
+                concessao_ate = NULL, tentativas = COALESCE(?, tentativas),
+                dados = COALESCE(?, dados), atualizado_em = ?
+            WHERE chave = ? AND concessao = ?
+            """,
+            (estado, disponivel_em, erro, tentativas,
+             json.dumps(dados) if dados is not None else None, agora,
+             tarefa.chave, tarefa.concessao),
+        )
+        return cursor.rowcount > 0
+
+    def renovar(self, tarefa: Tarefa) -> bool:
+        """Estende a concessão; False se ela já expirou e a tarefa foi entregue a outro"""
+        cursor = self._conexao().execute(
+            "UPDATE tarefas SET concessao_ate = ? WHERE chave = ? AND concessao = ?",
+            (time.time() + self.duracao_concessao, tarefa.chave, tarefa.concessao),
+        )
+        return cursor.rowcount > 0
+
+    def estatisticas(self) -> Dict[str, int]:
+        linhas = self._conexao().execute(
+            "SELECT estado, COUNT(*) AS total FROM tarefas GROUP BY estado"
+        ).fetchall()
+        return {linha["estado"]: linha["total"] for linha in linhas}
+
+
+class FilaRedis(FilaTarefas):
+    """
+    Fila em um servidor compatível com Redis, compartilhada entre máquinas
+
+    Chaves usadas (com o prefixo):
+        <prefixo>:pendentes     conjunto ordenado chave -> disponível em (timestamp)
+        <prefixo>:em_execucao   conjunto ordenado chave -> fim da concessão
+        <prefixo>:tarefa:<chave> hash com termo, site, estado, tentativas, concessão,
+                                 erro e dados (JSON)
+
+    As operações usam transações otimistas (WATCH/MULTI), sem scripts Lua,
+    então funcionam também com substitutos locais do Redis.
+    """
+
+    def __init__(self, cliente, prefixo: str = "buscador:fila", **opcoes):
+        """
+        Args:
+            cliente: Cliente redis-py criado com decode_responses=True
+            prefixo: Prefixo das chaves no servidor
+            **opcoes: duracao_concessao, max_tentativas e espera_retentativa (veja FilaTarefas)
+        """
+        super().__init__(**opcoes)
+        self.cliente = cliente
+        self.prefixo = prefixo
+        self._pendentes = f"{prefixo}:pendentes"
+        self._em_execucao = f"{prefixo}:em_execucao"
+
+    @classmethod
+    def de_url(cls, url: str, **opcoes) -> "FilaRedis":
+        """Conecta a partir de uma URL (ex: redis://localhost:6379/0)"""
+        import redis
+
+        return cls(redis.Redis.from_url(url, decode_responses=True), **opcoes)
+
+    def _chave_hash(self, chave: str) -> str:
+        return f"{self.prefixo}:tarefa:{chave}"
+
+    def _transacao(self, funcao, *chaves_observadas):
+        """Executa funcao(pipe) repetindo enquanto outra conexão alterar as chaves observadas"""
+        return self.cliente.transaction(funcao, *chaves_observadas, value_from_callable=True)
+
+    def enfileirar(
+        self, termo: str, site: str, atraso: float = 0, dados: Optional[Dict] = None
+    ) -> bool:
+        """
+        Adiciona a tarefa, disponível daqui a `atraso` segundos
+
+        Args:
+            dados: Dados iniciais de uma tarefa recorrente; uma tarefa que já
+                existiu mantém os dados guardados
+
+        Returns:
+            False se a tarefa já estava pendente ou em execução
+        """
+        chave = chave_tarefa(termo, site)
+        chave_hash = self._chave_hash(chave)
+
+        def adicionar(pipe) -> bool:
+            estado, dados_guardados = pipe.hmget(chave_hash, "estado", "dados")
+            if estado in (PENDENTE, EM_EXECUCAO):
+                return False
+            pipe.multi()
+            pipe.delete(chave_hash)
+            pipe.hset(
+                chave_hash,
+                mapping={
+                    "termo": termo,
+                    "site": site,
+                    "estado": PENDENTE,
+                    "tentativas": 0,
+                    "dados": dados_guardados or (json.dumps(dados) if dados else ""),
+                },
+            )
+            pipe.zadd(self._pendentes, {chave: time.time() + atraso})
+            return True
+
+        return self._transacao(adicionar, chave_hash)
+
+    def _recuperar_expiradas(self, agora: float):
+        """Devolve para a fila as tarefas cuja concessão venceu (trabalhador caiu)"""
+        for chave in self.cliente.zrangebyscore(self._em_execucao, "-inf", agora):
+            chave_hash = self._chave_hash(chave)
+
+            def devolver(pipe):
+                fim = pipe.zscore(self._em_execucao, chave)
+                if fim is None or fim >= agora:
+                    return
+                tentativas = int(pipe.hget(chave_hash, "tentativas") or 0)
+                pipe.multi()
+                pipe.zrem(self._em_execucao, chave)
+                if tentativas >= self.max_tentativas:
+                    pipe.hset(chave_hash, mapping={"estado": FALHOU, "concessao": ""})
+                else:
+                    pipe.hset(chave_hash, mapping={"estado": PENDENTE, "concessao": ""})
+                    pipe.zadd(self._pendentes, {chave: agora})
+                pipe.hset(chave_hash, "erro", "concessão expirada")
+
+            self._transacao(devolver, self._em_execucao, chave_hash)
+
+    def obter(self) -> Optional[Tarefa]:
+        """Entrega a próxima tarefa disponível, ou None se não houver"""
+        agora = time.time()
+        self._recuperar_expiradas(agora)
+
+        def reservar(pipe) -> Optional[Tarefa]:
+            proximas = pipe.zrangebyscore(self._pendentes, "-inf", agora, start=0, num=1)
+            if not proximas:
+                return None
+            chave = proximas[0]
+            dados = pipe.hgetall(self._chave_hash(chave))
+            tarefa = Tarefa(
+                termo=dados["termo"],
+                site=dados["site"],
+                tentativas=int(dados.get("tentativas", 0)) + 1,
+                concessao=self._nova_concessao(),
+                dados=json.loads(dados["dados"]) if dados.get("dados") else {},
+            )
+            pipe.multi()
+            pipe.zrem(self._pendentes, chave)
+            pipe.zadd(self._em_execucao, {chave: agora + self.duracao_concessao})
+            pipe.hset(
+                self._chave_hash(chave),
+                mapping={
+                    "estado": EM_EXECUCAO,
+                    "tentativas": tarefa.tentativas,
+                    "concessao": tarefa.concessao,
+                },
+            )
+            return tarefa
+
+        # Observar o conjunto de pendentes garante que só um trabalhador reserve cada tarefa
+        return self._transacao(reservar, self._pendentes)
+
+    def _encerrar(
+        self,
+        tarefa: Tarefa,
+        estado: str,
+        disponivel_em: float,
+        erro: Optional[str],
+        tentativas: Optional[int] = None,
+        dados: Optional[Dict] = None,
+    ) -> bool:
+        chave_hash = self._chave_hash(tarefa.chave)
+        campos = {"estado": estado, "concessao": "", "erro": erro or ""}
+        if tentativas is not None:
+            campos["tentativas"] = tentativas
+        if dados is not None:
+            campos["dados"] = json.dumps(dados)
+
+        def encerrar(pipe) -> bool:
+            if pipe.hget(chave_hash, "concessao") != tarefa.concessao:
+                return False
+            pipe.multi()
+            pipe.zrem(self._em_execucao, tarefa.chave)
+            pipe.hset(chave_hash, mapping=campos)
+            if estado == PENDENTE:
+                pipe.zadd(self._pendentes, {tarefa.chave: disponivel_em})
+            return True
+
+        return self._transacao(encerrar, chave_hash)
+
+    def renovar(self, tarefa: Tarefa) -> bool:
+        """Estende a concessão; False se ela já expirou e a tarefa foi entregue a outro"""
+        chave_hash = self._chave_hash(tarefa.chave)
+
+        def renovar(pipe) -> bool:
+            if pipe.hget(chave_hash, "concessao") != tarefa.concessao:
+                return False
+            pipe.multi()
+            pipe.zadd(
+                self._em_execucao, {tarefa.chave: time.time() + self.duracao_concessao}
+            )
+            return True
+
+        return self._transacao(renovar, chave_hash)
+
+    def estatisticas(self) -> Dict[str, int]:
+        contagens: Dict[str, int] = {}
+        for chave_hash in self.cliente.scan_iter(match=f"{self.prefixo}:tarefa:*"):
+            estado = self.cliente.hget(chave_hash, "estado")
+            if estado:
+                contagens[estado] = contagens.get(estado, 0) + 1
+        return contagens
+
+
+def abrir_fila(endereco: str, **opcoes) -> FilaTarefas:
+    """
+    Abre a fila indicada por um endereço
+
+    Args:
+        endereco: URL redis:// ou rediss:// para FilaRedis; qualquer outro valor
+            é o caminho do arquivo de FilaSQLite
+        **opcoes: duracao_concessao, max_tentativas e espera_retentativa
+    """
+    if endereco.startswith(("redis://", "rediss://", "unix://")):
+        return FilaRedis.de_url(endereco, **opcoes)
+    return FilaSQLite(endereco, **opcoes)
@@ -0,0 +1,238 @@
+"""
+Histórico de preços
+Armazena cada observação de produto (termo, site, produto, preço, data) em
+um banco SQLite com índices, permitindo consultar a evolução de preços e
+estatísticas por período sem reler arquivos JSON.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from produto import Produto
+from serializacao import para_json_bytes
+
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS observacoes (
+    id INTEGER PRIMARY KEY,
+    termo TEXT NOT NULL,
+    site TEXT NOT NULL,
+    chave_produto TEXT NOT NULL,
+    nome TEXT,
+    preco REAL NOT NULL,
+    link TEXT,
+    imagem TEXT,
+    data_busca TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observacoes_termo_site_produto_data
+    ON observacoes (termo, site, chave_produto, data_busca);
+CREATE INDEX IF NOT EXISTS idx_observacoes_termo_data
+    ON observacoes (termo, data_busca);
+"""
+
+
+def chave_produto(produto: Produto) -> str:
+    """
+    Identificador estável de um produto dentro de um site
+
+    Usa o link sem parâmetros de rastreamento; sem link, usa o nome
+    normalizado.
+    """
+    link = produto.link
+    if link:
+        return link.split("?")[0].split("#")[0].rstrip("/")
+    nome = re.sub(r"\s+", " ", (produto.nome or "").strip().lower())
+    return f"{produto.site}:{nome}"
+
+
+class HistoricoPrecos:
+    def __init__(self, caminho: str = "historico_precos.db"):
+        """
+        Args:
+            caminho: Arquivo do banco SQLite (":memory:" não é compartilhado entre threads)
+        """
+        self.caminho = caminho
+        self._local = threading.local()
+        self._conexao().executescript(_ESQUEMA)
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual (SQLite não compartilha conexões entre threads)"""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30)
+            conexao.row_factory = sqlite3.Row
+            # WAL permite leituras simultâneas a uma escrita
+            conexao.execute("PRAGMA journal_mode=WAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def registrar(
+        self, termo: str, produtos: Iterable[Produto], data_busca: Optional[str] = None
+    ) -> int:
+        """
+        Adiciona uma observação para cada produto
+
+        Args:
+            termo: Termo de busca já normalizado
+            produtos: Produtos retornados pelos parsers
+            data_busca: Data das observações ("%Y-%m-%d %H:%M:%S"). Padrão: data de cada produto
+
+        Returns:
+            Número de observações gravadas
+        """
+        linhas = [
+            (
+                termo,
+                produto.site,
+                chave_produto(produto),
+                produto.nome,
+                produto.preco,
+                produto.link,
+                produto.imagem,
+                data_busca or produto.data_busca or datetime.now().strftime(FORMATO_DATA),
+            )
+            for produto in produtos
+        ]
+        if not linhas:
+            return 0
+
+        try:
+            conexao = self._conexao()
+            with conexao:
+                conexao.executemany(
+                    "INSERT INTO observacoes "
+                    "(termo, site, chave_produto, nome, preco, link, imagem, data_busca) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    linhas,
+                )
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao gravar histórico de '{termo}': {e}")
+            return 0
+
+        return len(linhas)
+
+    def _filtros(
+        self,
+        termo: str,
+        site: Optional[str],
+        chave: Optional[str],
+        desde: Optional[str],
+        ate: Optional[str],
+    ):
+        condicoes = ["termo = ?"]
+        parametros: List = [termo]
+        if site:
+            condicoes.append("site = ?")
+            parametros.append(site)
+        if chave:
+            condicoes.append("chave_produto = ?")
+            parametros.append(chave)
+        if desde:
+            condicoes.append("data_busca >= ?")
+            parametros.append(desde)
+        if ate:
+            condicoes.append("data_busca <= ?")
+            parametros.append(ate)
+        return " AND ".join(condicoes), parametros
+
+    def historico(
+        self,
+        termo: str,
+        site: Optional[str] = None,
+        chave: Optional[str] = None,
+        desde: Optional[str] = None,
+        ate: Optional[str] = None,
+        limite: int = 1000,
+    ) -> List[Dict]:
+        """
+        Lista as observações de um termo, da mais recente para a mais antiga
+
+        Args:
+            termo: Termo de busca normalizado
+            site: Filtra por site (ex: "Amazon")
+            chave: Filtra por produto (veja chave_produto)
+            desde: Data inicial ("%Y-%m-%d %H:%M:%S" ou prefixo, ex: "2024-01-31")
+            ate: Data final, no mesmo formato
+            limite: Número máximo de observações
+        """
+        where, parametros = self._filtros(termo, site, chave, desde, ate)
+        cursor = self._conexao().execute(
+            "SELECT site, chave_produto, nome, preco, link, imagem, data_busca "
+            f"FROM observacoes WHERE {where} ORDER BY data_busca DESC LIMIT ?",
+            parametros + [limite],
+        )
+        return [dict(linha) for linha in cursor]
+
+    def estatisticas(
+        self,
+        termo: str,
+        site: Optional[str] = None,
+        chave: Optional[str] = None,
+        desde: Optional[str] = None,
+        ate: Optional[str] = None,
+    ) -> Dict:
+        """
+        Preço mínimo, máximo e médio de um termo no período, no geral e por site
+
+        Returns:
+            {"geral": {...}, "por_site": [{"site": ..., "minimo": ..., ...}, ...]}
+        """
+        where, parametros = self._filtros(termo, site, chave, desde, ate)
+        colunas = (
+            "COUNT(*) AS observacoes, MIN(preco) AS minimo, MAX(preco) AS maximo, "
+            "AVG(preco) AS media, MIN(data_busca) AS primeira, MAX(data_busca) AS ultima"
+        )
+        conexao = self._conexao()
+        geral = conexao.execute(
+            f"SELECT {colunas} FROM observacoes WHERE {where} AND preco > 0",
+            parametros,
+        ).fetchone()
+        por_site = conexao.execute(
+            f"SELECT site, {colunas} FROM observacoes WHERE {where} AND preco > 0 "
+            "GROUP BY site ORDER BY minimo",
+            parametros,
+        ).fetchall()
+        return {"geral": dict(geral), "por_site": [dict(linha) for linha in por_site]}
+
+    def exportar_ndjson(
+        self, arquivo: str, termo: Optional[str] = None, apos_id: int = 0, lote: int = 5000
+    ) -> int:
+        """
+        Acrescenta as observações ao final de um arquivo NDJSON (uma por linha)
+
+        As linhas são lidas e gravadas em lotes, então o uso de memória não
+        cresce com o tamanho do histórico. Para exportações incrementais,
+        passe em `apos_id` o valor retornado pela exportação anterior.
+
+        Args:
+            arquivo: Arquivo NDJSON (aberto em modo de acréscimo)
+            termo: Exporta apenas um termo (padrão: todos)
+            apos_id: Exporta apenas observações com id maior que este
+            lote: Número de linhas lidas do banco por vez
+
+        Returns:
+            Id da última observação exportada (ou apos_id, se não houver novas)
+        """
+        condicoes, parametros = "id > ?", [apos_id]
+        if termo:
+            condicoes += " AND termo = ?"
+            parametros.append(termo)
+        cursor = self._conexao().execute(
+            "SELECT id, termo, site, chave_produto, nome, preco, link, imagem, data_busca "
+            f"FROM observacoes WHERE {condicoes} ORDER BY id",
+            parametros,
+        )
+        ultimo_id = apos_id
+        with open(arquivo, "ab") as f:
+            while True:
+                linhas = cursor.fetchmany(lote)
+                if not linhas:
+                    break
+                f.write(b"".join(para_json_bytes(dict(linha)) + b"\n" for linha in linhas))
+                ultimo_id = linhas[-1]["id"]
+        return ultimo_id
@@ -0,0 +1,129 @@
+"""
+Controle de tráfego por site
+Balde de tokens para limitar a taxa de requisições e disjuntor (circuit
+breaker) para pular rapidamente sites que estão falhando ou bloqueando.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class BaldeTokens:
+    """
+    Limitador de taxa por balde de tokens
+
+    O balde enche à razão de `taxa` tokens por segundo até `capacidade`.
+    Cada requisição consome um token; sem tokens disponíveis, a requisição
+    reserva o próximo token e espera por ele.
+    """
+
+    def __init__(self, taxa: float, capacidade: float = 1.0):
+        """
+        Args:
+            taxa: Requisições por segundo em regime
+            capacidade: Tamanho máximo de rajada
+        """
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = capacidade
+        self._atualizado_em = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reservar(self) -> float:
+        """Consome um token e retorna quantos segundos esperar antes de usá-lo"""
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(
+                self.capacidade,
+                self._tokens + (agora - self._atualizado_em) * self.taxa,
+            )
+            self._atualizado_em = agora
+            self._tokens -= 1
+            if self._tokens >= 0 or self.taxa <= 0:
+                return 0.0
+            return -self._tokens / self.taxa
+
+    def adquirir(self):
+        """Consome um token, esperando se necessário"""
+        espera = self.reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+    def estado(self) -> Dict:
+        return {
+            "requisicoes_por_segundo": self.taxa,
+            "rajada": self.capacidade,
+            "tokens": round(max(self._tokens, 0.0), 2),
+        }
+
+
+class DisjuntorCircuito:
+    """
+    Disjuntor (circuit breaker) de um site
+
+    - fechado: requisições liberadas; falhas consecutivas são contadas
+    - aberto: após `limite_falhas` falhas seguidas, requisições são
+      recusadas durante `tempo_espera` segundos
+    - meio_aberto: passado o tempo de espera, uma única requisição de teste
+      é liberada; sucesso fecha o disjuntor, falha o abre novamente
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, limite_falhas: int = 3, tempo_espera: float = 300):
+        """
+        Args:
+            limite_falhas: Falhas consecutivas que abrem o disjuntor
+            tempo_espera: Segundos em que o site fica sendo ignorado
+        """
+        self.limite_falhas = limite_falhas
+        self.tempo_espera = tempo_espera
+        self.estado_atual = self.FECHADO
+        self.falhas_consecutivas = 0
+        self.ultima_falha: Optional[str] = None
+        self._aberto_em = 0.0
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        """Indica se uma requisição ao site pode ser feita agora"""
+        with self._lock:
+            if self.estado_atual == self.FECHADO:
+                return True
+            if self.estado_atual == self.ABERTO:
+                if time.monotonic() - self._aberto_em >= self.tempo_espera:
+                    # Libera uma única requisição de teste
+                    self.estado_atual = self.MEIO_ABERTO
+                    return True
+                return False
+            # Meio aberto: a requisição de teste ainda não terminou
+            return False
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self.estado_atual = self.FECHADO
+            self.falhas_consecutivas = 0
+
+    def registrar_falha(self, motivo: Optional[str] = None):
+        with self._lock:
+            self.falhas_consecutivas += 1
+            self.ultima_falha = motivo
+            if (
+                self.estado_atual == self.MEIO_ABERTO
+                or self.falhas_consecutivas >= self.limite_falhas
+            ):
+                self.estado_atual = self.ABERTO
+                self._aberto_em = time.monotonic()
+
+    def estado(self) -> Dict:
+        restante = 0.0
+        if self.estado_atual == self.ABERTO:
+            restante = max(0.0, self.tempo_espera - (time.monotonic() - self._aberto_em))
+        return {
+            "estado": self.estado_atual,
+            "falhas_consecutivas": self.falhas_consecutivas,
+            "ultima_falha": self.ultima_falha,
+            "segundos_para_nova_tentativa": round(restante, 1),
+        }
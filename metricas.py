@@ -0,0 +1,146 @@
+"""
+Métricas de desempenho
+Contadores, medidores e histogramas em memória, com rótulos, exportados no
+formato de texto do Prometheus (veja /api/metrics na API).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Limites (segundos) dos histogramas de duração
+LIMITES_PADRAO = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+class Histograma:
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites: Tuple[float, ...] = LIMITES_PADRAO):
+        self.limites = limites
+        # Uma contagem por limite e uma para valores acima do último (+Inf)
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+def _rotulos(rotulos: Dict[str, str]) -> Rotulos:
+    return tuple(sorted((nome, str(valor)) for nome, valor in rotulos.items()))
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _numero(valor: float) -> str:
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def _formatar_rotulos(rotulos: Rotulos, extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = list(rotulos) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares) + "}"
+
+
+class Metricas:
+    """
+    Registro de métricas seguro para uso por várias threads
+
+    Cada métrica é identificada pelo nome e pelos rótulos (ex: site="amazon").
+    """
+
+    def __init__(self, limites: Tuple[float, ...] = LIMITES_PADRAO):
+        self.limites = limites
+        self._contadores: Dict[str, Dict[Rotulos, float]] = {}
+        self._medidores: Dict[str, Dict[Rotulos, float]] = {}
+        self._histogramas: Dict[str, Dict[Rotulos, Histograma]] = {}
+        self._ajuda: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def descrever(self, nome: str, ajuda: str):
+        """Texto de ajuda (# HELP) da métrica"""
+        self._ajuda[nome] = ajuda
+
+    def incrementar(self, nome: str, valor: float = 1, **rotulos):
+        """Soma valor a um contador"""
+        chave = _rotulos(rotulos)
+        with self._lock:
+            serie = self._contadores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def definir_contador(self, nome: str, valor: float, **rotulos):
+        """Define o total de um contador mantido em outro objeto (ex: acertos do cache)"""
+        with self._lock:
+            self._contadores.setdefault(nome, {})[_rotulos(rotulos)] = valor
+
+    def definir(self, nome: str, valor: float, **rotulos):
+        """Define o valor atual de um medidor"""
+        with self._lock:
+            self._medidores.setdefault(nome, {})[_rotulos(rotulos)] = valor
+
+    def observar(self, nome: str, valor: float, **rotulos):
+        """Registra uma observação (ex: duração em segundos) em um histograma"""
+        chave = _rotulos(rotulos)
+        with self._lock:
+            serie = self._histogramas.setdefault(nome, {})
+            histograma = serie.get(chave)
+            if histograma is None:
+                histograma = serie[chave] = Histograma(self.limites)
+            histograma.observar(valor)
+
+    @contextmanager
+    def medir(self, nome: str, **rotulos) -> Iterator[None]:
+        """Observa no histograma o tempo gasto dentro do bloco with"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, **rotulos)
+
+    def _cabecalho(self, linhas: List[str], nome: str, tipo: str):
+        if nome in self._ajuda:
+            linhas.append(f"# HELP {nome} {self._ajuda[nome]}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+
+    def exportar(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus"""
+        linhas: List[str] = []
+        with self._lock:
+            for nome, serie in sorted(self._contadores.items()):
+                self._cabecalho(linhas, nome, "counter")
+                for rotulos, valor in sorted(serie.items()):
+                    linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {_numero(valor)}")
+
+            for nome, serie in sorted(self._medidores.items()):
+                self._cabecalho(linhas, nome, "gauge")
+                for rotulos, valor in sorted(serie.items()):
+                    linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {_numero(valor)}")
+
+            for nome, serie in sorted(self._histogramas.items()):
+                self._cabecalho(linhas, nome, "histogram")
+                for rotulos, histograma in sorted(serie.items()):
+                    acumulado = 0
+                    for limite, contagem in zip(
+                        histograma.limites + (float("inf"),), histograma.contagens
+                    ):
+                        acumulado += contagem
+                        le = "+Inf" if limite == float("inf") else f"{limite:g}"
+                        linhas.append(
+                            f"{nome}_bucket{_formatar_rotulos(rotulos, ('le', le))} {acumulado}"
+                        )
+                    linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {_numero(histograma.soma)}")
+                    linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {histograma.total}")
+        return "\n".join(linhas) + "\n"
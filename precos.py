@@ -0,0 +1,132 @@
+"""
+Conversão de preços
+Regras do formato brasileiro usadas pelos parsers ("1.500,76" -> 1500.76,
+"1.500" -> 1500.0, "150.76" -> 150.76) e uma versão vetorizada (NumPy) para
+converter muitos preços de uma vez, como na importação de histórico ou no
+reprocessamento de páginas arquivadas.
+"""
+
+import logging
+import re
+from typing import Iterable
+
+import numpy as np
+
+# Tudo que não é dígito, vírgula ou ponto
+PADRAO_NAO_PRECO = re.compile(r"[^\d,.]")
+
+# Mantissas de até 15 dígitos cabem exatamente em um float64 (< 2**53); nesse caso
+# mantissa / 10**casas é arredondado corretamente, igual a float("...")
+_MAX_DIGITOS = 15
+_POTENCIAS_10 = 10 ** np.arange(_MAX_DIGITOS + 1, dtype=np.int64)
+
+_VIRGULA, _PONTO, _ZERO, _NOVE = ord(","), ord("."), ord("0"), ord("9")
+
+
+def limpar_preco(preco_texto: str) -> float:
+    """Converte texto de preço em float de forma inteligente"""
+    if not preco_texto:
+        return 0.0
+
+    try:
+        # Remove tudo exceto números, vírgula e ponto
+        p = PADRAO_NAO_PRECO.sub("", str(preco_texto))
+
+        if ',' in p and '.' in p:
+            # Formato brasileiro: 1.500,76 -> 1500.76
+            p = p.replace('.', '').replace(',', '.')
+        elif ',' in p:
+            # Apenas vírgula: 150,76 -> 150.76
+            p = p.replace(',', '.')
+        elif '.' in p:
+            # Apenas ponto: pode ser 150.76 ou 1.500
+            partes = p.split('.')
+            if len(partes) > 2:
+                # Múltiplos pontos: 1.500.000 -> 1500000
+                p = p.replace('.', '')
+            elif len(partes[-1]) == 3:
+                # Um ponto seguido de 3 dígitos ao FINAL: 1.500 -> 1500
+                # Note: Exceção se for algo como 1.000 que é mil mas poderia ser 1.000 (decimal)
+                # Em e-commerce brasileiro, ponto sozinho com 3 dígitos costuma ser mil.
+                p = p.replace('.', '')
+            else:
+                # Um ponto seguido de != 3 dígitos (ex: 2): 150.76 -> 150.76
+                pass
+
+        return float(p)
+    except Exception as e:
+        logging.warning(f"Não foi possível converter o preço: '{preco_texto}' - Erro: {e}")
+        return 0.0
+
+
+def limpar_precos(precos_texto: Iterable) -> np.ndarray:
+    """
+    Converte vários textos de preço em um array de floats
+
+    Mesmo resultado de limpar_preco aplicado a cada item (valores vazios ou
+    inválidos viram 0.0), calculado sobre todos os textos de uma vez: os
+    caracteres viram uma matriz de códigos Unicode (uma linha por texto) e
+    cada preço é montado como mantissa inteira / 10**casas decimais, sem
+    criar strings intermediárias. Textos com caracteres fora do ASCII (que
+    podem ser dígitos de outros alfabetos) ou com mais de 15 dígitos usam
+    limpar_preco.
+
+    Args:
+        precos_texto: Textos de preço (ex: ["R$ 1.500,76", "1.500", "150.76"])
+
+    Returns:
+        Array float64 com um preço por item, na mesma ordem
+    """
+    itens = list(precos_texto)
+    textos = [str(texto) if texto else "" for texto in itens]
+    total = len(textos)
+    precos = np.zeros(total, dtype=np.float64)
+    matriz = np.array(textos, dtype=np.str_)
+    largura = matriz.dtype.itemsize // 4
+    if total == 0 or largura == 0:
+        return precos
+    codigos = matriz.view(np.uint32).reshape(total, largura)
+
+    digito = (codigos >= _ZERO) & (codigos <= _NOVE)
+    virgula = codigos == _VIRGULA
+    ponto = codigos == _PONTO
+    virgulas = virgula.sum(axis=1)
+    pontos = ponto.sum(axis=1)
+    digitos = digito.sum(axis=1)
+    posicoes = np.arange(largura)
+
+    # Dígitos depois do último ponto (caso "apenas ponto": 1.500 x 150.76)
+    ultimo_ponto = largura - 1 - np.argmax(ponto[:, ::-1], axis=1)
+    apos_ultimo_ponto = (digito & (posicoes > ultimo_ponto[:, None])).sum(axis=1)
+
+    # Separador decimal de cada texto, com as regras de limpar_preco:
+    # - com vírgula: os pontos são milhar e a vírgula (única) é o decimal
+    # - apenas ponto: vários pontos, ou 3 dígitos após o ponto, são milhar
+    tem_virgula = virgulas > 0
+    ponto_decimal = ~tem_virgula & (pontos == 1) & (apos_ultimo_ponto != 3)
+    validos = (digitos > 0) & (virgulas <= 1)
+    separador = np.where(tem_virgula[:, None], virgula, ponto & ponto_decimal[:, None])
+    posicao_separador = np.where(
+        separador.any(axis=1), np.argmax(separador, axis=1), largura
+    )
+    casas = (digito & (posicoes > posicao_separador[:, None])).sum(axis=1)
+
+    # Mantissa: os dígitos em sequência, ignorando vírgulas, pontos e o resto
+    ordem = np.cumsum(digito, axis=1) - 1
+    expoente = np.clip(digitos[:, None] - 1 - ordem, 0, _MAX_DIGITOS)
+    valores = np.where(digito, codigos.astype(np.int64) - _ZERO, 0)
+    mantissa = (valores * _POTENCIAS_10[expoente]).sum(axis=1)
+
+    rapidos = validos & (digitos <= _MAX_DIGITOS)
+    precos[rapidos] = mantissa[rapidos] / (10.0 ** casas[rapidos])
+
+    # Fora do caminho rápido: caracteres não ASCII ou números longos demais
+    lentos = (codigos > 127).any(axis=1) | (validos & (digitos > _MAX_DIGITOS))
+    for i in np.flatnonzero(lentos):
+        precos[i] = limpar_preco(itens[i])
+
+    # Textos não vazios que não formam um preço viram 0.0, com aviso
+    falhas = int(np.count_nonzero(~validos & ~lentos & (matriz != "")))
+    if falhas:
+        logging.warning(f"{falhas} preço(s) não puderam ser convertidos e ficaram 0.0")
+    return precos
@@ -0,0 +1,89 @@
+"""
+Produto encontrado em uma busca
+Registro compacto (__slots__, sem dicionário por instância) usado
+internamente pelo buscador. O nome do site é internado, a data da busca é
+uma única string compartilhada pelo lote e o preço formatado é calculado a
+partir do preço; o formato JSON da API é gerado só na serialização.
+"""
+
+import sys
+from typing import Dict, Iterable, List, Optional, Union
+
+
+class Produto:
+    __slots__ = ("nome", "preco", "site", "link", "imagem", "data_busca")
+
+    def __init__(
+        self,
+        nome: str,
+        preco: float,
+        site: str,
+        link: Optional[str] = None,
+        imagem: Optional[str] = None,
+        data_busca: str = "",
+    ):
+        """
+        Args:
+            nome: Nome do produto
+            preco: Preço em reais
+            site: Nome da loja (ex: "Amazon")
+            link: URL do produto (None se não encontrada)
+            imagem: URL da imagem
+            data_busca: Data da busca ("%Y-%m-%d %H:%M:%S"), a mesma para todo o lote
+        """
+        self.nome = nome
+        self.preco = preco
+        self.site = sys.intern(site)
+        self.link = link
+        self.imagem = imagem
+        self.data_busca = data_busca
+
+    @property
+    def preco_formatado(self) -> str:
+        return f"R$ {self.preco:.2f}"
+
+    def com_data(self, data_busca: str) -> "Produto":
+        """Cópia do produto com outra data de busca"""
+        return Produto(
+            self.nome, self.preco, self.site, self.link, self.imagem, data_busca
+        )
+
+    def para_dict(self) -> Dict:
+        """Formato JSON usado pela API e pelos arquivos salvos"""
+        return {
+            "nome": self.nome,
+            "preco": self.preco,
+            "preco_formatado": self.preco_formatado,
+            "site": self.site,
+            "link": self.link,
+            "imagem": self.imagem,
+            "data_busca": self.data_busca,
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> "Produto":
+        """Monta um produto a partir do formato JSON (ex: parsers de sites adicionados)"""
+        return cls(
+            nome=dados.get("nome", ""),
+            preco=float(dados.get("preco", 0.0)),
+            site=dados.get("site", ""),
+            link=dados.get("link"),
+            imagem=dados.get("imagem"),
+            data_busca=dados.get("data_busca", ""),
+        )
+
+    def __repr__(self) -> str:
+        return f"Produto({self.site!r}, {self.nome!r}, {self.preco_formatado!r})"
+
+
+def para_dicts(produtos: Iterable[Produto]) -> List[Dict]:
+    """Serializa uma sequência de produtos no formato JSON da API"""
+    return [produto.para_dict() for produto in produtos]
+
+
+def como_produtos(produtos: Iterable[Union[Produto, Dict]]) -> List[Produto]:
+    """Converte dicionários (formato JSON) em Produto, mantendo os que já são Produto"""
+    return [
+        produto if isinstance(produto, Produto) else Produto.de_dict(produto)
+        for produto in produtos
+    ]
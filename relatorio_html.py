@@ -0,0 +1,85 @@
+"""
+Relatórios HTML de produtos
+Renderiza a página de melhores preços a partir do template
+templates/relatorio.html (Jinja2), compilado uma única vez por processo.
+A página é gravada no arquivo à medida que é gerada, então o uso de memória
+não cresce com o número de produtos, e nomes, links e imagens são escapados
+automaticamente.
+"""
+
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+from produto import Produto
+
+PASTA_TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_RELATORIO = "relatorio.html"
+
+
+def url_segura(url: Optional[str]) -> str:
+    """Mantém apenas links http(s); outros esquemas (ex: javascript:) viram "#" """
+    if url and url[:8].lower().startswith(("http://", "https://")):
+        return url
+    return "#"
+
+
+_ambiente = Environment(
+    loader=FileSystemLoader(PASTA_TEMPLATES),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+)
+_ambiente.filters["url_segura"] = url_segura
+
+
+def _template() -> Template:
+    # O ambiente guarda o template compilado após a primeira chamada
+    return _ambiente.get_template(TEMPLATE_RELATORIO)
+
+
+def gerar_relatorio(
+    arquivo: str,
+    produtos: Iterable[Produto],
+    titulo: str = "Melhores Preços Encontrados",
+    atualizado_em: Optional[str] = None,
+):
+    """
+    Grava a página HTML com os produtos, na ordem recebida
+
+    Args:
+        arquivo: Caminho do arquivo HTML
+        produtos: Produtos já ordenados (o primeiro recebe o selo de melhor preço);
+            pode ser um iterador, como ResultadoBusca.iterar_por_preco()
+        titulo: Título da página
+        atualizado_em: Data exibida no rodapé (padrão: agora)
+    """
+    partes = _template().generate(
+        titulo=titulo,
+        produtos=produtos,
+        atualizado_em=atualizado_em or datetime.now().strftime("%d/%m/%Y às %H:%M:%S"),
+    )
+    with open(arquivo, "w", encoding="utf-8") as f:
+        f.writelines(partes)
+    logging.info(f"📄 HTML gerado em '{arquivo}'")
+
+
+def gerar_relatorios(
+    relatorios: Iterable[Tuple[str, Iterable[Produto], str, Optional[str]]]
+) -> int:
+    """
+    Grava vários relatórios em sequência com o mesmo template compilado
+
+    Args:
+        relatorios: Tuplas (arquivo, produtos, título, atualizado_em)
+
+    Returns:
+        Número de relatórios gravados
+    """
+    total = 0
+    for arquivo, produtos, titulo, atualizado_em in relatorios:
+        gerar_relatorio(arquivo, produtos, titulo, atualizado_em)
+        total += 1
+    return total
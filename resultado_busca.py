@@ -0,0 +1,182 @@
+"""
+Resultados de busca
+Objetos imutáveis que representam uma busca concluída e um armazém em
+memória, limitado, que guarda o resultado mais recente de cada termo
+"""
+
+import heapq
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from produto import Produto, para_dicts
+
+_por_preco = attrgetter("preco")
+
+
+@dataclass(frozen=True)
+class EstatisticaSite:
+    """Resumo da consulta a um site durante uma busca"""
+
+    site: str
+    # "ok", "vazio", "bloqueado", "erro", "ignorado" (disjuntor aberto) ou "expirado" (prazo)
+    status: str
+    total: int = 0
+    duracao: float = 0.0
+    erro: Optional[str] = None
+    # Segundos gastos em cada etapa (espera_limitador, requisicao, parser...)
+    etapas: Dict[str, float] = field(default_factory=dict, compare=False)
+
+    def para_dict(self, incluir_etapas: bool = False) -> Dict:
+        dados = {
+            "site": self.site,
+            "status": self.status,
+            "total": self.total,
+            "duracao": round(self.duracao, 3),
+            "erro": self.erro,
+        }
+        if incluir_etapas:
+            dados["etapas"] = {etapa: round(valor, 4) for etapa, valor in self.etapas.items()}
+        return dados
+
+
+@dataclass(frozen=True)
+class ResultadoBusca:
+    """
+    Resultado imutável de uma busca
+
+    Os produtos de cada site ficam em uma sequência própria ordenada por
+    menor preço (na mesma ordem de estatisticas_sites). A lista completa é
+    obtida intercalando essas sequências (merge de k vias) só quando pedida;
+    os melhores preços saem do merge sem montar a lista inteira. Os objetos
+    Produto são compartilhados entre leitores e não devem ser alterados.
+    O formato JSON é gerado apenas em para_dict.
+    """
+
+    termo: str
+    data_busca: str
+    estatisticas_sites: Tuple[EstatisticaSite, ...]
+    produtos_por_site: Tuple[Tuple[Produto, ...], ...]
+    # Segundos gastos nas etapas da busca como um todo (ordenacao, historico, total)
+    etapas: Dict[str, float] = field(default_factory=dict, compare=False)
+    _produtos: Optional[Tuple[Produto, ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __len__(self) -> int:
+        return sum(len(produtos) for produtos in self.produtos_por_site)
+
+    def iterar_por_preco(self) -> Iterator[Produto]:
+        """Percorre os produtos de todos os sites do menor para o maior preço"""
+        if self._produtos is not None:
+            return iter(self._produtos)
+        return heapq.merge(*self.produtos_por_site, key=_por_preco)
+
+    @property
+    def produtos(self) -> Tuple[Produto, ...]:
+        """Todos os produtos ordenados por menor preço (montado na primeira leitura)"""
+        if self._produtos is None:
+            object.__setattr__(self, "_produtos", tuple(self.iterar_por_preco()))
+        return self._produtos
+
+    @property
+    def sites_expirados(self) -> List[str]:
+        """Sites que não responderam dentro do prazo da busca"""
+        return [e.site for e in self.estatisticas_sites if e.status == "expirado"]
+
+    @property
+    def parcial(self) -> bool:
+        """Indica se algum site ficou de fora por causa do prazo"""
+        return bool(self.sites_expirados)
+
+    def obter_melhores_precos(self, limite: int = 5) -> List[Produto]:
+        """Retorna os produtos com os menores preços, sem ordenar a lista inteira"""
+        return list(islice(self.iterar_por_preco(), max(limite, 0)))
+
+    def ordenar_por_site(self) -> List[Produto]:
+        """Produtos agrupados por site (em ordem alfabética) e, em cada site, por preço"""
+        sites = sorted(
+            zip(self.estatisticas_sites, self.produtos_por_site),
+            key=lambda par: par[0].site,
+        )
+        return list(chain.from_iterable(produtos for _, produtos in sites))
+
+    def agrupar_por_faixa(
+        self, limites: Sequence[float]
+    ) -> List[Tuple[Tuple[float, Optional[float]], List[Produto]]]:
+        """
+        Separa os produtos em faixas de preço, cada uma ordenada por preço
+
+        Args:
+            limites: Valores que dividem as faixas (ex: [500, 1000] gera
+                0-500, 500-1000 e 1000 em diante)
+
+        Returns:
+            Lista de ((mínimo, máximo ou None), produtos), inclusive faixas vazias
+        """
+        limites = sorted(float(limite) for limite in limites)
+        faixas: List[List[Produto]] = [[] for _ in range(len(limites) + 1)]
+        for produto in self.iterar_por_preco():
+            faixas[bisect_right(limites, produto.preco)].append(produto)
+        bordas = [0.0] + list(limites)
+        return [
+            ((bordas[i], limites[i] if i < len(limites) else None), produtos)
+            for i, produtos in enumerate(faixas)
+        ]
+
+    def para_dict(self) -> Dict:
+        return {
+            "termo_busca": self.termo,
+            "data_busca": self.data_busca,
+            "total_encontrados": len(self.produtos),
+            "parcial": self.parcial,
+            "sites_expirados": self.sites_expirados,
+            "sites": [estatistica.para_dict() for estatistica in self.estatisticas_sites],
+            "produtos": para_dicts(self.produtos),
+        }
+
+
+class ArmazemResultados:
+    """
+    Armazém em memória dos resultados mais recentes, indexado por termo
+
+    Limitado a max_entradas termos; ao exceder, o termo usado há mais tempo
+    é descartado. Seguro para uso por várias threads.
+    """
+
+    def __init__(self, max_entradas: int = 256):
+        self.max_entradas = max_entradas
+        self._resultados: "OrderedDict[str, ResultadoBusca]" = OrderedDict()
+        self._ultimo: Optional[ResultadoBusca] = None
+        self._lock = threading.Lock()
+
+    def salvar(self, chave: str, resultado: ResultadoBusca):
+        """Guarda o resultado da busca para a chave (termo normalizado)"""
+        with self._lock:
+            self._resultados[chave] = resultado
+            self._resultados.move_to_end(chave)
+            while len(self._resultados) > self.max_entradas:
+                self._resultados.popitem(last=False)
+            self._ultimo = resultado
+
+    def obter(self, chave: Optional[str] = None) -> Optional[ResultadoBusca]:
+        """
+        Retorna o resultado da chave informada, ou o da busca mais recente
+
+        Args:
+            chave: Termo normalizado. Se None, retorna o último resultado salvo
+        """
+        with self._lock:
+            if chave is None:
+                return self._ultimo
+            resultado = self._resultados.get(chave)
+            if resultado is not None:
+                self._resultados.move_to_end(chave)
+            return resultado
+
+    def __len__(self) -> int:
+        return len(self._resultados)
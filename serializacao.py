@@ -0,0 +1,116 @@
+"""
+Serialização JSON
+Usa o orjson quando instalado (`pip install orjson`), bem mais rápido que o
+módulo json da biblioteca padrão, que continua sendo usado como alternativa
+(ou quando SERIALIZADOR_JSON=json). Também oferece exportação NDJSON (um
+objeto por linha, em modo de acréscimo) e um cache de respostas já
+serializadas para a API.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+if os.environ.get("SERIALIZADOR_JSON", "").lower() == "json":
+    orjson = None
+
+# Nome do serializador em uso ("orjson" ou "json")
+SERIALIZADOR = "orjson" if orjson is not None else "json"
+
+
+def para_json_bytes(dados: Any, indentar: bool = False) -> bytes:
+    """Serializa em JSON UTF-8 (sem escapar acentos), opcionalmente com indentação de 2 espaços"""
+    if orjson is not None:
+        return orjson.dumps(dados, option=orjson.OPT_INDENT_2 if indentar else 0)
+    return json.dumps(
+        dados, ensure_ascii=False, indent=2 if indentar else None
+    ).encode("utf-8")
+
+
+def de_json(conteudo) -> Any:
+    """Lê JSON de bytes ou texto"""
+    if orjson is not None:
+        return orjson.loads(conteudo)
+    return json.loads(conteudo)
+
+
+def anexar_ndjson(arquivo: str, registros: Iterable[Dict]) -> int:
+    """
+    Acrescenta os registros ao final do arquivo NDJSON, um objeto JSON por linha
+
+    O arquivo nunca é relido nem reescrito, então o custo é proporcional
+    apenas aos registros novos.
+
+    Returns:
+        Número de registros gravados
+    """
+    linhas = [para_json_bytes(registro) for registro in registros]
+    if linhas:
+        with open(arquivo, "ab") as f:
+            f.write(b"\n".join(linhas) + b"\n")
+    return len(linhas)
+
+
+def ler_ndjson(arquivo: str) -> Iterator[Dict]:
+    """Lê um arquivo NDJSON linha a linha, ignorando linhas vazias"""
+    with open(arquivo, "rb") as f:
+        for linha in f:
+            if linha.strip():
+                yield de_json(linha)
+
+
+class CacheRespostas:
+    """
+    Respostas JSON já serializadas, reaproveitadas enquanto os dados não mudam
+
+    Cada entrada guarda uma versão dos dados de origem (ex: o ResultadoBusca
+    imutável ou a data de modificação de um arquivo); uma versão diferente
+    gera a resposta de novo.
+    """
+
+    def __init__(self, max_entradas: int = 64):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable, versao: Any, gerar: Callable[[], bytes]) -> bytes:
+        """
+        Retorna os bytes guardados para a chave se a versão for a mesma; senão chama gerar()
+
+        Args:
+            chave: Identifica a resposta (ex: rota e parâmetros)
+            versao: Versão dos dados de origem, comparada com ==
+            gerar: Monta e serializa a resposta
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[0] == versao:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada[1]
+            self.falhas += 1
+
+        corpo = gerar()
+        with self._lock:
+            self._entradas[chave] = (versao, corpo)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return corpo
+
+    def estatisticas(self) -> Dict:
+        return {
+            "entradas": len(self._entradas),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "serializador": SERIALIZADOR,
+        }
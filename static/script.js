@@ -43,6 +43,120 @@ document.addEventListener('DOMContentLoaded', () => {
         sortSelect.value = 'relevance';
     }
 
+    // Filtra por relevância e renderiza os produtos (emAndamento: ainda há lojas respondendo)
+    function showResults(searchTerm, produtos, emAndamento) {
+        // Filtragem de Relevância: Garantir que o termo de busca (ou palavras chave) esteja no nome
+        const queryWords = searchTerm.toLowerCase().split(' ').filter(w => w.length > 2);
+
+        // Mapeamento de sinônimos comuns para melhorar a precisão
+        const synonyms = {
+            'geladeira': ['refrigerador', 'refrigeradores'],
+            'refrigerador': ['geladeira'],
+            'tv': ['televisor', 'televisão', 'smart tv'],
+            'televisão': ['tv', 'smart tv'],
+            'maquina de lavar': ['lavadora', 'lava e seca'],
+            'notebook': ['laptop'],
+            'smartphone': ['celular', 'iphone', 'smartphones'],
+            'smartphones': ['celular', 'iphone', 'smartphone'],
+            'iphone': ['apple', 'smartphone']
+        };
+
+        // Função de normalização simples para PT-BR
+        const normalize = (w) => {
+            let word = w.toLowerCase().trim();
+            if (word.endsWith('s') && word.length > 4) return word.slice(0, -1);
+            return word;
+        };
+
+        const normalizedQuery = queryWords.map(normalize);
+
+        currentProducts = produtos.filter(product => {
+            const productName = product.nome.toLowerCase();
+            // Verifica se alguma palavra da busca (normalizada) está no nome OR algum sinônimo
+            const hasMatch = normalizedQuery.some(word => {
+                if (productName.includes(word)) return true;
+
+                // Verifica sinônimos da palavra original e da normalizada
+                const originalWord = queryWords[normalizedQuery.indexOf(word)];
+                const totalSynonyms = [
+                    ...(synonyms[originalWord] || []),
+                    ...(synonyms[word] || [])
+                ];
+
+                return totalSynonyms.some(s => productName.includes(s.toLowerCase()));
+            });
+            return hasMatch;
+        });
+
+        if (currentProducts.length > 0) {
+            resultsHeader.style.display = 'flex';
+            resultsInfo.textContent = `🏆 Encontramos ${currentProducts.length} ofertas relevantes para "${searchTerm}".`
+                + (emAndamento ? ' Buscando nas demais lojas...' : '');
+            updateStoreFilters(currentProducts);
+            updateBrandFilters(currentProducts);
+            updatePriceFilters(currentProducts); // Nova função
+            renderProducts(currentProducts);
+        } else if (!emAndamento) {
+            resultsHeader.style.display = 'none';
+            resultsInfo.textContent = `😕 Nenhum produto suficientemente relevante para "${searchTerm}".`;
+        }
+    }
+
+    // Fluxo de busca em andamento: { source, finish }
+    let activeStream = null;
+
+    // Busca via Server-Sent Events. Resolve true quando recebe o resumo final,
+    // ou false se o fluxo falhar antes de qualquer evento (usa a busca comum)
+    function streamSearch(searchTerm) {
+        // Uma nova busca encerra o fluxo anterior
+        if (activeStream) activeStream.finish(true);
+
+        return new Promise((resolve) => {
+            const source = new EventSource(`/api/buscar/${encodeURIComponent(searchTerm)}/stream`);
+            const finish = (handled) => {
+                source.close();
+                if (activeStream && activeStream.source === source) activeStream = null;
+                resolve(handled);
+            };
+            activeStream = { source, finish };
+
+            let receivedAny = false;
+            let partialProducts = [];
+
+            source.addEventListener('site', (event) => {
+                receivedAny = true;
+                const data = JSON.parse(event.data);
+                if (!data.produtos.length) return;
+
+                partialProducts = partialProducts.concat(data.produtos).sort((a, b) => a.preco - b.preco);
+                loader.style.display = 'none';
+                showResults(searchTerm, partialProducts, true);
+            });
+
+            source.addEventListener('resumo', (event) => {
+                const data = JSON.parse(event.data);
+                loader.style.display = 'none';
+
+                if (data.sucesso && data.produtos.length > 0) {
+                    showResults(searchTerm, data.produtos, false);
+                } else {
+                    resultsHeader.style.display = 'none';
+                    resultsInfo.textContent = `😕 Nenhum produto encontrado para "${searchTerm}".`;
+                }
+                finish(true);
+            });
+
+            source.onerror = () => {
+                if (receivedAny) {
+                    // Conexão caiu no meio: mantém o que já chegou
+                    loader.style.display = 'none';
+                    if (partialProducts.length) showResults(searchTerm, partialProducts, false);
+                }
+                finish(receivedAny);
+            };
+        });
+    }
+
     // Função centralizada de busca
     async function performSearch(searchTerm) {
         if (!searchTerm) return;
@@ -65,6 +179,12 @@ document.addEventListener('DOMContentLoaded', () => {
 
         try {
             const isGitHubPages = window.location.hostname.includes('github.io');
+
+            // Busca em fluxo: mostra os produtos de cada loja assim que ela responde
+            if (!isGitHubPages && window.EventSource && await streamSearch(searchTerm)) {
+                return;
+            }
+
             const apiUrl = isGitHubPages ? `https://raw.githubusercontent.com/${window.location.pathname.split('/')[1]}/${window.location.pathname.split('/')[1]}/main/static/fallback_data.json` : `/api/buscar/${encodeURIComponent(searchTerm)}`;
 
             const response = await fetch(isGitHubPages ? apiUrl : `/api/buscar/${encodeURIComponent(searchTerm)}`);
@@ -80,60 +200,7 @@ document.addEventListener('DOMContentLoaded', () => {
             loader.style.display = 'none';
 
             if (data.sucesso && data.produtos.length > 0) {
-                // Filtragem de Relevância: Garantir que o termo de busca (ou palavras chave) esteja no nome
-                const queryWords = searchTerm.toLowerCase().split(' ').filter(w => w.length > 2);
-
-                // Mapeamento de sinônimos comuns para melhorar a precisão
-                const synonyms = {
-                    'geladeira': ['refrigerador', 'refrigeradores'],
-                    'refrigerador': ['geladeira'],
-                    'tv': ['televisor', 'televisão', 'smart tv'],
-                    'televisão': ['tv', 'smart tv'],
-                    'maquina de lavar': ['lavadora', 'lava e seca'],
-                    'notebook': ['laptop'],
-                    'smartphone': ['celular', 'iphone', 'smartphones'],
-                    'smartphones': ['celular', 'iphone', 'smartphone'],
-                    'iphone': ['apple', 'smartphone']
-                };
-
-                // Função de normalização simples para PT-BR
-                const normalize = (w) => {
-                    let word = w.toLowerCase().trim();
-                    if (word.endsWith('s') && word.length > 4) return word.slice(0, -1);
-                    return word;
-                };
-
-                const normalizedQuery = queryWords.map(normalize);
-
-                currentProducts = data.produtos.filter(product => {
-                    const productName = product.nome.toLowerCase();
-                    // Verifica se alguma palavra da busca (normalizada) está no nome OR algum sinônimo
-                    const hasMatch = normalizedQuery.some(word => {
-                        if (productName.includes(word)) return true;
-
-                        // Verifica sinônimos da palavra original e da normalizada
-                        const originalWord = queryWords[normalizedQuery.indexOf(word)];
-                        const totalSynonyms = [
-                            ...(synonyms[originalWord] || []),
-                            ...(synonyms[word] || [])
-                        ];
-
-                        return totalSynonyms.some(s => productName.includes(s.toLowerCase()));
-                    });
-                    return hasMatch;
-                });
-
-                if (currentProducts.length > 0) {
-                    resultsHeader.style.display = 'flex';
-                    resultsInfo.textContent = `🏆 Encontramos ${currentProducts.length} ofertas relevantes para "${searchTerm}".`;
-                    updateStoreFilters(currentProducts);
-                    updateBrandFilters(currentProducts);
-                    updatePriceFilters(currentProducts); // Nova função
-                    renderProducts(currentProducts);
-                } else {
-                    resultsHeader.style.display = 'none';
-                    resultsInfo.textContent = `😕 Nenhum produto suficientemente relevante para "${searchTerm}".`;
-                }
+                showResults(searchTerm, data.produtos, false);
             } else {
                 resultsHeader.style.display = 'none';
                 resultsInfo.textContent = `😕 Nenhum produto encontrado para "${searchTerm}".`;
@@ -0,0 +1,60 @@
+"""
+Agrupamento de ofertas: variantes diferentes nunca ficam no mesmo produto canônico
+"""
+
+from itertools import permutations
+
+import pytest
+
+from correspondencia import agrupar_ofertas
+from produto import Produto
+
+
+def _grupos(produtos):
+    return [sorted(oferta.nome for oferta in c.ofertas) for c in agrupar_ofertas(produtos)]
+
+
+@pytest.mark.parametrize(
+    "ordem",
+    list(
+        permutations(
+            [
+                Produto("Apple iPhone 15 128GB Preto", 4500, "Amazon"),
+                Produto("Apple iPhone 15", 4700, "Magazine Luiza"),
+                Produto("Apple iPhone 15 256GB Preto", 5500, "Amazon"),
+            ]
+        )
+    ),
+)
+def test_titulo_generico_nao_liga_variantes(ordem):
+    for grupo in _grupos(ordem):
+        assert not (
+            "Apple iPhone 15 128GB Preto" in grupo and "Apple iPhone 15 256GB Preto" in grupo
+        )
+
+
+def test_ram_a_mais_no_titulo_agrupa():
+    produtos = [
+        Produto("Smartphone Samsung Galaxy A15 128GB 4GB RAM", 999, "Magazine Luiza"),
+        Produto("Samsung Galaxy A15 SM-A155M 128GB", 949, "Amazon"),
+    ]
+    assert len(_grupos(produtos)) == 1
+
+
+@pytest.mark.parametrize(
+    "titulo_a, titulo_b",
+    [
+        ("Samsung Galaxy A15 128GB 4GB RAM", "Samsung Galaxy A15 128GB 6GB RAM"),
+        ("Galaxy A15 128GB 8GB RAM", "Galaxy A15 256GB 8GB RAM"),
+        ("Apple iPhone 15 128GB Preto", "Apple iPhone 15 Pro 128GB Titânio Preto"),
+    ],
+)
+def test_variantes_diferentes_nao_agrupam(titulo_a, titulo_b):
+    produtos = [Produto(titulo_a, 1000, "Amazon"), Produto(titulo_b, 1100, "Magazine Luiza")]
+    assert len(_grupos(produtos)) == 2
+
+
+@pytest.mark.parametrize("limiar", [0, -0.5, 1.5, float("nan"), float("inf")])
+def test_limiar_fora_do_intervalo(limiar):
+    with pytest.raises(ValueError):
+        agrupar_ofertas([Produto("Galaxy A15 128GB", 999, "Amazon")], limiar)
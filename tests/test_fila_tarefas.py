@@ -0,0 +1,31 @@
+"""
+Fila de tarefas: uma busca mais longa que a concessão não é entregue a outro trabalhador
+"""
+
+import time
+
+from fila_tarefas import CONCLUIDA, FilaSQLite
+
+
+def test_manter_concessao_impede_execucao_duplicada(tmp_path):
+    fila = FilaSQLite(str(tmp_path / "fila.db"), duracao_concessao=0.3)
+    fila.enfileirar("iphone 15", "amazon")
+    tarefa = fila.obter()
+
+    with fila.manter_concessao(tarefa, intervalo=0.05):
+        time.sleep(0.6)
+        assert fila.obter() is None
+
+    assert fila.concluir(tarefa)
+    assert fila.estatisticas() == {CONCLUIDA: 1}
+
+
+def test_concessao_expira_sem_renovacao(tmp_path):
+    fila = FilaSQLite(str(tmp_path / "fila.db"), duracao_concessao=0.1)
+    fila.enfileirar("iphone 15", "amazon")
+    tarefa = fila.obter()
+
+    time.sleep(0.2)
+    outra = fila.obter()
+    assert outra is not None and outra.concessao != tarefa.concessao
+    assert not fila.concluir(tarefa)
@@ -0,0 +1,72 @@
+"""
+Equivalência entre limpar_precos (vetorizada) e limpar_preco (um texto por vez)
+"""
+
+import string
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from precos import limpar_preco, limpar_precos
+
+
+def _grupos_milhar(inteiro: int) -> str:
+    return f"{inteiro:,}".replace(",", ".")
+
+
+@st.composite
+def precos_brasileiros(draw) -> str:
+    """Textos como os das lojas: "R$ 1.500,76", "1.500", "150.76", "1500,9"..."""
+    inteiro = draw(st.integers(min_value=0, max_value=10**9))
+    centavos = draw(st.integers(min_value=0, max_value=99))
+    formato = draw(
+        st.sampled_from(["br", "br_sem_milhar", "milhar", "ponto_decimal", "inteiro"])
+    )
+    if formato == "br":
+        numero = f"{_grupos_milhar(inteiro)},{centavos:02d}"
+    elif formato == "br_sem_milhar":
+        numero = f"{inteiro},{draw(st.integers(min_value=0, max_value=999))}"
+    elif formato == "milhar":
+        numero = _grupos_milhar(inteiro)
+    elif formato == "ponto_decimal":
+        numero = f"{inteiro}.{draw(st.integers(min_value=0, max_value=9999))}"
+    else:
+        numero = str(inteiro)
+    prefixo = draw(st.sampled_from(["", "R$ ", "R$", "por R$ ", "  ", "\xa0R$\xa0"]))
+    sufixo = draw(st.sampled_from(["", " ", " à vista", " no Pix", "\n", " 10x"]))
+    return prefixo + numero + sufixo
+
+
+# Dígitos de outros alfabetos (árabe-índico, devanágari, largura total) e outros não ASCII
+_DIGITOS_NAO_ASCII = "٠١٢٣٤٥٦٧٨٩०१२३४५६७८९０１２３４５６７８９²½€"
+
+textos_ruidosos = st.text(
+    alphabet=string.digits + ",.R$ -+eE" + _DIGITOS_NAO_ASCII, max_size=25
+)
+
+valores = st.one_of(
+    precos_brasileiros(),
+    textos_ruidosos,
+    st.text(max_size=20),
+    st.none(),
+    st.integers(min_value=-10**20, max_value=10**20),
+    st.floats(allow_nan=True, allow_infinity=True),
+)
+
+
+@settings(max_examples=2000, deadline=None)
+@given(st.lists(valores, max_size=30))
+def test_lote_igual_a_conversao_individual(textos):
+    assert limpar_precos(textos).tolist() == [limpar_preco(texto) for texto in textos]
+
+
+@settings(max_examples=500, deadline=None)
+@given(st.lists(precos_brasileiros(), min_size=1, max_size=50))
+def test_precos_brasileiros_em_lote(textos):
+    assert limpar_precos(textos).tolist() == [limpar_preco(texto) for texto in textos]
+
+
+def test_exemplos_do_formato_brasileiro():
+    textos = ["R$ 1.500,76", "1.500", "150.76", "150,76", "1.500.000", "", None, "grátis"]
+    esperados = [1500.76, 1500.0, 150.76, 150.76, 1500000.0, 0.0, 0.0, 0.0]
+    assert limpar_precos(textos).tolist() == esperados
@@ -0,0 +1,163 @@
+"""
+Camada de transporte HTTP do buscador
+Cria sessões com pool de conexões por host, keep-alive, retentativas com
+backoff e, opcionalmente, HTTP/2. As sessões são compartilhadas entre
+instâncias de BuscadorPrecos para reaproveitar conexões TCP/TLS já abertas.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@dataclass(frozen=True)
+class ConfigTransporte:
+    """Parâmetros da sessão HTTP usada para consultar os sites"""
+
+    # Número de hosts com pool de conexões mantido em memória
+    pool_hosts: int = 10
+    # Conexões mantidas abertas (keep-alive) por host
+    conexoes_por_host: int = 10
+    # Retentativas para erros de conexão e status temporários
+    tentativas: int = 2
+    # Fator de backoff exponencial entre retentativas (segundos)
+    backoff: float = 0.5
+    status_retentativa: Tuple[int, ...] = (429, 500, 502, 503, 504)
+    # Usa HTTP/2 via httpx (requer `pip install httpx[http2]`)
+    http2: bool = False
+    # Desabilitado por padrão para funcionar em redes corporativas/proxies
+    verificar_ssl: bool = False
+
+
+_sessoes: Dict[ConfigTransporte, object] = {}
+# Clientes assíncronos por event loop (descartados junto com o loop)
+_clientes_async: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_lock_sessoes = threading.Lock()
+
+
+def _criar_sessao_requests(config: ConfigTransporte, headers: Dict) -> requests.Session:
+    retentativas = Retry(
+        total=config.tentativas,
+        backoff_factor=config.backoff,
+        status_forcelist=config.status_retentativa,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        # Devolve a última resposta em vez de lançar exceção; o status é tratado pelo buscador
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(
+        pool_connections=config.pool_hosts,
+        pool_maxsize=config.conexoes_por_host,
+        max_retries=retentativas,
+    )
+
+    sessao = requests.Session()
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    sessao.headers.update(headers)
+    sessao.verify = config.verificar_ssl
+    return sessao
+
+
+def _criar_sessao_http2(config: ConfigTransporte, headers: Dict):
+    import httpx
+
+    # O transporte do httpx só repete falhas de conexão (não status HTTP)
+    transporte = httpx.HTTPTransport(
+        http2=True,
+        verify=config.verificar_ssl,
+        retries=config.tentativas,
+        limits=httpx.Limits(
+            max_connections=config.pool_hosts * config.conexoes_por_host,
+            max_keepalive_connections=config.conexoes_por_host,
+        ),
+    )
+    return httpx.Client(
+        transport=transporte,
+        headers=headers,
+        verify=config.verificar_ssl,
+        follow_redirects=True,
+    )
+
+
+def criar_sessao(config: ConfigTransporte, headers: Dict):
+    """
+    Cria uma nova sessão HTTP conforme a configuração
+
+    Com http2=True usa um httpx.Client (mesma interface get/content/status_code
+    usada pelo buscador). Se o httpx não estiver instalado, volta para
+    requests com HTTP/1.1.
+    """
+    if config.http2:
+        try:
+            return _criar_sessao_http2(config, headers)
+        except ImportError:
+            logging.warning(
+                "httpx[http2] não instalado, usando requests com HTTP/1.1"
+            )
+    return _criar_sessao_requests(config, headers)
+
+
+def obter_sessao(config: ConfigTransporte, headers: Dict):
+    """
+    Retorna a sessão compartilhada para a configuração, criando-a na primeira vez
+
+    Todas as instâncias de BuscadorPrecos com a mesma configuração usam a
+    mesma sessão, então as conexões abertas por uma busca são reaproveitadas
+    pelas seguintes.
+    """
+    with _lock_sessoes:
+        sessao = _sessoes.get(config)
+        if sessao is None:
+            sessao = criar_sessao(config, headers)
+            _sessoes[config] = sessao
+        return sessao
+
+
+def criar_cliente_async(config: ConfigTransporte, headers: Dict):
+    """
+    Cria um httpx.AsyncClient conforme a configuração (requer `pip install httpx`)
+
+    O transporte do httpx só repete falhas de conexão (não status HTTP).
+    """
+    import httpx
+
+    transporte = httpx.AsyncHTTPTransport(
+        http2=config.http2,
+        verify=config.verificar_ssl,
+        retries=config.tentativas,
+        limits=httpx.Limits(
+            max_connections=config.pool_hosts * config.conexoes_por_host,
+            max_keepalive_connections=config.conexoes_por_host,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=transporte,
+        headers=headers,
+        verify=config.verificar_ssl,
+        follow_redirects=True,
+    )
+
+
+def obter_cliente_async(config: ConfigTransporte, headers: Dict):
+    """
+    Retorna o cliente assíncrono compartilhado para a configuração
+
+    Clientes assíncronos pertencem ao event loop em que são usados, então há
+    um cliente por configuração e por event loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock_sessoes:
+        clientes_loop = _clientes_async.setdefault(loop, {})
+        cliente = clientes_loop.get(config)
+        if cliente is None:
+            cliente = criar_cliente_async(config, headers)
+            clientes_loop[config] = cliente
+        return cliente